@@ -0,0 +1,211 @@
+"""Apache Arrow IPC and Parquet encoding of performance data.
+
+Exports are built from the column batches of ``IStorage.iter_performance_columns``;
+numeric columns from MemoryStorage are wrapped as Arrow buffers without
+copying or building per-row objects. Imports read Parquet record batches,
+validate them with Arrow compute kernels and hand them to storage as
+column batches.
+
+pyarrow is optional; without it ``pa`` is None and the endpoints answer 501.
+"""
+import io
+from array import array
+from datetime import date
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional
+    pa = None
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+# Parquet row groups are written one per storage batch, so batches are larger
+PARQUET_BATCH_SIZE = 65536
+
+UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+_TYPECODES_64 = {"q", "l", "d"}
+
+
+def _schema():
+    return pa.schema([
+        ("id", pa.string()),
+        ("date", pa.date32()),
+        ("platform", pa.dictionary(pa.int32(), pa.string())),
+        ("impressions", pa.int64()),
+        ("clicks", pa.int64()),
+        ("conversions", pa.int64()),
+        ("spend", pa.float64()),
+        ("revenue", pa.float64()),
+        ("created_at", pa.timestamp("us")),
+    ])
+
+
+def _numeric(values: Sequence[Any], type) -> "pa.Array":
+    if isinstance(values, array) and values.typecode in _TYPECODES_64 and values.itemsize == 8:
+        # Zero-copy view of the array's buffer (the array must not be resized while it lives)
+        return pa.Array.from_buffers(type, len(values), [None, pa.py_buffer(values)])
+    return pa.array(values, type)
+
+
+def record_batch(columns: Dict[str, Sequence[Any]]) -> "pa.RecordBatch":
+    """Arrow record batch for a performance column batch."""
+    ids = columns["id"]
+    id_array = _numeric(ids, pa.int64()) if isinstance(ids, array) else pa.array(ids)
+    days = pc.subtract(_numeric(columns["date"], pa.int64()), UNIX_EPOCH_ORDINAL)
+    created_at = _numeric(columns["created_at"], pa.float64())
+    created_at = pc.if_else(pc.is_nan(created_at), pa.scalar(None, pa.float64()), created_at)
+    micros = pc.multiply(created_at, 1_000_000).cast(pa.int64(), safe=False)
+    return pa.RecordBatch.from_arrays(
+        [
+            id_array.cast(pa.string()),
+            days.cast(pa.int32()).cast(pa.date32()),
+            pa.array(columns["platform"], pa.string()).dictionary_encode(),
+            _numeric(columns["impressions"], pa.int64()),
+            _numeric(columns["clicks"], pa.int64()),
+            _numeric(columns["conversions"], pa.int64()),
+            _numeric(columns["spend"], pa.float64()),
+            _numeric(columns["revenue"], pa.float64()),
+            micros.cast(pa.timestamp("us")),
+        ],
+        schema=_schema(),
+    )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting output between drains, tracking the total position for writers."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def arrow_stream_chunks(batches: AsyncIterator[Dict[str, Sequence[Any]]]) -> AsyncIterator[bytes]:
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, _schema())
+    async for columns in batches:
+        writer.write_batch(record_batch(columns))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+async def parquet_chunks(batches: AsyncIterator[Dict[str, Sequence[Any]]]) -> AsyncIterator[bytes]:
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, _schema())
+    async for columns in batches:
+        # Each batch becomes a row group and is flushed to the sink as it is written
+        writer.write_batch(record_batch(columns))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+# Imports
+
+_COUNT_COLUMNS = ("impressions", "clicks", "conversions")
+_AMOUNT_COLUMNS = ("spend", "revenue")
+
+
+def _invalid(offset: int, mask, message: str) -> ValueError:
+    row = pc.index(mask, True).as_py()
+    return ValueError(f"Row {offset + row + 1}: {message}")
+
+
+def _dates(column, offset: int) -> "pa.Array":
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        try:
+            column = pc.strptime(column, format="%Y-%m-%d", unit="s")
+        except pa.ArrowInvalid as e:
+            raise ValueError(f"Invalid date in import, expected YYYY-MM-DD: {e}")
+    if not (pa.types.is_date(column.type) or pa.types.is_timestamp(column.type)):
+        raise ValueError(f"Column 'date' has unsupported type {column.type}")
+    if column.null_count:
+        raise _invalid(offset, pc.is_null(column), "date is required")
+    return pc.add(column.cast(pa.date32()).cast(pa.int32()).cast(pa.int64()), UNIX_EPOCH_ORDINAL)
+
+
+def _metric(batch, name: str, type, offset: int) -> "pa.Array":
+    index = batch.schema.get_field_index(name)
+    if index < 0:
+        return pa.nulls(batch.num_rows, type).fill_null(0)
+    try:
+        column = batch.column(index).cast(type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ValueError(f"Column {name!r}: {e}")
+    # Missing values take the model default of 0
+    column = column.fill_null(0)
+    if pa.types.is_floating(type):
+        non_finite = pc.invert(pc.is_finite(column))
+        if pc.any(non_finite).as_py():
+            raise _invalid(offset, non_finite, f"{name} must be a finite number")
+    negative = pc.less(column, 0)
+    if pc.any(negative).as_py():
+        raise _invalid(offset, negative, f"{name} must not be negative")
+    return column
+
+
+def _to_array(values: "pa.Array", typecode: str) -> array:
+    if array(typecode).itemsize == 8:
+        return array(typecode, values.to_numpy(zero_copy_only=False).tobytes())
+    return array(typecode, values.to_pylist())
+
+
+def import_columns(batch: "pa.RecordBatch", offset: int = 0) -> Dict[str, Sequence[Any]]:
+    """Validate a Parquet record batch and convert it to a performance column batch.
+
+    ``offset`` is the index of the batch's first row in the file, for error messages.
+    """
+    index = batch.schema.get_field_index("date")
+    if index < 0:
+        raise ValueError("Import is missing the 'date' column")
+    columns: Dict[str, Sequence[Any]] = {"date": _to_array(_dates(batch.column(index), offset), "l")}
+    index = batch.schema.get_field_index("platform")
+    if index < 0:
+        columns["platform"] = [None] * batch.num_rows
+    else:
+        columns["platform"] = batch.column(index).cast(pa.string()).to_pylist()
+    for name in _COUNT_COLUMNS:
+        columns[name] = _to_array(_metric(batch, name, pa.int64(), offset), "q")
+    for name in _AMOUNT_COLUMNS:
+        columns[name] = _to_array(_metric(batch, name, pa.float64(), offset), "d")
+    return columns
+
+
+def read_parquet(file: BinaryIO, batch_size: int = PARQUET_BATCH_SIZE) -> Iterator[Dict[str, Sequence[Any]]]:
+    """Validated column batches of a Parquet file; raises ValueError on the first invalid row."""
+    try:
+        parquet = pq.ParquetFile(file)
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Body is not a Parquet file: {e}")
+    offset = 0
+    for batch in parquet.iter_batches(batch_size=batch_size):
+        yield import_columns(batch, offset)
+        offset += batch.num_rows
+
+
+def validate_parquet(file: BinaryIO) -> int:
+    """Check every row of a Parquet file without keeping it; returns the row count and rewinds."""
+    rows = sum(len(columns["date"]) for columns in read_parquet(file))
+    file.seek(0)
+    return rows
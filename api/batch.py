@@ -0,0 +1,159 @@
+"""In-process execution of /api/batch sub-requests.
+
+Each sub-request is a GET dispatched straight into the ASGI app, so it goes
+through the same routing, validation and storage as a direct call but
+without another connection. Sub-requests run concurrently against the
+caller's storage partition; when a write commits while they run, the whole
+batch is re-run so the results reflect one change-feed position. After
+``BATCH_ATTEMPTS`` runs that all overlapped writes, the last results are
+returned with ``consistent`` set to false: each of them is at least as new
+as ``seq``, but they may reflect different positions after it.
+
+The response is assembled from the sub-responses' raw bytes, so JSON bodies
+are embedded without being parsed and re-encoded. Text bodies are embedded
+as JSON strings; streamed or binary responses cannot be batched and come
+back as 400 items.
+"""
+import asyncio
+import json
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from models import BatchItem, BatchRequest
+from storage import IStorage
+
+# Paths a batch cannot call: itself, streams that never complete, and binary exports
+EXCLUDED_PATHS = ("/api/batch", "/api/changes/stream", "/api/performance/export")
+# Runs of a batch before its results are returned even though writes kept landing
+BATCH_ATTEMPTS = 3
+# Sub-response headers that describe the transport rather than the content
+_DROPPED_HEADERS = frozenset({"content-length", "transfer-encoding", "connection"})
+
+# (status, headers, body, content type)
+SubResponse = Tuple[int, Dict[str, str], bytes, str]
+
+
+class _StreamedResponse(Exception):
+    """Raised from ``send`` to stop a sub-request as soon as it starts streaming."""
+
+
+def _rejected(detail: str) -> SubResponse:
+    return 400, {}, json.dumps({"detail": detail}).encode(), "application/json"
+
+
+def _media_type(content_type: str) -> str:
+    return content_type.split(";")[0].strip().lower()
+
+
+def _is_embeddable(body: bytes, content_type: str) -> bool:
+    """Whether ``body`` can go into the batch response as JSON or as a text string."""
+    media_type = _media_type(content_type)
+    if not body or media_type == "application/json":
+        return True
+    if not media_type.startswith("text/"):
+        return False
+    try:
+        body.decode("utf-8")
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+async def _dispatch(app, item: BatchItem, client_id: str) -> SubResponse:
+    url = urlsplit(item.path)
+    if url.path in EXCLUDED_PATHS:
+        return _rejected(f"{url.path} cannot be batched")
+    headers = {name.lower(): value for name, value in item.headers.items()}
+    # Sub-requests always read the batch caller's partition
+    headers["x-client-id"] = client_id
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": "",
+        "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()],
+        "client": None,
+        "server": None,
+    }
+    status = 500
+    response_headers: Dict[str, str] = {}
+    chunks: List[bytes] = []
+    request_sent = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Responses listening for a disconnect get one once their body is complete
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for name, value in message.get("headers", []):
+                name = name.decode("latin-1").lower()
+                if name not in _DROPPED_HEADERS:
+                    response_headers[name] = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            if message.get("more_body", False):
+                # Streamed bodies can be unbounded; stop instead of buffering them
+                raise _StreamedResponse()
+            chunks.append(message.get("body", b""))
+            finished.set()
+
+    try:
+        await app(scope, receive, send)
+    except _StreamedResponse:
+        return _rejected(f"{url.path} streams its response and cannot be batched")
+    except Exception:
+        # The app has already sent its 500 response when an endpoint raised
+        if status == 500 and not chunks:
+            chunks.append(b'{"detail":"Internal Server Error"}')
+            response_headers["content-type"] = "application/json"
+    finally:
+        finished.set()
+    body, content_type = b"".join(chunks), response_headers.get("content-type", "")
+    if not _is_embeddable(body, content_type):
+        media_type = _media_type(content_type) or "an untyped body"
+        return _rejected(f"{url.path} returned {media_type}, which cannot be batched")
+    return status, response_headers, body, content_type
+
+
+def _encode_item(item: BatchItem, response: SubResponse) -> bytes:
+    status, headers, body, content_type = response
+    if not body:
+        encoded_body = b"null"
+    elif _media_type(content_type) == "application/json":
+        encoded_body = body
+    else:
+        encoded_body = json.dumps(body.decode("utf-8")).encode()
+    return b"".join((
+        b'{"id":', json.dumps(item.id).encode(),
+        b',"status":', str(status).encode(),
+        b',"headers":', json.dumps(headers, separators=(",", ":")).encode(),
+        b',"body":', encoded_body, b"}",
+    ))
+
+
+async def run_batch(app, batch: BatchRequest, storage: IStorage, client_id: str) -> bytes:
+    """Run the sub-requests of ``batch`` and return the JSON body of a BatchResponse."""
+    for _ in range(BATCH_ATTEMPTS):
+        seq = await storage.get_change_seq()
+        responses = await asyncio.gather(*(_dispatch(app, item, client_id) for item in batch.requests))
+        consistent = await storage.get_change_seq() == seq
+        if consistent:
+            break
+    items = b",".join(_encode_item(item, response) for item, response in zip(batch.requests, responses))
+    return b"".join((
+        b'{"seq":', str(seq).encode(), b',"consistent":', b"true" if consistent else b"false",
+        b',"responses":[', items, b"]}",
+    ))
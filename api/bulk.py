@@ -0,0 +1,149 @@
+"""Helpers for the bulk campaign/integration endpoints.
+
+Bodies are either a JSON array or an NDJSON stream (one JSON value per line).
+Every item is validated on its own, so one bad row is reported in the
+per-item results instead of failing the whole batch.
+"""
+import json
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+
+from models import BulkItemResult, BulkResult
+
+MAX_BULK_ITEMS = 50000
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Invalid JSON: {e}")
+
+
+def _check_size(count: int) -> None:
+    if count > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Bulk requests are limited to {MAX_BULK_ITEMS} items")
+
+
+async def read_bulk_items(request: Request) -> List[Any]:
+    """Read the raw items of a bulk request; unparsable NDJSON lines become ValueError items."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_MEDIA_TYPES:
+        items: List[Any] = []
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            items.extend(_parse_line(line) for line in lines if line.strip())
+            _check_size(len(items))
+        if buffer.strip():
+            items.append(_parse_line(buffer))
+        _check_size(len(items))
+        return items
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    _check_size(len(items))
+    return items
+
+
+def describe_error(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc']) or 'item'}: {detail['msg']}"
+            for detail in error.errors()
+        )
+    return str(error)
+
+
+def summarize(results: List[BulkItemResult]) -> BulkResult:
+    succeeded = sum(1 for result in results if result.ok)
+    return BulkResult(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+
+async def bulk_create(
+    items: List[Any],
+    model: Type[BaseModel],
+    create_many: Callable[[List[Any]], Awaitable[List[Any]]],
+) -> BulkResult:
+    results: List[Optional[BulkItemResult]] = [None] * len(items)
+    valid: List[BaseModel] = []
+    positions: List[int] = []
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item, Exception):
+                raise item
+            valid.append(model.model_validate(item))
+            positions.append(index)
+        except ValueError as e:
+            results[index] = BulkItemResult(index=index, ok=False, error=describe_error(e))
+    for index, created in zip(positions, await create_many(valid)):
+        results[index] = BulkItemResult(index=index, id=created.id, ok=True)
+    return summarize(results)
+
+
+async def bulk_update(
+    items: List[Any],
+    update_model: Type[BaseModel],
+    update_many: Callable[[List[Tuple[str, dict]]], Awaitable[List[Optional[Any]]]],
+) -> BulkResult:
+    """Items are objects carrying an ``id`` plus the fields to change."""
+    results: List[Optional[BulkItemResult]] = [None] * len(items)
+    updates: List[Tuple[str, dict]] = []
+    positions: List[int] = []
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item, Exception):
+                raise item
+            if not isinstance(item, dict) or not isinstance(item.get("id"), str):
+                raise ValueError("Each update must be an object with a string 'id'")
+            changes = {key: value for key, value in item.items() if key != "id"}
+            validated = update_model.model_validate(changes).model_dump(exclude_unset=True)
+            updates.append((item["id"], validated))
+            positions.append(index)
+        except ValueError as e:
+            results[index] = BulkItemResult(index=index, id=_item_id(item), ok=False, error=describe_error(e))
+    for index, (record_id, _), updated in zip(positions, updates, await update_many(updates)):
+        if updated is None:
+            results[index] = BulkItemResult(index=index, id=record_id, ok=False, error="Not found")
+        else:
+            results[index] = BulkItemResult(index=index, id=record_id, ok=True)
+    return summarize(results)
+
+
+async def bulk_delete(
+    items: List[Any],
+    delete_many: Callable[[List[str]], Awaitable[List[bool]]],
+) -> BulkResult:
+    """Items are ids, or objects carrying an ``id``."""
+    results: List[Optional[BulkItemResult]] = [None] * len(items)
+    record_ids: List[str] = []
+    positions: List[int] = []
+    for index, item in enumerate(items):
+        record_id = _item_id(item)
+        if record_id is None:
+            error = str(item) if isinstance(item, Exception) else "Each item must be an id or an object with an 'id'"
+            results[index] = BulkItemResult(index=index, ok=False, error=error)
+            continue
+        record_ids.append(record_id)
+        positions.append(index)
+    for index, record_id, deleted in zip(positions, record_ids, await delete_many(record_ids)):
+        results[index] = BulkItemResult(
+            index=index, id=record_id, ok=deleted, error=None if deleted else "Not found"
+        )
+    return summarize(results)
+
+
+def _item_id(item: Any) -> Optional[str]:
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict) and isinstance(item.get("id"), str):
+        return item["id"]
+    return None
@@ -0,0 +1,302 @@
+"""Read-through cache in front of any IStorage backend.
+
+The plain list reads (campaigns, metrics, integrations and date-window
+performance reads) are cached, and so are their serialized JSON bodies
+(per ``fields`` set); a JSON entry holds only the bytes, not the models.
+The cache is bounded both by entry count and by (approximate) size.
+Each collection has a version that every write through the cache bumps;
+an entry is only served while its collection is still at the version the
+read started under, so a read racing a write can never repopulate stale
+data. Writes made by other processes are picked up from the storage change
+feed, checked at most every ``max_staleness`` seconds.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from models import (
+    Campaign, Metric, Integration, PerformanceData, CampaignQuery, PerformanceQuery,
+    PerformanceGroupBy, PerformanceAggregate, RollupGrain, PerformanceCompaction, ChangeEvent,
+)
+from storage import (
+    IStorage, Page, ChangeFeedGapError, EXPORT_BATCH_SIZE, Fields, JsonBody,
+)
+
+COLLECTIONS = ("campaigns", "metrics", "integrations", "performance")
+# Batch of change events inspected per staleness check; more than this bumps every collection
+SYNC_BATCH = 1000
+# Rough in-memory size of one model in a cached list, for the size bound
+MODEL_SIZE_ESTIMATE = 1024
+
+
+def _size_of(value: Any) -> int:
+    if isinstance(value, JsonBody):
+        return len(value.body)
+    if isinstance(value, list):
+        return len(value) * MODEL_SIZE_ESTIMATE
+    return MODEL_SIZE_ESTIMATE
+
+
+class _Entry:
+    __slots__ = ("version", "value", "size")
+
+    def __init__(self, version: int, value: Any):
+        self.version = version
+        self.value = value
+        self.size = _size_of(value)
+
+
+class CachedStorage(IStorage):
+    """IStorage decorator caching list reads with LRU eviction and per-collection invalidation."""
+
+    def __init__(
+        self, inner: IStorage, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024, max_staleness: float = 1.0
+    ):
+        super().__init__()
+        self.inner = inner
+        # Compaction runs in the inner backend, so callers must hold its lock
+        self.performance_lock = inner.performance_lock
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_staleness = max_staleness
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries: "OrderedDict[Tuple[Any, ...], _Entry]" = OrderedDict()
+        self._versions: Dict[str, int] = {collection: 0 for collection in COLLECTIONS}
+        self._seen_seq: Optional[int] = None
+        self._checked_at = float("-inf")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "versions": dict(self._versions),
+        }
+
+    # Cache mechanics
+
+    def invalidate(self, collection: str) -> None:
+        self._versions[collection] += 1
+        for key in [key for key in self._entries if key[0] == collection]:
+            self.bytes -= self._entries.pop(key).size
+
+    async def _sync(self) -> None:
+        """Invalidate collections changed by other processes, per the change feed."""
+        now = time.monotonic()
+        if now - self._checked_at < self.max_staleness:
+            return
+        self._checked_at = now
+        if self._seen_seq is None:
+            self._seen_seq = await self.inner.get_change_seq()
+            return
+        try:
+            changes = await self.inner.get_changes(self._seen_seq, SYNC_BATCH)
+        except ChangeFeedGapError as e:
+            changes, self._seen_seq = None, e.latest
+        if changes is None or len(changes) == SYNC_BATCH:
+            for collection in COLLECTIONS:
+                self.invalidate(collection)
+            if changes:
+                self._seen_seq = await self.inner.get_change_seq()
+            return
+        for collection in {change.collection for change in changes}:
+            self.invalidate(collection)
+        if changes:
+            self._seen_seq = changes[-1].seq
+
+    async def _entry(self, key: Tuple[Any, ...], load: Callable[[], Awaitable[Any]]) -> _Entry:
+        await self._sync()
+        collection = key[0]
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == self._versions[collection]:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        version = self._versions[collection]
+        entry = _Entry(version, await load())
+        # A write that finished while loading has already moved the version on;
+        # a value larger than the whole budget is served but not kept
+        if version == self._versions[collection] and entry.size <= self.max_bytes:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous.size
+            self._entries[key] = entry
+            self.bytes += entry.size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self.bytes -= self._entries.popitem(last=False)[1].size
+                self.evictions += 1
+        return entry
+
+    async def _read(self, key: Tuple[Any, ...], load: Callable[[], Awaitable[Any]]) -> Any:
+        return (await self._entry(key, load)).value
+
+    async def _write(self, collection: str, write, *args):
+        try:
+            return await write(*args)
+        finally:
+            self.invalidate(collection)
+
+    # Cached reads
+
+    async def get_campaigns(self) -> List[Campaign]:
+        return await self._read(("campaigns",), self.inner.get_campaigns)
+
+    async def get_campaigns_json(self, fields: Fields = None) -> JsonBody:
+        return await self._read(("campaigns", "json", fields), lambda: self.inner.get_campaigns_json(fields))
+
+    async def get_metrics(self) -> List[Metric]:
+        return await self._read(("metrics",), self.inner.get_metrics)
+
+    async def get_metrics_json(self, fields: Fields = None) -> JsonBody:
+        return await self._read(("metrics", "json", fields), lambda: self.inner.get_metrics_json(fields))
+
+    async def get_integrations(self) -> List[Integration]:
+        return await self._read(("integrations",), self.inner.get_integrations)
+
+    async def get_integrations_json(self, fields: Fields = None) -> JsonBody:
+        return await self._read(("integrations", "json", fields), lambda: self.inner.get_integrations_json(fields))
+
+    async def get_performance(
+        self, start: Optional[str] = None, end: Optional[str] = None, platform: Optional[str] = None
+    ) -> List[PerformanceData]:
+        return await self._read(
+            ("performance", start, end, platform), lambda: self.inner.get_performance(start, end, platform)
+        )
+
+    async def get_performance_json(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        platform: Optional[str] = None,
+        fields: Fields = None,
+    ) -> JsonBody:
+        return await self._read(
+            ("performance", "json", start, end, platform, fields),
+            lambda: self.inner.get_performance_json(start, end, platform, fields),
+        )
+
+    # Uncached reads
+
+    async def get_campaign(self, campaign_id: str) -> Optional[Campaign]:
+        return await self.inner.get_campaign(campaign_id)
+
+    async def query_campaigns(
+        self, query: CampaignQuery, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Page:
+        return await self.inner.query_campaigns(query, limit, cursor)
+
+    async def query_performance(
+        self, query: PerformanceQuery, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Page:
+        return await self.inner.query_performance(query, limit, cursor)
+
+    def iter_performance(
+        self, query: PerformanceQuery, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[List[PerformanceData]]:
+        return self.inner.iter_performance(query, batch_size)
+
+    def iter_performance_columns(
+        self, query: PerformanceQuery, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[Dict[str, Sequence[Any]]]:
+        return self.inner.iter_performance_columns(query, batch_size)
+
+    async def get_performance_rollup(
+        self,
+        grain: RollupGrain,
+        platform: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> List[PerformanceAggregate]:
+        return await self.inner.get_performance_rollup(grain, platform, start, end)
+
+    async def aggregate_performance(
+        self, query: PerformanceQuery, group_by: Optional[PerformanceGroupBy] = None
+    ) -> List[PerformanceAggregate]:
+        return await self.inner.aggregate_performance(query, group_by)
+
+    async def get_compaction_cutoff(self) -> Optional[str]:
+        return await self.inner.get_compaction_cutoff()
+
+    async def get_integration(self, integration_id: str) -> Optional[Integration]:
+        return await self.inner.get_integration(integration_id)
+
+    async def get_change_seq(self) -> int:
+        return await self.inner.get_change_seq()
+
+    async def get_changes(self, since: int, limit: Optional[int] = None) -> List[ChangeEvent]:
+        return await self.inner.get_changes(since, limit)
+
+    async def wait_for_changes(self, since: int, timeout: float) -> bool:
+        return await self.inner.wait_for_changes(since, timeout)
+
+    # Writes
+
+    async def create_campaign(self, campaign: Campaign) -> Campaign:
+        return await self._write("campaigns", self.inner.create_campaign, campaign)
+
+    async def update_campaign(
+        self, campaign_id: str, updates: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Campaign:
+        return await self._write("campaigns", self.inner.update_campaign, campaign_id, updates, expected_version)
+
+    async def delete_campaign(self, campaign_id: str, expected_version: Optional[int] = None) -> bool:
+        return await self._write("campaigns", self.inner.delete_campaign, campaign_id, expected_version)
+
+    async def create_campaigns(self, campaigns: List[Campaign]) -> List[Campaign]:
+        return await self._write("campaigns", self.inner.create_campaigns, campaigns)
+
+    async def update_campaigns(self, updates: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Campaign]]:
+        return await self._write("campaigns", self.inner.update_campaigns, updates)
+
+    async def delete_campaigns(self, campaign_ids: List[str]) -> List[bool]:
+        return await self._write("campaigns", self.inner.delete_campaigns, campaign_ids)
+
+    async def create_performance(self, rows: List[PerformanceData]) -> List[PerformanceData]:
+        return await self._write("performance", self.inner.create_performance, rows)
+
+    async def update_performance(self, row_id: str, updates: Dict[str, Any]) -> PerformanceData:
+        return await self._write("performance", self.inner.update_performance, row_id, updates)
+
+    async def compact_performance(self, before: str, keep_grains: List[RollupGrain]) -> PerformanceCompaction:
+        return await self._write("performance", self.inner.compact_performance, before, keep_grains)
+
+    async def import_performance_columns(self, columns: Dict[str, Sequence[Any]]) -> int:
+        return await self._write("performance", self.inner.import_performance_columns, columns)
+
+    async def upsert_performance_columns(self, columns: Dict[str, Sequence[Any]]) -> Tuple[int, int]:
+        return await self._write("performance", self.inner.upsert_performance_columns, columns)
+
+    async def create_integration(self, integration: Integration) -> Integration:
+        return await self._write("integrations", self.inner.create_integration, integration)
+
+    async def update_integration(
+        self, integration_id: str, updates: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Integration:
+        return await self._write(
+            "integrations", self.inner.update_integration, integration_id, updates, expected_version
+        )
+
+    async def delete_integration(self, integration_id: str, expected_version: Optional[int] = None) -> bool:
+        return await self._write("integrations", self.inner.delete_integration, integration_id, expected_version)
+
+    async def create_integrations(self, integrations: List[Integration]) -> List[Integration]:
+        return await self._write("integrations", self.inner.create_integrations, integrations)
+
+    async def update_integrations(self, updates: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Integration]]:
+        return await self._write("integrations", self.inner.update_integrations, updates)
+
+    async def delete_integrations(self, integration_ids: List[str]) -> List[bool]:
+        return await self._write("integrations", self.inner.delete_integrations, integration_ids)
+
+    async def close(self) -> None:
+        await self.inner.close()
@@ -0,0 +1,131 @@
+"""Incremental CSV parsing for performance data imports.
+
+Uploads are read row by row from a file object and validated in batches
+into the column batches taken by ``IStorage.upsert_performance_columns``,
+so memory stays flat however large the file. The header names the columns:
+``date`` is required, ``platform`` and the metric columns are optional
+(missing metrics are 0) and any other column, such as the ``id`` and
+``created_at`` of an export, is ignored.
+"""
+import csv
+import io
+import math
+from array import array
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence
+
+from performance_store import format_date, parse_date
+
+CSV_BATCH_SIZE = 5000
+
+_COUNT_COLUMNS = ("impressions", "clicks", "conversions")
+_AMOUNT_COLUMNS = ("spend", "revenue")
+
+
+def _header(row: List[str]) -> Dict[str, int]:
+    names = [name.strip().lower() for name in row]
+    if "date" not in names:
+        raise ValueError("CSV import is missing the 'date' column")
+    return {
+        name: names.index(name)
+        for name in ("date", "platform", *_COUNT_COLUMNS, *_AMOUNT_COLUMNS)
+        if name in names
+    }
+
+
+def _count(value: str, name: str, line: int) -> int:
+    if not value:
+        return 0
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"Line {line}: {name} must be an integer, got {value!r}")
+    if number < 0:
+        raise ValueError(f"Line {line}: {name} must not be negative")
+    return number
+
+
+def _amount(value: str, name: str, line: int) -> float:
+    if not value:
+        return 0.0
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"Line {line}: {name} must be a number, got {value!r}")
+    if not math.isfinite(number) or number < 0:
+        raise ValueError(f"Line {line}: {name} must be a non-negative number")
+    return number
+
+
+def _empty_batch() -> Dict[str, Sequence[Any]]:
+    batch: Dict[str, Sequence[Any]] = {"date": array("l"), "platform": []}
+    for name in _COUNT_COLUMNS:
+        batch[name] = array("q")
+    for name in _AMOUNT_COLUMNS:
+        batch[name] = array("d")
+    return batch
+
+
+def read_csv(
+    file: BinaryIO, batch_size: int = CSV_BATCH_SIZE, not_before: Optional[int] = None
+) -> Iterator[Dict[str, Sequence[Any]]]:
+    """Validated column batches of a UTF-8 CSV file; raises ValueError on the first invalid line.
+
+    Dates older than the ``not_before`` ordinal (the storage's compaction cutoff) are invalid.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    try:
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("CSV import is empty")
+        columns = _header(header)
+        width = max(columns.values()) + 1
+        date_index = columns["date"]
+        platform_index = columns.get("platform")
+        # Metrics missing from the header keep their default and are not parsed per row
+        counts = [(name, columns[name]) for name in _COUNT_COLUMNS if name in columns]
+        amounts = [(name, columns[name]) for name in _AMOUNT_COLUMNS if name in columns]
+        absent = [name for name in (*_COUNT_COLUMNS, *_AMOUNT_COLUMNS) if name not in columns]
+        batch = _empty_batch()
+        for row in reader:
+            if not any(row):
+                continue  # blank line
+            line = reader.line_num
+            if len(row) < width:
+                row += [""] * (width - len(row))
+            try:
+                ordinal = parse_date(row[date_index].strip())
+            except ValueError as e:
+                raise ValueError(f"Line {line}: {e}")
+            if not_before is not None and ordinal < not_before:
+                raise ValueError(
+                    f"Line {line}: rows dated before {format_date(not_before)} have been compacted "
+                    "into rollups and cannot be upserted"
+                )
+            batch["date"].append(ordinal)
+            batch["platform"].append(row[platform_index].strip() or None if platform_index is not None else None)
+            for name, index in counts:
+                batch[name].append(_count(row[index].strip(), name, line))
+            for name, index in amounts:
+                batch[name].append(_amount(row[index].strip(), name, line))
+            for name in absent:
+                batch[name].append(0)
+            if len(batch["date"]) >= batch_size:
+                yield batch
+                batch = _empty_batch()
+        if batch["date"]:
+            yield batch
+    except UnicodeDecodeError as e:
+        raise ValueError(f"CSV import is not valid UTF-8: {e}")
+    except csv.Error as e:
+        raise ValueError(f"Line {reader.line_num}: {e}")
+    finally:
+        # Leave the upload's file open for the caller
+        text.detach()
+
+
+def validate_csv(file: BinaryIO, not_before: Optional[int] = None) -> int:
+    """Check every line of a CSV file without keeping it; returns the row count and rewinds."""
+    rows = sum(len(batch["date"]) for batch in read_csv(file, not_before=not_before))
+    file.seek(0)
+    return rows
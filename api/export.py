@@ -0,0 +1,65 @@
+"""Streaming encoders for performance data exports.
+
+Each encoder turns storage batches into byte chunks for a ``StreamingResponse``;
+one chunk per batch, so memory stays flat however many rows are exported.
+CSV and NDJSON read the row batches of ``IStorage.iter_performance``; Arrow
+and Parquet (see arrow_io) read the column batches of
+``IStorage.iter_performance_columns``.
+"""
+import csv
+import io
+from typing import AsyncIterator, List
+
+from arrow_io import ARROW_STREAM_MEDIA_TYPE, PARQUET_BATCH_SIZE, PARQUET_MEDIA_TYPE, arrow_stream_chunks, parquet_chunks
+from models import ExportFormat, PerformanceData
+from storage import EXPORT_BATCH_SIZE
+
+EXPORT_COLUMNS = (
+    "id", "date", "platform", "impressions", "clicks", "conversions", "spend", "revenue", "created_at",
+)
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.ARROW: ARROW_STREAM_MEDIA_TYPE,
+    ExportFormat.PARQUET: PARQUET_MEDIA_TYPE,
+}
+
+# Formats encoded from column batches, with the batch size to read them in
+COLUMNAR_FORMATS = {
+    ExportFormat.ARROW: EXPORT_BATCH_SIZE,
+    ExportFormat.PARQUET: PARQUET_BATCH_SIZE,
+}
+
+
+async def csv_chunks(batches: AsyncIterator[List[PerformanceData]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    async for rows in batches:
+        writer.writerows(
+            (
+                row.id, row.date, row.platform or "", row.impressions, row.clicks, row.conversions,
+                row.spend, row.revenue, row.created_at.isoformat() if row.created_at else "",
+            )
+            for row in rows
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header of an export without rows
+        yield buffer.getvalue().encode()
+
+
+async def ndjson_chunks(batches: AsyncIterator[List[PerformanceData]]) -> AsyncIterator[bytes]:
+    async for rows in batches:
+        yield b"".join(row.model_dump_json().encode() + b"\n" for row in rows)
+
+
+ENCODERS = {
+    ExportFormat.CSV: csv_chunks,
+    ExportFormat.NDJSON: ndjson_chunks,
+    ExportFormat.ARROW: arrow_stream_chunks,
+    ExportFormat.PARQUET: parquet_chunks,
+}
@@ -1,16 +1,38 @@
-from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi import FastAPI, HTTPException, Depends, File, Header, Query, Request, Response, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, RedirectResponse
-from pydantic import BaseModel
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from typing import List, Optional
+from functools import partial
 import os
+import asyncio
+import tempfile
+import time
 from datetime import datetime
 import uvicorn
 
 # Import our data models and storage
-from models import Campaign, Metric, Integration, PerformanceData
-from storage import get_storage, IStorage
+from models import (
+    Campaign, Metric, Integration, PerformanceData, CampaignStatus,
+    CampaignQuery, PerformanceQuery, CampaignSortField, PerformanceSortField, SortDirection,
+    BulkResult, UpdateCampaignRequest, UpdateIntegrationRequest,
+    PerformanceGroupBy, PerformanceAggregate, RollupGrain, ChangeEvent, ExportFormat, ImportResult,
+    BatchRequest, BatchResponse,
+)
+from performance_store import parse_date
+from storage import (
+    get_storage, open_storages, close_storages, IStorage, VersionConflictError, ChangeFeedGapError,
+    UnknownClientError, DEFAULT_CLIENT_ID, CLIENT_ID_PATTERN, JsonBody, Fields, campaigns_json, performance_json,
+    dump_fields,
+)
+from cache import CachedStorage
+from retention import create_compactor
+from export import ENCODERS as EXPORT_ENCODERS, MEDIA_TYPES as EXPORT_MEDIA_TYPES, COLUMNAR_FORMATS
+import arrow_io
+import csv_import
+from bulk import read_bulk_items, bulk_create, bulk_update, bulk_delete
+from batch import run_batch
+from static_files import PrecompressedStaticFiles, IndexPage
 from google_analytics import ga_service
 
 app = FastAPI(title="PerformanceCore API", version="1.0.0")
@@ -22,52 +44,472 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
-# Serve static files (React build)
+# Page size used when a cursor is sent without an explicit limit
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Parquet import bodies are spooled to disk above this size
+IMPORT_SPOOL_SIZE = 64 * 1024 * 1024
+
+# Change streams send a comment after this many idle seconds so proxies keep the connection open
+CHANGE_STREAM_KEEPALIVE = 15.0
+CHANGE_STREAM_BATCH = 500
+
+# Background retention compaction; None unless PERFORMANCE_RETENTION_MONTHS is set
+compactor = create_compactor(open_storages)
+
+# Serve static files (React build): hashed assets are cached for good, index.html is held in memory
 if os.path.exists("dist"):
-    app.mount("/assets", StaticFiles(directory="dist/assets"), name="assets")
+    app.mount("/assets", PrecompressedStaticFiles(directory="dist/assets"), name="assets")
+index_page = IndexPage("dist/index.html")
 
 # API Routes
+def get_client_storage(
+    x_client_id: str = Header(DEFAULT_CLIENT_ID, description=f"Client id matching {CLIENT_ID_PATTERN}")
+) -> IStorage:
+    """Storage partition of the client named by the X-Client-Id header.
+
+    Malformed ids get a 400 and clients without a partition (not provisioned,
+    or over the partition limit) a 403. The header is not authenticated here;
+    whatever sits in front of the API has to make sure callers can only send
+    their own client id.
+    """
+    try:
+        return get_storage(x_client_id)
+    except UnknownClientError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Serializers for the trusted responses below, built once
+aggregates_json = TypeAdapter(List[PerformanceAggregate])
+changes_json = TypeAdapter(List[ChangeEvent])
+
+def _trusted_json(adapter: TypeAdapter, value, headers: Optional[dict] = None, fields: Fields = None) -> Response:
+    """Encode storage output straight to JSON bytes with pydantic-core.
+
+    Routes opt in for values storage built from already-validated data: returning
+    a Response skips FastAPI's response_model re-validation and jsonable_encoder
+    pass. The route keeps its response_model for the OpenAPI schema.
+    """
+    return Response(content=dump_fields(adapter, value, fields), media_type="application/json", headers=headers)
+
+def _performance_query(**filters) -> PerformanceQuery:
+    """PerformanceQuery of a route's filters; dates are parsed and normalized here, so bad ones are a 400 on every backend."""
+    try:
+        return PerformanceQuery(**filters)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.errors(include_url=False, include_context=False))
+
+async def _paginate(
+    fetch_page, adapter: TypeAdapter, limit: Optional[int], cursor: Optional[str], fields: Fields = None
+) -> Response:
+    if limit is None and cursor is not None:
+        limit = DEFAULT_PAGE_SIZE
+    try:
+        items, next_cursor = await fetch_page(limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _trusted_json(adapter, items, {"X-Next-Cursor": next_cursor} if next_cursor else None, fields)
+
+def _fields_query(model):
+    """Dependency parsing a ``fields`` query (comma-separated names of ``model``) into storage's field order.
+
+    None when absent or naming every field, so the full cached body is served.
+    """
+    names = tuple(model.model_fields)
+
+    def parse(
+        fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(names)}"),
+    ) -> Fields:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        if not requested:
+            raise HTTPException(status_code=400, detail="fields must name at least one field")
+        unknown = requested.difference(names)
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown fields {', '.join(sorted(unknown))}; choose from {', '.join(names)}"
+            )
+        selected = tuple(name for name in names if name in requested)
+        return None if len(selected) == len(names) else selected
+
+    return parse
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored, "*" matches anything."""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def _json_response(cached: JsonBody, if_none_match: Optional[str] = None) -> Response:
+    # Storage hands back serialized list bodies with their ETags (cached when
+    # CachedStorage is on), so they skip response_model validation and re-serialization.
+    # no-cache makes clients revalidate every time, which costs a 304 while nothing changed
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+def _etag(record) -> str:
+    return f'"{record.version}"'
+
+def _if_match_version(if_match: Optional[str]) -> Optional[int]:
+    """Expected record version from an If-Match header; None when absent or "*"."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.strip()
+    # If-Match uses strong comparison, so weak or malformed tags can never match
+    if not (len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit()):
+        raise HTTPException(status_code=412, detail=f"If-Match {if_match!r} does not match the current version")
+    return int(tag[1:-1])
+
+async def _conditional_write(write, *args):
+    try:
+        return await write(*args)
+    except VersionConflictError as e:
+        raise HTTPException(status_code=412, detail=str(e))
+    except ValidationError as e:
+        # The update would leave the record invalid
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+async def _conditional_delete(delete, record_id: str, if_match: Optional[str]) -> bool:
+    """Delete honouring If-Match; the precondition fails (412) when the record does not exist."""
+    deleted = await _conditional_write(delete, record_id, _if_match_version(if_match))
+    if not deleted and if_match is not None:
+        raise HTTPException(status_code=412, detail=f"If-Match {if_match!r} given, but {record_id} does not exist")
+    return deleted
+
 @app.get("/api/campaigns", response_model=List[Campaign])
-async def get_campaigns(storage: IStorage = Depends(get_storage)):
-    return await storage.get_campaigns()
+async def get_campaigns(
+    platform: Optional[str] = Query(None),
+    status: Optional[CampaignStatus] = Query(None),
+    type: Optional[str] = Query(None),
+    min_spend: Optional[float] = Query(None, ge=0),
+    sort_by: Optional[CampaignSortField] = Query(None),
+    sort_dir: SortDirection = Query(SortDirection.ASC),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    fields: Fields = Depends(_fields_query(Campaign)),
+    if_none_match: Optional[str] = Header(None),
+    storage: IStorage = Depends(get_client_storage)
+):
+    """List campaigns, filtered and sorted in storage; with limit/cursor returns one page and sets X-Next-Cursor.
+
+    ``fields`` limits each campaign to the named fields. The unfiltered list
+    carries an ETag and answers a matching If-None-Match with 304.
+    """
+    query = CampaignQuery(
+        platform=platform, status=status, type=type, min_spend=min_spend,
+        sort_by=sort_by, sort_dir=sort_dir
+    )
+    if limit is None and cursor is None and query == CampaignQuery():
+        return _json_response(await storage.get_campaigns_json(fields), if_none_match)
+    return await _paginate(partial(storage.query_campaigns, query), campaigns_json, limit, cursor, fields)
 
 @app.post("/api/campaigns", response_model=Campaign)
-async def create_campaign(campaign: Campaign, storage: IStorage = Depends(get_storage)):
+async def create_campaign(campaign: Campaign, storage: IStorage = Depends(get_client_storage)):
     return await storage.create_campaign(campaign)
 
+# Bulk routes are registered before the /{campaign_id} routes so "bulk" is not taken as an id
+@app.post("/api/campaigns/bulk", response_model=BulkResult)
+async def bulk_create_campaigns(request: Request, storage: IStorage = Depends(get_client_storage)):
+    """Create campaigns from a JSON array or NDJSON body, with one result per item"""
+    return await bulk_create(await read_bulk_items(request), Campaign, storage.create_campaigns)
+
+@app.patch("/api/campaigns/bulk", response_model=BulkResult)
+async def bulk_update_campaigns(request: Request, storage: IStorage = Depends(get_client_storage)):
+    """Apply [{"id": ..., <fields>}] updates in one pass, with one result per item"""
+    return await bulk_update(await read_bulk_items(request), UpdateCampaignRequest, storage.update_campaigns)
+
+@app.delete("/api/campaigns/bulk", response_model=BulkResult)
+async def bulk_delete_campaigns(request: Request, storage: IStorage = Depends(get_client_storage)):
+    """Delete the campaigns whose ids are listed in the body"""
+    return await bulk_delete(await read_bulk_items(request), storage.delete_campaigns)
+
+@app.get("/api/campaigns/{campaign_id}", response_model=Campaign)
+async def get_campaign(campaign_id: str, response: Response, storage: IStorage = Depends(get_client_storage)):
+    campaign = await storage.get_campaign(campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail=f"Campaign with id {campaign_id} not found")
+    response.headers["ETag"] = _etag(campaign)
+    return campaign
+
 @app.patch("/api/campaigns/{campaign_id}")
-async def update_campaign(campaign_id: str, updates: dict, storage: IStorage = Depends(get_storage)):
-    return await storage.update_campaign(campaign_id, updates)
+async def update_campaign(
+    campaign_id: str,
+    updates: UpdateCampaignRequest,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    storage: IStorage = Depends(get_client_storage)
+):
+    """Update a campaign; with If-Match the update only applies at that version (412 otherwise)"""
+    campaign = await _conditional_write(
+        storage.update_campaign, campaign_id, updates.model_dump(exclude_unset=True), _if_match_version(if_match)
+    )
+    response.headers["ETag"] = _etag(campaign)
+    return campaign
 
 @app.delete("/api/campaigns/{campaign_id}")
-async def delete_campaign(campaign_id: str, storage: IStorage = Depends(get_storage)):
-    return await storage.delete_campaign(campaign_id)
+async def delete_campaign(
+    campaign_id: str,
+    if_match: Optional[str] = Header(None),
+    storage: IStorage = Depends(get_client_storage)
+):
+    return await _conditional_delete(storage.delete_campaign, campaign_id, if_match)
 
 @app.get("/api/metrics", response_model=List[Metric])
-async def get_metrics(storage: IStorage = Depends(get_storage)):
-    return await storage.get_metrics()
+async def get_metrics(
+    fields: Fields = Depends(_fields_query(Metric)),
+    if_none_match: Optional[str] = Header(None),
+    storage: IStorage = Depends(get_client_storage)
+):
+    return _json_response(await storage.get_metrics_json(fields), if_none_match)
 
 @app.get("/api/performance", response_model=List[PerformanceData])
-async def get_performance(storage: IStorage = Depends(get_storage)):
-    return await storage.get_performance()
+async def get_performance(
+    platform: Optional[str] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    min_spend: Optional[float] = Query(None, ge=0),
+    sort_by: Optional[PerformanceSortField] = Query(None),
+    sort_dir: SortDirection = Query(SortDirection.ASC),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    fields: Fields = Depends(_fields_query(PerformanceData)),
+    if_none_match: Optional[str] = Header(None),
+    storage: IStorage = Depends(get_client_storage)
+):
+    """List performance rows, filtered and sorted in storage; with limit/cursor returns one page and sets X-Next-Cursor.
+
+    ``fields`` limits each row to the named fields. Plain date-window reads
+    carry an ETag and answer a matching If-None-Match with 304.
+    """
+    query = _performance_query(
+        platform=platform, start_date=start_date, end_date=end_date, min_spend=min_spend,
+        sort_by=sort_by, sort_dir=sort_dir
+    )
+    if limit is None and cursor is None and min_spend is None and sort_by is None:
+        # Plain date-window reads go straight to the storage's date index
+        try:
+            return _json_response(
+                await storage.get_performance_json(query.start_date, query.end_date, platform, fields), if_none_match
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return await _paginate(partial(storage.query_performance, query), performance_json, limit, cursor, fields)
+
+@app.get("/api/performance/aggregate", response_model=List[PerformanceAggregate])
+async def aggregate_performance(
+    group_by: Optional[PerformanceGroupBy] = Query(None),
+    platform: Optional[str] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    min_spend: Optional[float] = Query(None, ge=0),
+    storage: IStorage = Depends(get_client_storage)
+):
+    """Totals of the performance metrics, overall or grouped by platform or date"""
+    query = _performance_query(platform=platform, start_date=start_date, end_date=end_date, min_spend=min_spend)
+    try:
+        return _trusted_json(aggregates_json, await storage.aggregate_performance(query, group_by))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/performance/rollup", response_model=List[PerformanceAggregate])
+async def get_performance_rollup(
+    grain: RollupGrain = Query(RollupGrain.DAY),
+    platform: Optional[str] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    storage: IStorage = Depends(get_client_storage)
+):
+    """Pre-aggregated daily/weekly/monthly totals, overall or for one platform"""
+    query = _performance_query(platform=platform, start_date=start_date, end_date=end_date)
+    try:
+        return _trusted_json(
+            aggregates_json, await storage.get_performance_rollup(grain, platform, query.start_date, query.end_date)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _require_pyarrow():
+    if arrow_io.pa is None:
+        raise HTTPException(status_code=501, detail="Arrow and Parquet support needs pyarrow installed")
+
+async def _prepend(first, rest):
+    if first is not None:
+        yield first
+    async for item in rest:
+        yield item
+
+@app.get("/api/performance/export")
+async def export_performance(
+    format: ExportFormat = Query(ExportFormat.CSV),
+    platform: Optional[str] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    min_spend: Optional[float] = Query(None, ge=0),
+    sort_by: Optional[PerformanceSortField] = Query(None),
+    sort_dir: SortDirection = Query(SortDirection.ASC),
+    storage: IStorage = Depends(get_client_storage)
+):
+    """Stream matching performance rows as CSV, NDJSON, an Arrow IPC stream or Parquet, one storage batch at a time"""
+    query = _performance_query(
+        platform=platform, start_date=start_date, end_date=end_date, min_spend=min_spend,
+        sort_by=sort_by, sort_dir=sort_dir
+    )
+    if format in COLUMNAR_FORMATS:
+        _require_pyarrow()
+        batches = storage.iter_performance_columns(query, COLUMNAR_FORMATS[format])
+    else:
+        batches = storage.iter_performance(query)
+    # Reading the first batch up front turns bad filters into a 400 instead of a broken stream
+    try:
+        first = await anext(batches, None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        EXPORT_ENCODERS[format](_prepend(first, batches)),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="performance.{format.value}"'},
+    )
+
+@app.post("/api/performance/import/parquet", response_model=ImportResult)
+async def import_performance_parquet(request: Request, storage: IStorage = Depends(get_client_storage)):
+    """Bulk-load performance rows from a Parquet file body (date, platform and metric columns).
+
+    The whole file is validated before any row is stored.
+    """
+    _require_pyarrow()
+    started = time.perf_counter()
+    # Parquet keeps its metadata at the end of the file, so the body is spooled first
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE) as body:
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+        try:
+            await asyncio.to_thread(arrow_io.validate_parquet, body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        rows = 0
+        batches = arrow_io.read_parquet(body)
+        while True:
+            columns = await asyncio.to_thread(next, batches, None)
+            if columns is None:
+                break
+            rows += await storage.import_performance_columns(columns)
+    seconds = time.perf_counter() - started
+    return ImportResult(rows=rows, inserted=rows, seconds=seconds, rows_per_second=rows / seconds if seconds else 0.0)
+
+@app.post("/api/performance/import/csv", response_model=ImportResult)
+async def import_performance_csv(file: UploadFile = File(...), storage: IStorage = Depends(get_client_storage)):
+    """Upsert performance rows from a multipart CSV upload, keyed by date and platform.
+
+    Re-uploading a file replaces the rows it wrote earlier instead of
+    duplicating them. The whole file is validated before any row is stored,
+    including against the compaction cutoff; compactions started during the
+    upload wait for it. Only a compaction run by another worker process
+    against a shared database can still reject a later batch (400) after
+    earlier ones were stored.
+    """
+    started = time.perf_counter()
+    result = ImportResult()
+    # Compactions in this process wait for the upload, so the cutoff the file
+    # is validated against still holds for its last batch
+    async with storage.performance_lock:
+        # Rows older than the retention cutoff were folded into the rollups, so they cannot be replaced
+        cutoff = await storage.get_compaction_cutoff()
+        not_before = parse_date(cutoff) if cutoff else None
+        # The multipart parser has already spooled the upload to a temporary file
+        try:
+            await asyncio.to_thread(csv_import.validate_csv, file.file, not_before)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        batches = csv_import.read_csv(file.file)
+        while True:
+            columns = await asyncio.to_thread(next, batches, None)
+            if columns is None:
+                break
+            try:
+                inserted, updated = await storage.upsert_performance_columns(columns)
+            except ValueError as e:
+                # Only a compaction by another process can still get here
+                raise HTTPException(status_code=400, detail=str(e))
+            result.rows += len(columns["date"])
+            result.inserted += inserted
+            result.updated += updated
+    result.seconds = time.perf_counter() - started
+    result.rows_per_second = result.rows / result.seconds if result.seconds else 0.0
+    return result
 
 @app.get("/api/integrations", response_model=List[Integration])
-async def get_integrations(storage: IStorage = Depends(get_storage)):
-    return await storage.get_integrations()
+async def get_integrations(
+    fields: Fields = Depends(_fields_query(Integration)),
+    if_none_match: Optional[str] = Header(None),
+    storage: IStorage = Depends(get_client_storage)
+):
+    return _json_response(await storage.get_integrations_json(fields), if_none_match)
 
 @app.post("/api/integrations", response_model=Integration)
-async def create_integration(integration: Integration, storage: IStorage = Depends(get_storage)):
+async def create_integration(integration: Integration, storage: IStorage = Depends(get_client_storage)):
     return await storage.create_integration(integration)
 
+@app.post("/api/integrations/bulk", response_model=BulkResult)
+async def bulk_create_integrations(request: Request, storage: IStorage = Depends(get_client_storage)):
+    """Create integrations from a JSON array or NDJSON body, with one result per item"""
+    return await bulk_create(await read_bulk_items(request), Integration, storage.create_integrations)
+
+@app.patch("/api/integrations/bulk", response_model=BulkResult)
+async def bulk_update_integrations(request: Request, storage: IStorage = Depends(get_client_storage)):
+    """Apply [{"id": ..., <fields>}] updates in one pass, with one result per item"""
+    return await bulk_update(
+        await read_bulk_items(request), UpdateIntegrationRequest, storage.update_integrations
+    )
+
+@app.delete("/api/integrations/bulk", response_model=BulkResult)
+async def bulk_delete_integrations(request: Request, storage: IStorage = Depends(get_client_storage)):
+    """Delete the integrations whose ids are listed in the body"""
+    return await bulk_delete(await read_bulk_items(request), storage.delete_integrations)
+
+@app.get("/api/integrations/{integration_id}", response_model=Integration)
+async def get_integration(integration_id: str, response: Response, storage: IStorage = Depends(get_client_storage)):
+    integration = await storage.get_integration(integration_id)
+    if integration is None:
+        raise HTTPException(status_code=404, detail=f"Integration with id {integration_id} not found")
+    response.headers["ETag"] = _etag(integration)
+    return integration
+
 @app.patch("/api/integrations/{integration_id}")
-async def update_integration(integration_id: str, updates: dict, storage: IStorage = Depends(get_storage)):
-    return await storage.update_integration(integration_id, updates)
+async def update_integration(
+    integration_id: str,
+    updates: UpdateIntegrationRequest,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    storage: IStorage = Depends(get_client_storage)
+):
+    """Update an integration; with If-Match the update only applies at that version (412 otherwise)"""
+    integration = await _conditional_write(
+        storage.update_integration, integration_id, updates.model_dump(exclude_unset=True),
+        _if_match_version(if_match),
+    )
+    response.headers["ETag"] = _etag(integration)
+    return integration
 
 @app.delete("/api/integrations/{integration_id}")
-async def delete_integration(integration_id: str, storage: IStorage = Depends(get_storage)):
-    return await storage.delete_integration(integration_id)
+async def delete_integration(
+    integration_id: str,
+    if_match: Optional[str] = Header(None),
+    storage: IStorage = Depends(get_client_storage)
+):
+    return await _conditional_delete(storage.delete_integration, integration_id, if_match)
 
 # Google Analytics OAuth endpoints
 @app.get("/api/auth/google/url")
@@ -140,6 +582,102 @@ async def get_analytics_campaigns(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/api/batch", response_model=BatchResponse)
+async def batch_requests(
+    batch: BatchRequest,
+    x_client_id: str = Header(DEFAULT_CLIENT_ID),
+    storage: IStorage = Depends(get_client_storage)
+):
+    """Run up to 20 GET requests concurrently in one round trip, e.g. every list a dashboard loads.
+
+    Each response carries the status, headers and JSON body the direct call
+    would have returned. All of them reflect the change-feed position ``seq``
+    unless ``consistent`` is false, which happens when writes kept landing
+    while the batch ran; replaying the change feed after ``seq`` then
+    brings every response up to date.
+    """
+    return Response(content=await run_batch(app, batch, storage, x_client_id), media_type="application/json")
+
+@app.get("/api/cache/stats")
+async def get_cache_stats(storage: IStorage = Depends(get_client_storage)):
+    """Hit/miss/eviction counters of the storage read cache"""
+    if not isinstance(storage, CachedStorage):
+        raise HTTPException(status_code=404, detail="Storage cache is disabled (STORAGE_CACHE_SIZE is 0 or unset for the memory backend)")
+    return storage.stats()
+
+@app.get("/api/retention/stats")
+async def get_retention_stats():
+    """Retention policy and counters of the background performance compaction"""
+    if compactor is None:
+        raise HTTPException(status_code=404, detail="Retention is disabled (PERFORMANCE_RETENTION_MONTHS unset)")
+    return compactor.stats()
+
+# Change feed
+@app.get("/api/changes", response_model=List[ChangeEvent])
+async def get_changes(
+    since: int = Query(..., ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    storage: IStorage = Depends(get_client_storage)
+):
+    """Mutations after sequence ``since``, oldest first; 410 once they are no longer retained"""
+    try:
+        return _trusted_json(changes_json, await storage.get_changes(since, limit))
+    except ChangeFeedGapError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+
+async def _change_stream(request: Request, storage: IStorage, since: int, collections: Optional[set]):
+    yield "retry: 3000\n\n"
+    while not await request.is_disconnected():
+        try:
+            changes = await storage.get_changes(since, CHANGE_STREAM_BATCH)
+        except ChangeFeedGapError as e:
+            # The client has to reload its data; the stream carries on from the latest change
+            since = e.latest
+            yield f"id: {since}\nevent: reset\ndata: {{\"seq\": {since}}}\n\n"
+            continue
+        if changes:
+            for change in changes:
+                if collections is None or change.collection in collections:
+                    yield f"id: {change.seq}\nevent: change\ndata: {change.model_dump_json()}\n\n"
+            since = changes[-1].seq
+        elif not await storage.wait_for_changes(since, CHANGE_STREAM_KEEPALIVE):
+            yield ": keep-alive\n\n"
+
+@app.get("/api/changes/stream")
+async def stream_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0),
+    collection: Optional[List[str]] = Query(None),
+    last_event_id: Optional[str] = Header(None),
+    storage: IStorage = Depends(get_client_storage)
+):
+    """Server-Sent Events stream of storage mutations.
+
+    Starts after ``since`` (or the Last-Event-ID an EventSource sends on
+    reconnect), otherwise from now. Each mutation is a "change" event; a
+    "reset" event means history was lost and the client should re-fetch.
+    """
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    if since is None:
+        since = await storage.get_change_seq()
+    return StreamingResponse(
+        _change_stream(request, storage, since, set(collection) if collection else None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.on_event("startup")
+async def start_compactor():
+    if compactor is not None:
+        compactor.start()
+
+@app.on_event("shutdown")
+async def close_storage():
+    if compactor is not None:
+        await compactor.stop()
+    await close_storages()
+
 # Health check
 @app.get("/api/health")
 async def health_check():
@@ -147,10 +685,21 @@ async def health_check():
 
 # Serve React app for all other routes
 @app.get("/{path:path}")
-async def serve_react_app(path: str):
-    if os.path.exists("dist/index.html"):
-        return FileResponse("dist/index.html")
-    return {"message": "React app not built yet. Run 'npm run build' first."}
+async def serve_react_app(
+    path: str,
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
+    page = index_page.get(accept_encoding)
+    if page is None:
+        return {"message": "React app not built yet. Run 'npm run build' first."}
+    # index.html names the current asset hashes, so clients revalidate it on every navigation
+    headers = {"ETag": page.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if _etag_matches(if_none_match, page.etag):
+        return Response(status_code=304, headers=headers)
+    if page.encoding:
+        headers["Content-Encoding"] = page.encoding
+    return HTMLResponse(page.body, headers=headers)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=5000, reload=True)
\ No newline at end of file
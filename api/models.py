@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
-from datetime import datetime
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List, Dict, Any
+from datetime import date, datetime
 from enum import Enum
 
 class CampaignStatus(str, Enum):
@@ -14,8 +14,47 @@ class IntegrationStatus(str, Enum):
     DISCONNECTED = "disconnected"
     ERROR = "error"
 
+class SortDirection(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+class CampaignSortField(str, Enum):
+    NAME = "name"
+    TYPE = "type"
+    PLATFORM = "platform"
+    STATUS = "status"
+    IMPRESSIONS = "impressions"
+    CLICKS = "clicks"
+    SPEND = "spend"
+
+class PerformanceGroupBy(str, Enum):
+    PLATFORM = "platform"
+    DATE = "date"
+
+class RollupGrain(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    ARROW = "arrow"  # Arrow IPC stream
+    PARQUET = "parquet"
+
+class PerformanceSortField(str, Enum):
+    DATE = "date"
+    PLATFORM = "platform"
+    IMPRESSIONS = "impressions"
+    CLICKS = "clicks"
+    CONVERSIONS = "conversions"
+    SPEND = "spend"
+    REVENUE = "revenue"
+
 class Campaign(BaseModel):
     id: Optional[str] = None
+    # Owning client (tenant); assigned by the storage partition the record lives in
+    client_id: Optional[str] = None
     name: str = Field(..., min_length=1, max_length=200)
     type: str = Field(..., min_length=1)
     platform: str = Field(..., min_length=1)
@@ -25,41 +64,32 @@ class Campaign(BaseModel):
     status: CampaignStatus = CampaignStatus.ACTIVE
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
-
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    # Bumped by storage on every update; sent back as the ETag for If-Match
+    version: int = Field(default=1, ge=1)
 
 class Metric(BaseModel):
     id: Optional[str] = None
+    client_id: Optional[str] = None
     name: str = Field(..., min_length=1)
     value: str = Field(..., min_length=1)
     change: str = Field(..., min_length=1)
     period: str = Field(default="30d")
     created_at: Optional[datetime] = None
 
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
-
 class Integration(BaseModel):
     id: Optional[str] = None
+    client_id: Optional[str] = None
     platform: str = Field(..., min_length=1)
     status: IntegrationStatus = IntegrationStatus.DISCONNECTED
     api_key: Optional[str] = None
     account_id: Optional[str] = None
     last_sync: Optional[datetime] = None
     created_at: Optional[datetime] = None
-
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    version: int = Field(default=1, ge=1)
 
 class PerformanceData(BaseModel):
     id: Optional[str] = None
+    client_id: Optional[str] = None
     date: str = Field(..., min_length=1)
     impressions: int = Field(default=0, ge=0)
     clicks: int = Field(default=0, ge=0)
@@ -69,11 +99,6 @@ class PerformanceData(BaseModel):
     platform: Optional[str] = None
     created_at: Optional[datetime] = None
 
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
-
 # Request/Response models for API operations
 class CreateCampaignRequest(BaseModel):
     name: str = Field(..., min_length=1, max_length=200)
@@ -83,6 +108,12 @@ class CreateCampaignRequest(BaseModel):
     impressions: int = Field(default=0, ge=0)
     clicks: int = Field(default=0, ge=0)
 
+def _not_null(value):
+    # Update fields are optional to send, but the record fields they set are not nullable
+    if value is None:
+        raise ValueError("may be left out but not set to null")
+    return value
+
 class UpdateCampaignRequest(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=200)
     type: Optional[str] = Field(None, min_length=1)
@@ -92,6 +123,8 @@ class UpdateCampaignRequest(BaseModel):
     clicks: Optional[int] = Field(None, ge=0)
     status: Optional[CampaignStatus] = None
 
+    _required = field_validator("name", "type", "platform", "spend", "impressions", "clicks", "status")(_not_null)
+
 class CreateIntegrationRequest(BaseModel):
     platform: str = Field(..., min_length=1)
     api_key: str = Field(..., min_length=1)
@@ -100,4 +133,105 @@ class CreateIntegrationRequest(BaseModel):
 class UpdateIntegrationRequest(BaseModel):
     status: Optional[IntegrationStatus] = None
     api_key: Optional[str] = Field(None, min_length=1)
-    account_id: Optional[str] = None
\ No newline at end of file
+    account_id: Optional[str] = None
+
+    _required = field_validator("status")(_not_null)
+
+# Query specifications translated by each IStorage backend into index lookups
+class CampaignQuery(BaseModel):
+    platform: Optional[str] = None
+    status: Optional[CampaignStatus] = None
+    type: Optional[str] = None
+    min_spend: Optional[float] = Field(None, ge=0)
+    sort_by: Optional[CampaignSortField] = None
+    sort_dir: SortDirection = SortDirection.ASC
+
+def _iso_date(value):
+    # Backends compare dates as YYYY-MM-DD strings, so other spellings are normalized here
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+
+class PerformanceQuery(BaseModel):
+    platform: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    min_spend: Optional[float] = Field(None, ge=0)
+    sort_by: Optional[PerformanceSortField] = None
+    sort_dir: SortDirection = SortDirection.ASC
+
+    _dates = field_validator("start_date", "end_date")(_iso_date)
+
+class PerformanceAggregate(BaseModel):
+    group: Optional[str] = None
+    rows: int = 0
+    impressions: int = 0
+    clicks: int = 0
+    conversions: int = 0
+    spend: float = 0.0
+    revenue: float = 0.0
+
+class PerformanceCompaction(BaseModel):
+    """Outcome of compacting performance rows dated before ``before`` into their rollups."""
+    before: str
+    keep_grains: List[RollupGrain]
+    rows: int = 0
+    bytes_reclaimed: Optional[int] = None  # None when the backend cannot measure it
+
+class ImportResult(BaseModel):
+    rows: int = 0
+    # Upserting imports split rows into new keys and replaced ones
+    inserted: int = 0
+    updated: int = 0
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+# Bulk endpoints report one result per submitted item, in submission order
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    ok: bool
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    succeeded: int = 0
+    failed: int = 0
+    results: List[BulkItemResult] = []
+
+# /api/batch runs several GET requests in one round trip
+class BatchItem(BaseModel):
+    id: Optional[str] = None  # echoed back to match responses to requests
+    path: str = Field(..., pattern=r'^/api/')  # path and query string, e.g. "/api/campaigns?fields=id,name"
+    headers: Dict[str, str] = {}  # e.g. If-None-Match
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem] = Field(..., min_length=1, max_length=20)
+
+class BatchItemResponse(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str] = {}
+    body: Any = None  # the JSON response, text for other media types, None when empty
+
+class BatchResponse(BaseModel):
+    # Change-feed position read before the requests ran; replaying /api/changes
+    # after it brings the results up to date
+    seq: int
+    # False when writes kept landing on every attempt: the responses may then
+    # reflect different positions after ``seq``
+    consistent: bool = True
+    responses: List[BatchItemResponse]
+
+class ChangeEvent(BaseModel):
+    """One committed mutation in the storage change feed."""
+    seq: int
+    collection: str  # "campaigns", "integrations" or "performance"
+    # "create", "update", "delete", "compact" (id is the cutoff date),
+    # "import" (a bulk-loaded batch of rows; id is its first row id) or
+    # "upsert" (a batch keyed by date and platform; id is its first affected row)
+    op: str
+    id: str
+    record: Optional[Dict[str, Any]] = None  # the record after the change; None for deletes
@@ -0,0 +1,814 @@
+"""Columnar storage for PerformanceData rows.
+
+Each field lives in its own typed ``array`` column (8 bytes per value) instead of
+one pydantic object per row; ``platform`` is dictionary-encoded and dates are
+stored as proleptic Gregorian ordinals. Aggregates run over whole columns and
+use NumPy views of the same buffers when NumPy is installed, falling back to
+plain Python loops otherwise.
+
+Retention compacts the table: rows dated before a cutoff are dropped while
+their totals stay in the rollups (see ``PerformanceColumns.compact``).
+"""
+import bisect
+import functools
+import heapq
+import math
+import sys
+from array import array
+from datetime import date, datetime
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from models import PerformanceData
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; aggregates fall back to pure Python
+    np = None
+
+COUNT_COLUMNS = ("impressions", "clicks", "conversions")
+AMOUNT_COLUMNS = ("spend", "revenue")
+METRIC_COLUMNS = COUNT_COLUMNS + AMOUNT_COLUMNS
+GROUP_KEYS = ("platform", "date")
+
+NO_PLATFORM = -1
+# Rollup key for the all-platforms series
+ALL_PLATFORMS = -2
+
+ROLLUP_GRAINS = ("day", "week", "month")
+
+_NUMPY_DTYPES = {"q": "int64", "l": "int64", "d": "float64"}
+
+_COLUMN_NAMES = (
+    "ids", "dates", "platforms", "impressions", "clicks", "conversions", "spend", "revenue", "created_at",
+)
+# PerformanceData fields stored under another column name
+_FIELD_COLUMNS = {"id": "ids", "date": "dates", "platform": "platforms"}
+
+
+def parse_date(value: str) -> int:
+    """Parse a YYYY-MM-DD string into the ordinal stored in the date column."""
+    try:
+        return date.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+
+
+def format_date(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat()
+
+
+@functools.lru_cache(maxsize=8192)
+def _month_start(ordinal: int) -> int:
+    day = date.fromordinal(ordinal)
+    return date(day.year, day.month, 1).toordinal()
+
+
+def bucket_start(ordinal: int, grain: str) -> int:
+    """Ordinal of the first day of the day/ISO week/month bucket containing ``ordinal``."""
+    if grain == "day":
+        return ordinal
+    if grain == "week":
+        # Ordinal 1 (0001-01-01) is a Monday, so this lands on the ISO week start
+        return ordinal - (ordinal - 1) % 7
+    if grain == "month":
+        return _month_start(ordinal)
+    raise ValueError(f"Unknown rollup grain {grain!r}")
+
+
+class PerformanceRollups:
+    """Running totals per (grain, platform) bucket, maintained as rows change.
+
+    Each bucket holds ``[rows, impressions, clicks, conversions, spend, revenue]``;
+    inserts add a row's metrics and corrections subtract the old values before
+    adding the new ones, so reads cost O(buckets) rather than O(rows).
+    """
+
+    def __init__(self):
+        self.series: Dict[Tuple[str, int], Dict[int, List[float]]] = {}
+
+    def apply(self, ordinal: int, code: int, metrics: Sequence[float], sign: int = 1) -> None:
+        for grain in ROLLUP_GRAINS:
+            start = bucket_start(ordinal, grain)
+            for key in ((grain, code), (grain, ALL_PLATFORMS)):
+                buckets = self.series.setdefault(key, {})
+                totals = buckets.get(start)
+                if totals is None:
+                    totals = buckets[start] = [0, 0, 0, 0, 0.0, 0.0]
+                totals[0] += sign
+                for index, value in enumerate(metrics, 1):
+                    totals[index] += sign * value
+                if totals[0] == 0:
+                    # Drop empty buckets (and any float residue left in them)
+                    del buckets[start]
+
+    def adjust(self, ordinal: int, code: int, deltas: Sequence[float]) -> None:
+        """Add metric deltas for a row corrected in place; its buckets and row counts stay as they are."""
+        for grain in ROLLUP_GRAINS:
+            start = bucket_start(ordinal, grain)
+            for key in ((grain, code), (grain, ALL_PLATFORMS)):
+                totals = self.series[key][start]
+                for index, value in enumerate(deltas, 1):
+                    totals[index] += value
+
+    def read(
+        self, grain: str, code: int = ALL_PLATFORMS, start: Optional[int] = None, end: Optional[int] = None
+    ) -> List[Tuple[int, List[float]]]:
+        """Buckets overlapping [start, end] in date order."""
+        buckets = self.series.get((grain, code), {})
+        low = bucket_start(start, grain) if start is not None else None
+        return sorted(
+            (bucket, totals) for bucket, totals in buckets.items()
+            if (low is None or bucket >= low) and (end is None or bucket <= end)
+        )
+
+    def prune(self, before: int, keep_grains: Iterable[str]) -> int:
+        """Drop buckets of grains not in ``keep_grains`` that end before ``before``; returns how many."""
+        keep_grains = set(keep_grains)
+        removed = 0
+        for (grain, _), buckets in self.series.items():
+            if grain in keep_grains:
+                continue
+            # The bucket containing the cutoff still covers retained rows
+            low = bucket_start(before, grain)
+            for bucket in [bucket for bucket in buckets if bucket < low]:
+                del buckets[bucket]
+                removed += 1
+        return removed
+
+
+class DateIndex:
+    """Row positions ordered by date ordinal, sliced with binary search.
+
+    Rows sharing a date keep insertion order, and in-order appends (the
+    common case for daily syncs) stay O(1).
+    """
+
+    # From this many new rows a batch is sorted and merged instead of inserted row by row
+    _MERGE_THRESHOLD = 1024
+
+    def __init__(self):
+        self.dates = array("l")
+        self.positions = array("q")
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def add(self, ordinal: int, position: int) -> None:
+        index = bisect.bisect_right(self.dates, ordinal)
+        if index == len(self.dates):
+            self.dates.append(ordinal)
+            self.positions.append(position)
+        else:
+            self.dates.insert(index, ordinal)
+            self.positions.insert(index, position)
+
+    def add_many(self, ordinals: Sequence[int], positions: Sequence[int]) -> None:
+        """Index a batch of rows: only the batch is sorted, and only the part of
+        the index dated after the batch's first date is merged with it."""
+        if len(positions) < self._MERGE_THRESHOLD:
+            for ordinal, position in zip(ordinals, positions):
+                self.add(ordinal, position)
+            return
+        # sorted() is stable, so equal dates keep insertion order (and is linear on sorted input)
+        order = sorted(range(len(positions)), key=ordinals.__getitem__)
+        dates = array("l", (ordinals[i] for i in order))
+        batch = array("q", (positions[i] for i in order))
+        start = bisect.bisect_right(self.dates, dates[0])
+        if start < len(self.dates):
+            # heapq.merge takes from the earlier iterable on ties, so indexed rows stay first
+            merged = list(heapq.merge(
+                zip(self.dates[start:], self.positions[start:]), zip(dates, batch), key=itemgetter(0)
+            ))
+            del self.dates[start:]
+            del self.positions[start:]
+            dates = array("l", (date for date, _ in merged))
+            batch = array("q", (position for _, position in merged))
+        self.dates.extend(dates)
+        self.positions.extend(batch)
+
+    def remove(self, ordinal: int, position: int) -> None:
+        low = bisect.bisect_left(self.dates, ordinal)
+        high = bisect.bisect_right(self.dates, ordinal)
+        index = low + self.positions[low:high].index(position)
+        del self.dates[index]
+        del self.positions[index]
+
+    def range(self, start: Optional[int] = None, end: Optional[int] = None) -> array:
+        """Positions of rows dated within [start, end] (either bound optional), in date order."""
+        low = 0 if start is None else bisect.bisect_left(self.dates, start)
+        high = len(self.dates) if end is None else bisect.bisect_right(self.dates, end)
+        return self.positions[low:high]
+
+
+class PerformanceColumns:
+    """Append-only, array-backed table of performance rows.
+
+    Ids are assigned in increasing order, so the id column is sorted and
+    doubles as the storage sequence used for keyset pagination. Positions are
+    stable except across ``compact``, which renumbers the retained rows.
+    """
+
+    def __init__(self, client_id: Optional[str] = None):
+        # Every row in the table belongs to this client, so it is not stored per row
+        self.client_id = client_id
+        self.ids = array("q")
+        self.dates = array("l")
+        self.platforms = array("l")
+        self.impressions = array("q")
+        self.clicks = array("q")
+        self.conversions = array("q")
+        self.spend = array("d")
+        self.revenue = array("d")
+        # Unix timestamps; NaN when the row has no created_at
+        self.created_at = array("d")
+
+        # Dictionary encoding for the platform column
+        self.platform_names: List[str] = []
+        self.platform_codes: Dict[str, int] = {}
+
+        # Date-ordered indexes over all rows and per platform code
+        self.date_index = DateIndex()
+        self.platform_date_indexes: Dict[int, DateIndex] = {}
+        self.rollups = PerformanceRollups()
+
+        self._next_id = 1
+        # Bumped by every in-place correction, so compaction can tell whether
+        # rows it copied were changed underneath it
+        self.corrections = 0
+        # Newest compaction cutoff (ordinal); rows dated before it only live on in the rollups
+        self.compacted_before: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _columns(self) -> Tuple[array, ...]:
+        return (
+            self.ids, self.dates, self.platforms, self.impressions, self.clicks,
+            self.conversions, self.spend, self.revenue, self.created_at,
+        )
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the table and its indexes, including over-allocation."""
+        indexes = [self.date_index, *self.platform_date_indexes.values()]
+        return (
+            sum(sys.getsizeof(column) for column in self._columns())
+            + sum(sys.getsizeof(index.dates) + sys.getsizeof(index.positions) for index in indexes)
+            + sum(sys.getsizeof(name) for name in self.platform_names)
+        )
+
+    # Writes
+
+    def encode_platform(self, platform: Optional[str]) -> int:
+        if platform is None:
+            return NO_PLATFORM
+        code = self.platform_codes.get(platform)
+        if code is None:
+            code = len(self.platform_names)
+            self.platform_names.append(platform)
+            self.platform_codes[platform] = code
+        return code
+
+    def decode_platform(self, code: int) -> Optional[str]:
+        return None if code == NO_PLATFORM else self.platform_names[code]
+
+    def append(self, row: PerformanceData) -> int:
+        """Store ``row`` and return its position; rows without a numeric id get the next free one."""
+        if row.id is not None and row.id.isdigit():
+            row_id = int(row.id)
+        else:
+            row_id = self._next_id
+        self._next_id = max(self._next_id, row_id + 1)
+
+        ordinal = parse_date(row.date)
+        code = self.encode_platform(row.platform)
+        position = len(self.ids)
+        self.ids.append(row_id)
+        self.dates.append(ordinal)
+        self.platforms.append(code)
+        self.impressions.append(row.impressions)
+        self.clicks.append(row.clicks)
+        self.conversions.append(row.conversions)
+        self.spend.append(row.spend)
+        self.revenue.append(row.revenue)
+        self.created_at.append(row.created_at.timestamp() if row.created_at else math.nan)
+        self.date_index.add(ordinal, position)
+        self._platform_index(code).add(ordinal, position)
+        self.rollups.apply(ordinal, code, self._metrics_at(position))
+        return position
+
+    def position_of(self, row_id: str) -> Optional[int]:
+        """Row position for an id, by binary search of the (sorted) id column."""
+        if not row_id.isdigit():
+            return None
+        target = int(row_id)
+        position = bisect.bisect_left(self.ids, target)
+        if position < len(self.ids) and self.ids[position] == target:
+            return position
+        return None
+
+    def replace(self, position: int, row: PerformanceData) -> None:
+        """Correct the row at ``position`` in place, keeping its id, indexes and rollups in step."""
+        old_ordinal = self.dates[position]
+        old_code = self.platforms[position]
+        self.rollups.apply(old_ordinal, old_code, self._metrics_at(position), -1)
+
+        ordinal = parse_date(row.date)
+        code = self.encode_platform(row.platform)
+        if ordinal != old_ordinal or code != old_code:
+            self.date_index.remove(old_ordinal, position)
+            self._platform_index(old_code).remove(old_ordinal, position)
+            self.date_index.add(ordinal, position)
+            self._platform_index(code).add(ordinal, position)
+        self.dates[position] = ordinal
+        self.platforms[position] = code
+        self.impressions[position] = row.impressions
+        self.clicks[position] = row.clicks
+        self.conversions[position] = row.conversions
+        self.spend[position] = row.spend
+        self.revenue[position] = row.revenue
+        self.rollups.apply(ordinal, code, self._metrics_at(position))
+        self.corrections += 1
+
+    def find(self, ordinal: int, platform: Optional[str]) -> Optional[int]:
+        """Position of the newest row with this date and platform, or None."""
+        code = NO_PLATFORM if platform is None else self.platform_codes.get(platform)
+        index = self.platform_date_indexes.get(code)
+        if index is None:
+            return None
+        positions = index.range(ordinal, ordinal)
+        return max(positions) if positions else None
+
+    def set_metrics(self, position: int, metrics: Sequence[float]) -> None:
+        """Overwrite the metrics of the row at ``position``, keeping its rollups in step."""
+        current = self._metrics_at(position)
+        if current == tuple(metrics):
+            return
+        self.rollups.adjust(
+            self.dates[position], self.platforms[position], [new - old for new, old in zip(metrics, current)],
+        )
+        (
+            self.impressions[position], self.clicks[position], self.conversions[position],
+            self.spend[position], self.revenue[position],
+        ) = metrics
+        self.corrections += 1
+
+    def upsert_columns(
+        self,
+        dates: Sequence[int],
+        platforms: Sequence[Optional[str]],
+        impressions: Sequence[int],
+        clicks: Sequence[int],
+        conversions: Sequence[int],
+        spend: Sequence[float],
+        revenue: Sequence[float],
+        created_at: float,
+    ) -> Tuple[List[int], range]:
+        """Write validated column values keyed by (date, platform).
+
+        A key that is already stored has the metrics of its newest row
+        replaced; other keys are appended with ``created_at``. Within the
+        batch the last row for a key wins. Returns the updated positions and
+        the appended ones.
+
+        Raises ValueError, before writing anything, for dates older than the
+        compaction cutoff: their stored rows were folded into the rollups, so
+        they could only be added again, not replaced.
+        """
+        if self.compacted_before is not None and len(dates) and min(dates) < self.compacted_before:
+            raise ValueError(
+                f"Rows dated before {format_date(self.compacted_before)} have been compacted into rollups "
+                f"and cannot be upserted (got {format_date(min(dates))})"
+            )
+        latest: Dict[Tuple[int, Optional[str]], int] = {}
+        for index, key in enumerate(zip(dates, platforms)):
+            latest[key] = index
+        updated = []
+        new = []
+        for (ordinal, platform), index in latest.items():
+            position = self.find(ordinal, platform)
+            if position is None:
+                new.append(index)
+                continue
+            self.set_metrics(position, (
+                impressions[index], clicks[index], conversions[index], spend[index], revenue[index],
+            ))
+            updated.append(position)
+        inserted = self.extend_columns(
+            [dates[i] for i in new], [platforms[i] for i in new], [impressions[i] for i in new],
+            [clicks[i] for i in new], [conversions[i] for i in new], [spend[i] for i in new],
+            [revenue[i] for i in new], [created_at] * len(new),
+        )
+        return updated, inserted
+
+    def _metrics_at(self, position: int) -> Tuple[int, int, int, float, float]:
+        return (
+            self.impressions[position], self.clicks[position], self.conversions[position],
+            self.spend[position], self.revenue[position],
+        )
+
+    def extend(self, rows: Iterable[PerformanceData]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def extend_columns(
+        self,
+        dates: Sequence[int],
+        platforms: Sequence[Optional[str]],
+        impressions: Sequence[int],
+        clicks: Sequence[int],
+        conversions: Sequence[int],
+        spend: Sequence[float],
+        revenue: Sequence[float],
+        created_at: Optional[Sequence[float]] = None,
+    ) -> range:
+        """Append already-validated column values in bulk and return the new positions.
+
+        Dates are ordinals and ``created_at`` holds Unix timestamps; new rows
+        get sequential ids.
+        """
+        count = len(dates)
+        first = len(self)
+        self.ids.extend(range(self._next_id, self._next_id + count))
+        self._next_id += count
+        self.dates.extend(dates)
+        self.platforms.extend(self.encode_platform(platform) for platform in platforms)
+        self.impressions.extend(impressions)
+        self.clicks.extend(clicks)
+        self.conversions.extend(conversions)
+        self.spend.extend(spend)
+        self.revenue.extend(revenue)
+        self.created_at.extend(created_at if created_at is not None else [math.nan] * count)
+        positions = range(first, first + count)
+        self._index_positions(positions)
+        for position in positions:
+            self.rollups.apply(self.dates[position], self.platforms[position], self._metrics_at(position))
+        return positions
+
+    def _platform_index(self, code: int) -> DateIndex:
+        index = self.platform_date_indexes.get(code)
+        if index is None:
+            index = self.platform_date_indexes[code] = DateIndex()
+        return index
+
+    def _index_positions(self, positions: Sequence[int]) -> None:
+        dates = self.dates
+        self.date_index.add_many([dates[i] for i in positions], positions)
+        by_platform: Dict[int, List[int]] = {}
+        for i in positions:
+            by_platform.setdefault(self.platforms[i], []).append(i)
+        for code, platform_positions in by_platform.items():
+            self._platform_index(code).add_many([dates[i] for i in platform_positions], platform_positions)
+
+    # Retention
+
+    def copy(self) -> "PerformanceColumns":
+        """Independent copy (array memcpys plus the rollup totals) that a worker thread can compact."""
+        meta, arrays = self.export_state()
+        meta["rollups"] = [
+            [grain, code, [(bucket, list(totals)) for bucket, totals in buckets]]
+            for grain, code, buckets in meta["rollups"]
+        ]
+        store = PerformanceColumns.from_state(meta, {name: values[:] for name, values in arrays.items()})
+        store.corrections = self.corrections
+        return store
+
+    def compact(self, before: int, keep_grains: Iterable[str]) -> int:
+        """Drop rows dated before ``before`` and the rollup buckets of grains not kept.
+
+        Totals of the dropped rows remain in the kept grains' rollups. Runs in
+        O(rows) without sorting, and returns the number of rows removed.
+        """
+        self.mark_compacted(before)
+        dates = self.dates
+        count = len(self)
+        # Old position -> new position for retained rows
+        remap = array("q", [-1]) * count
+        kept = 0
+        for position in range(count):
+            if dates[position] >= before:
+                remap[position] = kept
+                kept += 1
+        removed = count - kept
+        if removed:
+            for name in _COLUMN_NAMES:
+                column = getattr(self, name)
+                setattr(self, name, array(column.typecode, (
+                    column[position] for position in range(count) if remap[position] >= 0
+                )))
+            # Date indexes are sorted, so the retained rows are exactly their tails
+            for index in (self.date_index, *self.platform_date_indexes.values()):
+                start = bisect.bisect_left(index.dates, before)
+                index.dates = index.dates[start:]
+                index.positions = array("q", (remap[position] for position in index.positions[start:]))
+        self.rollups.prune(before, keep_grains)
+        return removed
+
+    def mark_compacted(self, before: int) -> None:
+        """Record that rows dated before ``before`` have been (or may have been) rolled up and dropped."""
+        if self.compacted_before is None or before > self.compacted_before:
+            self.compacted_before = before
+
+    def append_compacted(self, row: PerformanceData, before: int) -> None:
+        """Append ``row`` as if it had been stored before compacting at ``before``.
+
+        A row older than the cutoff only contributes to the rollups; callers
+        prune them again once all such rows are in.
+        """
+        ordinal = parse_date(row.date)
+        if ordinal >= before:
+            self.append(row)
+            return
+        self._next_id = max(self._next_id, int(row.id) + 1)
+        metrics = (row.impressions, row.clicks, row.conversions, row.spend, row.revenue)
+        self.rollups.apply(ordinal, self.encode_platform(row.platform), metrics)
+
+    # Snapshots
+
+    def export_state(self) -> Tuple[Dict[str, Any], Dict[str, array]]:
+        """JSON-able metadata plus the raw arrays (columns and date indexes) for a snapshot."""
+        arrays: Dict[str, array] = {name: getattr(self, name) for name in _COLUMN_NAMES}
+        arrays["index.all.dates"] = self.date_index.dates
+        arrays["index.all.positions"] = self.date_index.positions
+        for code, index in self.platform_date_indexes.items():
+            arrays[f"index.{code}.dates"] = index.dates
+            arrays[f"index.{code}.positions"] = index.positions
+        meta = {
+            "client_id": self.client_id,
+            "platform_names": self.platform_names,
+            "next_id": self._next_id,
+            "compacted_before": self.compacted_before,
+            "index_codes": list(self.platform_date_indexes),
+            "rollups": [
+                [grain, code, list(buckets.items())]
+                for (grain, code), buckets in self.rollups.series.items()
+            ],
+        }
+        return meta, arrays
+
+    @classmethod
+    def from_state(cls, meta: Dict[str, Any], arrays: Dict[str, array]) -> "PerformanceColumns":
+        store = cls(meta.get("client_id"))
+        for name in _COLUMN_NAMES:
+            setattr(store, name, arrays[name])
+        store.platform_names = list(meta["platform_names"])
+        store.platform_codes = {name: code for code, name in enumerate(store.platform_names)}
+        store._next_id = meta["next_id"]
+        store.compacted_before = meta.get("compacted_before")
+        store.date_index.dates = arrays["index.all.dates"]
+        store.date_index.positions = arrays["index.all.positions"]
+        for code in meta["index_codes"]:
+            index = store._platform_index(code)
+            index.dates = arrays[f"index.{code}.dates"]
+            index.positions = arrays[f"index.{code}.positions"]
+        for grain, code, buckets in meta["rollups"]:
+            store.rollups.series[(grain, code)] = {bucket: totals for bucket, totals in buckets}
+        return store
+
+    # Reads
+
+    def row(self, position: int) -> PerformanceData:
+        created_at = self.created_at[position]
+        # Columns only ever hold validated values, so skip re-validation
+        return PerformanceData.model_construct(
+            id=str(self.ids[position]),
+            client_id=self.client_id,
+            date=format_date(self.dates[position]),
+            impressions=self.impressions[position],
+            clicks=self.clicks[position],
+            conversions=self.conversions[position],
+            spend=self.spend[position],
+            revenue=self.revenue[position],
+            platform=self.decode_platform(self.platforms[position]),
+            created_at=None if math.isnan(created_at) else datetime.fromtimestamp(created_at),
+        )
+
+    def rows(self, positions: Optional[Iterable[int]] = None) -> List[PerformanceData]:
+        if positions is None:
+            positions = range(len(self))
+        return [self.row(position) for position in positions]
+
+    def values(self, positions: Optional[Sequence[int]], fields: Sequence[str]) -> List[Dict[str, Any]]:
+        """Rows at ``positions`` (all when None) as dicts of just the PerformanceData ``fields``.
+
+        Only the requested columns are read and decoded; values serialize
+        like the model's.
+        """
+        if positions is None:
+            positions = range(len(self))
+        columns = [self._field_values(field, positions) for field in fields]
+        return [dict(zip(fields, row)) for row in zip(*columns)]
+
+    def _field_values(self, field: str, positions: Sequence[int]) -> List[Any]:
+        if field == "client_id":
+            return [self.client_id] * len(positions)
+        column = getattr(self, _FIELD_COLUMNS.get(field, field))
+        if isinstance(positions, range) and positions.step == 1:
+            values = column[positions.start:positions.stop]
+        else:
+            values = [column[position] for position in positions]
+        if field == "id":
+            return [str(value) for value in values]
+        if field == "date":
+            # Windows span few distinct days, so each is formatted once
+            formatted = {ordinal: format_date(ordinal) for ordinal in set(values)}
+            return [formatted[ordinal] for ordinal in values]
+        if field == "platform":
+            return [self.decode_platform(code) for code in values]
+        if field == "created_at":
+            return [None if math.isnan(value) else datetime.fromtimestamp(value) for value in values]
+        return values
+
+    def take(self, positions: Sequence[int]) -> Dict[str, Any]:
+        """Column values at ``positions`` as fresh arrays, keyed like a performance column batch.
+
+        Contiguous ranges are sliced with one memcpy per column; platforms
+        are decoded to names.
+        """
+        if isinstance(positions, range) and positions.step == 1:
+            window = slice(positions.start, positions.stop)
+            columns = {name: getattr(self, name)[window] for name in _COLUMN_NAMES}
+        else:
+            columns = {
+                name: array(column.typecode, (column[i] for i in positions))
+                for name, column in ((name, getattr(self, name)) for name in _COLUMN_NAMES)
+            }
+        names = self.platform_names
+        columns["date"] = columns.pop("dates")
+        columns["id"] = columns.pop("ids")
+        columns["platform"] = [None if code == NO_PLATFORM else names[code] for code in columns.pop("platforms")]
+        return columns
+
+    def tail_columns(self, count: int) -> Dict[str, List[Any]]:
+        """The last ``count`` rows as JSON-able ``extend_columns`` arguments, for replaying a bulk load."""
+        columns = self.take(range(len(self) - count, len(self)))
+        return {
+            "dates": columns["date"].tolist(),
+            "platforms": columns["platform"],
+            "impressions": columns["impressions"].tolist(),
+            "clicks": columns["clicks"].tolist(),
+            "conversions": columns["conversions"].tolist(),
+            "spend": columns["spend"].tolist(),
+            "revenue": columns["revenue"].tolist(),
+            "created_at": columns["created_at"].tolist(),
+        }
+
+    def select(
+        self,
+        platform: Optional[str] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        min_spend: Optional[float] = None,
+    ) -> List[int]:
+        """Positions of rows matching the filters (dates as ordinals, both ends inclusive).
+
+        Platform and date filters are answered from the date indexes, so only
+        rows inside the window are touched; positions come back in date order
+        when either is given.
+        """
+        positions: Iterable[int]
+        if platform is not None:
+            code = self.platform_codes.get(platform)
+            if code is None:
+                return []
+            positions = self._platform_index(code).range(start, end)
+        elif start is not None or end is not None:
+            positions = self.date_index.range(start, end)
+        else:
+            positions = range(len(self))
+        if min_spend is not None:
+            spend = self.spend
+            positions = [i for i in positions if spend[i] >= min_spend]
+        return list(positions)
+
+    def match(
+        self,
+        positions: range,
+        platform: Optional[str] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        min_spend: Optional[float] = None,
+    ) -> List[int]:
+        """Positions within a contiguous ``positions`` range that pass the filters, in position order.
+
+        Unlike ``select`` this scans the range instead of using the date
+        indexes, so it can walk the table chunk by chunk in insertion order.
+        """
+        code = None
+        if platform is not None:
+            code = self.platform_codes.get(platform)
+            if code is None:
+                return []
+        if np is not None:
+            window = slice(positions.start, positions.stop)
+            mask = np.ones(len(positions), dtype=bool)
+            if code is not None:
+                mask &= self._view(self.platforms, None)[window] == code
+            dates = self._view(self.dates, None)[window]
+            if start is not None:
+                mask &= dates >= start
+            if end is not None:
+                mask &= dates <= end
+            if min_spend is not None:
+                mask &= self._view(self.spend, None)[window] >= min_spend
+            return (np.flatnonzero(mask) + positions.start).tolist()
+        dates, platforms, spend = self.dates, self.platforms, self.spend
+        return [
+            i for i in positions
+            if (code is None or platforms[i] == code)
+            and (start is None or dates[i] >= start)
+            and (end is None or dates[i] <= end)
+            and (min_spend is None or spend[i] >= min_spend)
+        ]
+
+    # Aggregates
+
+    def _view(self, column: array, positions: Optional[Sequence[int]]):
+        """NumPy view of a column (optionally gathered at ``positions``).
+
+        Views must not outlive the calling method: an array cannot grow while
+        a buffer export is alive.
+        """
+        values = np.frombuffer(column, dtype=_NUMPY_DTYPES[column.typecode])
+        if positions is not None:
+            values = values[np.asarray(positions, dtype=np.int64)]
+        return values
+
+    def sum(self, column: str, positions: Optional[Sequence[int]] = None):
+        values = getattr(self, column)
+        if np is not None:
+            total = self._view(values, positions).sum()
+            return int(total) if column in COUNT_COLUMNS else float(total)
+        if positions is None:
+            return sum(values)
+        return sum(values[i] for i in positions)
+
+    def mean(self, column: str, positions: Optional[Sequence[int]] = None) -> Optional[float]:
+        count = len(self) if positions is None else len(positions)
+        if count == 0:
+            return None
+        return self.sum(column, positions) / count
+
+    def aggregate(
+        self,
+        positions: Optional[Sequence[int]] = None,
+        group_by: Optional[str] = None,
+    ) -> Dict[Optional[str], Dict[str, float]]:
+        """Row count and per-metric sums, overall or grouped by platform/date.
+
+        Returns ``{group key: {"rows": n, "impressions": ..., ...}}``; the key is
+        None for the ungrouped total and for rows without a platform.
+        """
+        if group_by is None:
+            count = len(self) if positions is None else len(positions)
+            totals = {column: self.sum(column, positions) for column in METRIC_COLUMNS}
+            return {None: {"rows": count, **totals}}
+        if group_by not in GROUP_KEYS:
+            raise ValueError(f"Cannot group performance data by {group_by!r}")
+
+        key_column = self.platforms if group_by == "platform" else self.dates
+        if np is not None:
+            groups = self._aggregate_numpy(key_column, positions)
+        else:
+            groups = self._aggregate_python(key_column, positions)
+
+        if group_by == "platform":
+            return {self.decode_platform(code): totals for code, totals in groups}
+        return {format_date(ordinal): totals for ordinal, totals in sorted(groups)}
+
+    def _aggregate_numpy(self, key_column: array, positions: Optional[Sequence[int]]):
+        keys = self._view(key_column, positions)
+        if len(keys) == 0:
+            return []
+        # Platform codes and date ordinals are small dense integers, so an
+        # offset bincount groups them in one linear pass without sorting
+        offset = int(keys.min())
+        buckets = keys - offset
+        counts = np.bincount(buckets)
+        sums = {
+            column: np.bincount(buckets, weights=self._view(getattr(self, column), positions))
+            for column in METRIC_COLUMNS
+        }
+        groups = []
+        for index in np.flatnonzero(counts).tolist():
+            key = index + offset
+            totals = {"rows": int(counts[index])}
+            for column in METRIC_COLUMNS:
+                value = sums[column][index]
+                totals[column] = int(round(value)) if column in COUNT_COLUMNS else float(value)
+            groups.append((key, totals))
+        return groups
+
+    def _aggregate_python(self, key_column: array, positions: Optional[Sequence[int]]):
+        if positions is None:
+            positions = range(len(self))
+        columns = [(column, getattr(self, column)) for column in METRIC_COLUMNS]
+        groups: Dict[int, Dict[str, float]] = {}
+        for i in positions:
+            totals = groups.get(key_column[i])
+            if totals is None:
+                totals = groups[key_column[i]] = {"rows": 0, **{column: 0 for column in METRIC_COLUMNS}}
+            totals["rows"] += 1
+            for column, values in columns:
+                totals[column] += values[i]
+        return list(groups.items())
@@ -0,0 +1,390 @@
+"""Write-ahead log and snapshot persistence for MemoryStorage.
+
+Every committed mutation is appended to ``storage.wal`` as a CRC-framed record
+tagged with a log sequence number (LSN). Every ``snapshot_every`` records
+(and on shutdown) the whole state is written to ``storage.snapshot`` in a
+compact binary format: performance columns, date indexes and rollups are
+stored as raw array bytes, so restoring millions of rows is a handful of
+memcpys. On startup the snapshot is loaded and any log records newer than
+it are replayed.
+
+Periodic snapshots do not block the event loop for the write: the state is
+copied (array memcpys plus the few campaign/integration records), the log is
+rotated to ``storage.wal.prev`` and a worker thread writes the copy, deleting
+the rotated log once the snapshot is durable. Writes meanwhile go to a fresh
+``storage.wal``. Startup replays both logs.
+
+fsync policies:
+    always    fsync after every record (no acknowledged write is ever lost).
+              The fsync runs inline with the write on the event loop, so every
+              write waits for the disk (roughly 0.1 ms on NVMe, several ms on
+              network or spinning disks) and no other request is served meanwhile.
+    interval  fsync at most every ``fsync_interval`` seconds (default)
+    never     leave flushing to the OS
+"""
+import asyncio
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from models import Campaign, Integration, Metric, PerformanceData
+from performance_store import PerformanceColumns, parse_date
+from records import CAMPAIGN_RECORDS, INTEGRATION_RECORDS, METRIC_RECORDS
+from storage import DEFAULT_CLIENT_ID, MemoryStorage
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"PCSNAP1\n"
+_RECORD_HEADER = struct.Struct(">II")  # payload length, crc32
+_SECTION_HEADER = struct.Struct(">HQ")  # name length, payload length
+
+_MODELS = {
+    "campaigns": Campaign,
+    "metrics": Metric,
+    "integrations": Integration,
+    "performance": PerformanceData,
+}
+
+_RECORD_TYPES = {
+    "campaigns": CAMPAIGN_RECORDS,
+    "metrics": METRIC_RECORDS,
+    "integrations": INTEGRATION_RECORDS,
+}
+
+
+class WriteAheadLog:
+    """Append-only file of CRC-framed JSON mutation records."""
+
+    def __init__(self, path: str, fsync: str = "interval", fsync_interval: float = 1.0):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy {fsync!r}, expected one of {FSYNC_POLICIES}")
+        self.path = path
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.records_written = 0
+        self._last_sync = time.monotonic()
+        self._file: Optional[BinaryIO] = None
+
+    @staticmethod
+    def read(path: str) -> Iterator[Tuple[int, List[Any]]]:
+        """Yield ``(end offset, record)`` for each intact record, stopping at a torn or corrupt tail."""
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            offset = 0
+            while True:
+                header = f.read(_RECORD_HEADER.size)
+                if len(header) < _RECORD_HEADER.size:
+                    return
+                length, checksum = _RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    return
+                offset += _RECORD_HEADER.size + length
+                yield offset, json.loads(payload)
+
+    def open(self, valid_length: int) -> None:
+        """Open for appending, discarding anything past the last intact record."""
+        self._file = open(self.path, "ab")
+        self._file.truncate(valid_length)
+        self._file.seek(valid_length)
+
+    def append(self, record: List[Any]) -> None:
+        payload = json.dumps(record, separators=(",", ":")).encode()
+        self._file.write(_RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        self.records_written += 1
+        if self.fsync == "always":
+            self.sync()
+        elif self.fsync == "interval" and time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self) -> None:
+        self._file.flush()
+        if self.fsync != "never":
+            os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+
+    @property
+    def prev_path(self) -> str:
+        return self.path + ".prev"
+
+    def reset(self) -> None:
+        """Drop all records once a snapshot covers them."""
+        self._file.truncate(0)
+        self._file.seek(0)
+        self.sync()
+        self.records_written = 0
+
+    def rotate(self) -> None:
+        """Move the records so far to ``prev_path`` and continue in an empty log."""
+        self.close()
+        os.replace(self.path, self.prev_path)
+        if self.fsync != "never":
+            _fsync_directory(os.path.dirname(self.path))
+        self.open(0)
+        self.records_written = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+
+def _write_section(f: BinaryIO, name: str, payload: bytes) -> None:
+    encoded = name.encode()
+    f.write(_SECTION_HEADER.pack(len(encoded), len(payload)))
+    f.write(encoded)
+    f.write(payload)
+
+
+def _read_sections(path: str) -> Dict[str, bytes]:
+    sections: Dict[str, bytes] = {}
+    with open(path, "rb") as f:
+        if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a storage snapshot")
+        while True:
+            header = f.read(_SECTION_HEADER.size)
+            if not header:
+                return sections
+            name_length, payload_length = _SECTION_HEADER.unpack(header)
+            name = f.read(name_length).decode()
+            sections[name] = f.read(payload_length)
+
+
+class PersistentMemoryStorage(MemoryStorage):
+    """MemoryStorage whose state survives restarts via snapshot + write-ahead log."""
+
+    def __init__(
+        self,
+        data_dir: str,
+        fsync: str = "interval",
+        fsync_interval: float = 1.0,
+        snapshot_every: int = 100000,
+        seed: bool = True,
+        client_id: str = DEFAULT_CLIENT_ID,
+    ):
+        os.makedirs(data_dir, exist_ok=True)
+        self.snapshot_path = os.path.join(data_dir, "storage.snapshot")
+        self.wal = WriteAheadLog(os.path.join(data_dir, "storage.wal"), fsync, fsync_interval)
+        self.snapshot_every = snapshot_every
+        self.lsn = 0
+        # One worker writes background snapshots; the last one submitted, if any
+        self._snapshot_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshot")
+        self._snapshot_task: Optional[Future] = None
+        # Snapshot records and log entries that failed validation on startup and were skipped
+        self.skipped_records = 0
+
+        fresh = not os.path.exists(self.snapshot_path) and not os.path.exists(self.wal.path)
+        # Seed data only for a brand-new data directory; otherwise state comes from disk
+        super().__init__(seed=seed and fresh, client_id=client_id)
+        if os.path.exists(self.snapshot_path):
+            self._load_snapshot()
+        valid_length = self._replay()
+        self.wal.open(valid_length)
+        # The change feed continues from the log position; subscribers from
+        # before the restart get a gap and re-read current state
+        self.change_seq = self.lsn
+        if fresh or os.path.exists(self.wal.prev_path):
+            # A rotated log left over means its snapshot never completed
+            self.snapshot()
+
+    # Mutation logging
+
+    def _record_change(
+        self, collection: str, op: str, record_id: str, record: Optional[Any] = None,
+        batch: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        super()._record_change(collection, op, record_id, record, batch)
+        self.lsn += 1
+        # Reuse the JSON form the change feed just built
+        payload = self.changes[-1].record
+        if op == "import":
+            # The feed only carries a summary of a bulk load; the log needs its rows
+            payload = {**payload, "columns": self.performance.tail_columns(payload["rows"])}
+        elif op == "upsert":
+            payload = {**payload, "batch": {
+                name: values if isinstance(values, float) else list(values) for name, values in batch.items()
+            }}
+        self.wal.append([self.lsn, collection, op, record_id, payload])
+        if self.wal.records_written >= self.snapshot_every:
+            self._start_snapshot()
+
+    def _start_snapshot(self) -> None:
+        if self._snapshot_task is not None and not self._snapshot_task.done():
+            return  # the next write past the threshold tries again
+        if os.path.exists(self.wal.prev_path):
+            # The last background snapshot failed; its rotated log is only covered by a full one
+            self.snapshot()
+            return
+        state = self._freeze()
+        self.wal.rotate()
+        self._snapshot_task = self._snapshot_writer.submit(self._write_snapshot, state, True)
+
+    def _replay(self) -> int:
+        # Records of a rotated log whose snapshot never completed come first
+        for _ in self._replay_log(self.wal.prev_path):
+            pass
+        valid_length = 0
+        for valid_length in self._replay_log(self.wal.path):
+            pass
+        return valid_length
+
+    def _replay_log(self, path: str) -> Iterator[int]:
+        for valid_length, (lsn, collection, op, record_id, payload) in WriteAheadLog.read(path):
+            if lsn > self.lsn:  # otherwise already contained in the snapshot
+                try:
+                    self._apply(collection, op, record_id, payload)
+                except ValidationError as e:
+                    # One bad entry must not keep the store from starting; the rest of the log still applies
+                    self._skip_record(f"log entry {lsn} ({op} {collection}/{record_id})", e)
+                self.lsn = lsn
+            yield valid_length
+
+    def _apply(self, collection: str, op: str, record_id: str, payload: Optional[Dict[str, Any]]) -> None:
+        if op == "compact":
+            # Compaction is deterministic given the log order, so it is simply re-run
+            cutoff = parse_date(payload["before"])
+            self.performance.compact(cutoff, payload["keep_grains"])
+            return
+        if op == "import":
+            self.performance.extend_columns(**payload["columns"])
+            return
+        if op == "upsert":
+            # Upserts only depend on the state before them, so the batch is simply re-applied
+            self.performance.upsert_columns(**payload["batch"])
+            return
+        record = _MODELS[collection].model_validate(payload) if payload is not None else None
+        if collection == "performance":
+            if op == "create":
+                self.performance.append(record)
+            else:
+                position = self.performance.position_of(record_id)
+                if position is not None:
+                    self.performance.replace(position, record)
+            return
+        records = getattr(self, collection)
+        if op == "delete":
+            records.remove(record_id)
+        else:
+            records.add(_RECORD_TYPES[collection].pack(record))
+
+    # Snapshots
+
+    def snapshot(self) -> None:
+        """Write the full state atomically, then truncate the logs it supersedes.
+
+        Blocks until the snapshot is durable; used at startup and shutdown.
+        """
+        if self._snapshot_task is not None:
+            self._snapshot_task.result()
+        self._write_snapshot(self._freeze(), False)
+        self.wal.reset()
+
+    def _freeze(self) -> Dict[str, Any]:
+        """Copy of the state at the current LSN that a worker thread can serialize."""
+        performance_meta, performance_arrays = self.performance.export_state()
+        performance_meta["rollups"] = [
+            [grain, code, [(bucket, list(totals)) for bucket, totals in buckets]]
+            for grain, code, buckets in performance_meta["rollups"]
+        ]
+        return {
+            "lsn": self.lsn,
+            "performance": performance_meta,
+            "arrays": {name: values[:] for name, values in performance_arrays.items()},
+            # Records are updated in place, so they are unpacked into models now
+            **{
+                collection: [
+                    (seq, _RECORD_TYPES[collection].unpack(record))
+                    for seq, record in getattr(self, collection).items_with_seq()
+                ]
+                for collection in ("campaigns", "metrics", "integrations")
+            },
+        }
+
+    def _write_snapshot(self, state: Dict[str, Any], background: bool) -> None:
+        try:
+            tmp_path = self.snapshot_path + ".tmp"
+            arrays = state["arrays"]
+            with open(tmp_path, "wb") as f:
+                f.write(SNAPSHOT_MAGIC)
+                _write_section(f, "meta", json.dumps({
+                    "lsn": state["lsn"],
+                    "created": time.time(),
+                    "performance": state["performance"],
+                    "array_types": {name: values.typecode for name, values in arrays.items()},
+                }).encode())
+                for collection in ("campaigns", "metrics", "integrations"):
+                    records = [[seq, record.model_dump(mode="json")] for seq, record in state[collection]]
+                    _write_section(f, collection, json.dumps(records, separators=(",", ":")).encode())
+                for name, values in arrays.items():
+                    _write_section(f, f"performance.{name}", values.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            _fsync_directory(os.path.dirname(self.snapshot_path))
+            if os.path.exists(self.wal.prev_path):
+                os.remove(self.wal.prev_path)
+        except Exception:
+            if not background:
+                raise
+            # The rotated log stays, so nothing is lost; the next snapshot is taken in full
+            logger.exception("Background snapshot at LSN %s failed", state["lsn"])
+
+    def _load_snapshot(self) -> None:
+        sections = _read_sections(self.snapshot_path)
+        meta = json.loads(sections["meta"])
+        for collection in ("campaigns", "metrics", "integrations"):
+            model = _MODELS[collection]
+            record_type = _RECORD_TYPES[collection]
+            records = getattr(self, collection)
+            for seq, payload in json.loads(sections[collection]):
+                try:
+                    record = model.model_validate(payload)
+                except ValidationError as e:
+                    self._skip_record(f"snapshot record {collection}/{payload.get('id')}", e)
+                    continue
+                records.restore(seq, record_type.pack(record))
+        arrays = {}
+        for name, typecode in meta["array_types"].items():
+            values = array(typecode)
+            values.frombytes(sections[f"performance.{name}"])
+            arrays[name] = values
+        self.performance = PerformanceColumns.from_state(meta["performance"], arrays)
+        self.performance.client_id = self.client_id
+        self.lsn = meta["lsn"]
+
+    def _skip_record(self, description: str, error: ValidationError) -> None:
+        self.skipped_records += 1
+        logger.warning("Skipping invalid %s: %s", description, error)
+
+    async def close(self) -> None:
+        if self._snapshot_task is not None:
+            await asyncio.wrap_future(self._snapshot_task)
+        self.snapshot()
+        self.wal.close()
+        self._snapshot_writer.shutdown()
+
+
+def _fsync_directory(path: str) -> None:
+    # Makes the snapshot rename durable; not supported on every platform
+    try:
+        fd = os.open(path or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
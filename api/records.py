@@ -0,0 +1,101 @@
+"""Compact slotted records for the models MemoryStorage keeps in memory.
+
+A pydantic model instance carries a ``__dict__``, a fields-set ``set`` and a
+48-byte ``datetime`` per timestamp. Storage instead holds one ``__slots__``
+object per record. Timestamps are stored as Unix floats, enum fields as their
+(shared) members, and repeated categorical strings are interned. Models are
+only materialized when a record leaves storage.
+"""
+import sys
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Type, get_args
+
+from pydantic import BaseModel
+
+from models import Campaign, Integration, Metric
+
+
+class RecordType:
+    """Converts between a pydantic model and its slotted storage record."""
+
+    def __init__(self, model: Type[BaseModel], interned: Iterable[str] = ()):
+        self.model = model
+        self.fields = tuple(model.model_fields)
+        self.datetime_fields = frozenset(
+            name for name, field in model.model_fields.items()
+            if datetime in (field.annotation, *get_args(field.annotation))
+        )
+        self.enum_fields: Dict[str, Type[Enum]] = {
+            name: field.annotation
+            for name, field in model.model_fields.items()
+            if isinstance(field.annotation, type) and issubclass(field.annotation, Enum)
+        }
+        self.interned = frozenset(interned)
+        self.record_class = type(f"{model.__name__}Record", (), {"__slots__": self.fields})
+
+    def encode(self, field: str, value: Any) -> Any:
+        """Storage form of a validated field value."""
+        if value is None:
+            return None
+        if field in self.datetime_fields:
+            return value.timestamp() if isinstance(value, datetime) else value
+        if field in self.enum_fields and not isinstance(value, Enum):
+            try:
+                return self.enum_fields[field](value)
+            except ValueError:
+                return value
+        if field in self.interned and isinstance(value, str):
+            return sys.intern(value)
+        return value
+
+    def validate_updates(self, record: Any, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Storage form of ``updates`` to ``record``, validated as part of the record they produce.
+
+        Raises pydantic's ValidationError (a ValueError) when the result would not be a valid model.
+        """
+        values = self._model_values(record)
+        values.update((key, value) for key, value in updates.items() if key in values)
+        validated = self.model.model_validate(values)
+        return {key: self.encode(key, getattr(validated, key)) for key in updates if key in values}
+
+    def pack(self, instance: BaseModel, **overrides: Any) -> Any:
+        record = self.record_class()
+        for field in self.fields:
+            value = overrides[field] if field in overrides else getattr(instance, field)
+            setattr(record, field, self.encode(field, value))
+        return record
+
+    def _model_values(self, record: Any) -> Dict[str, Any]:
+        values = {field: getattr(record, field) for field in self.fields}
+        for field in self.datetime_fields:
+            if isinstance(values[field], float):
+                values[field] = datetime.fromtimestamp(values[field])
+        return values
+
+    def unpack(self, record: Any) -> BaseModel:
+        # Records only ever hold validated values (pack takes a model, updates
+        # go through validate_updates), so skip re-validation
+        return self.model.model_construct(**self._model_values(record))
+
+    def values(self, records: Sequence[Any], fields: Sequence[str]) -> List[Dict[str, Any]]:
+        """Just ``fields`` of each record as plain dicts, for sparse list reads.
+
+        Values serialize like the model's: timestamps come back as datetimes and
+        enum members encode as their values. No model is built.
+        """
+        columns = []
+        for field in fields:
+            column = [getattr(record, field) for record in records]
+            if field in self.datetime_fields:
+                column = [datetime.fromtimestamp(value) if isinstance(value, float) else value for value in column]
+            columns.append(column)
+        return [dict(zip(fields, row)) for row in zip(*columns)]
+
+    def unpack_optional(self, record: Optional[Any]) -> Optional[BaseModel]:
+        return self.unpack(record) if record is not None else None
+
+
+CAMPAIGN_RECORDS = RecordType(Campaign, interned=("client_id", "type", "platform"))
+METRIC_RECORDS = RecordType(Metric, interned=("client_id", "period"))
+INTEGRATION_RECORDS = RecordType(Integration, interned=("client_id", "platform"))
@@ -0,0 +1,129 @@
+"""Retention policy and the background task that compacts old performance data.
+
+Raw performance rows are kept for ``raw_months`` whole months before the
+current one. Older rows are compacted: they are deleted from storage, and
+their totals live on in the rollups of the kept grains (monthly by default).
+Day and week buckets that lie entirely before the cutoff are dropped with
+them.
+
+Configured through the environment:
+    PERFORMANCE_RETENTION_MONTHS       months of raw rows to keep (unset or 0 disables)
+    PERFORMANCE_RETENTION_KEEP_GRAINS  comma-separated rollup grains kept for old data (default "month")
+    PERFORMANCE_COMPACTION_INTERVAL    seconds between compaction runs (default 3600)
+"""
+import asyncio
+import os
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from models import RollupGrain
+from storage import IStorage
+
+
+class RetentionPolicy:
+    def __init__(self, raw_months: int, keep_grains: List[RollupGrain] = (RollupGrain.MONTH,)):
+        if raw_months < 1:
+            raise ValueError("raw_months must be at least 1")
+        self.raw_months = raw_months
+        self.keep_grains = list(keep_grains)
+
+    @classmethod
+    def from_env(cls) -> Optional["RetentionPolicy"]:
+        """Policy from the environment, or None when retention is disabled."""
+        raw_months = int(os.getenv("PERFORMANCE_RETENTION_MONTHS", "0"))
+        if raw_months <= 0:
+            return None
+        grains = os.getenv("PERFORMANCE_RETENTION_KEEP_GRAINS", "month")
+        return cls(raw_months, [RollupGrain(grain.strip()) for grain in grains.split(",") if grain.strip()])
+
+    def cutoff(self, today: Optional[date] = None) -> str:
+        """First retained day: the start of the month ``raw_months`` months before today's."""
+        today = today or date.today()
+        months = today.year * 12 + today.month - 1 - self.raw_months
+        return date(months // 12, months % 12 + 1, 1).isoformat()
+
+    def describe(self) -> Dict[str, Any]:
+        return {"raw_months": self.raw_months, "keep_grains": [grain.value for grain in self.keep_grains]}
+
+
+class PerformanceCompactor:
+    """Runs the retention policy over every open storage partition at a fixed interval."""
+
+    def __init__(
+        self,
+        policy: RetentionPolicy,
+        storages: Callable[[], List[IStorage]],
+        interval: float = 3600.0,
+    ):
+        self.policy = policy
+        self.storages = storages
+        self.interval = interval
+        self.runs = 0
+        self.rows_compacted = 0
+        self.bytes_reclaimed = 0
+        self.errors = 0
+        self.last_cutoff: Optional[str] = None
+        self.last_run_at: Optional[datetime] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "policy": self.policy.describe(),
+            "interval": self.interval,
+            "runs": self.runs,
+            "rows_compacted": self.rows_compacted,
+            "bytes_reclaimed": self.bytes_reclaimed,
+            "errors": self.errors,
+            "last_cutoff": self.last_cutoff,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_duration_seconds": self.last_duration,
+            "last_error": self.last_error,
+        }
+
+    async def run_once(self) -> None:
+        started = time.perf_counter()
+        before = self.policy.cutoff()
+        for storage in self.storages():
+            try:
+                result = await storage.compact_performance(before, self.policy.keep_grains)
+            except Exception as e:
+                # One failing partition must not stop the others or the task
+                self.errors += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                continue
+            self.rows_compacted += result.rows
+            self.bytes_reclaimed += result.bytes_reclaimed or 0
+        self.runs += 1
+        self.last_cutoff = before
+        self.last_run_at = datetime.now()
+        self.last_duration = time.perf_counter() - started
+
+    async def _run(self) -> None:
+        # Partitions open lazily on first request, so the first run waits an interval
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def create_compactor(storages: Callable[[], List[IStorage]]) -> Optional[PerformanceCompactor]:
+    """Compactor configured from the environment, or None when retention is disabled."""
+    policy = RetentionPolicy.from_env()
+    if policy is None:
+        return None
+    return PerformanceCompactor(policy, storages, float(os.getenv("PERFORMANCE_COMPACTION_INTERVAL", "3600")))
@@ -0,0 +1,1038 @@
+import asyncio
+import json
+import math
+import os
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import (
+    BigInteger, Column, DateTime, Float, Index, Integer, MetaData, String, Table, Text,
+    bindparam, cast, create_engine, delete, event, func, insert, inspect, select, text, tuple_, update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from pydantic import BaseModel
+
+from models import (
+    Campaign, Metric, Integration, PerformanceData, CampaignQuery, PerformanceQuery, SortDirection,
+    PerformanceGroupBy, PerformanceAggregate, RollupGrain, PerformanceCompaction, ChangeEvent,
+)
+from performance_store import ROLLUP_GRAINS, bucket_start, format_date, parse_date
+from storage import (
+    CHANGE_LOG_SIZE, DEFAULT_CLIENT_ID, EXPORT_BATCH_SIZE, ChangeFeedGapError, IStorage, Page, VersionConflictError, _index_key,
+    decode_seq_cursor, decode_sorted_cursor, encode_cursor, Fields, JsonBody, json_body, values_json,
+)
+
+metadata = MetaData()
+
+# Every table carries an integer surrogate ``seq`` as primary key so rows keep
+# insertion order (and a cheap clustered key); the public string id stays unique.
+# Rows are partitioned by ``client_id``, which leads every secondary index so a
+# client's queries only touch that client's index ranges.
+campaigns_table = Table(
+    "pc_campaigns", metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=True),
+    Column("id", String(36), nullable=False, unique=True),
+    Column("client_id", String(64), nullable=False, server_default=DEFAULT_CLIENT_ID),
+    Column("name", String(200), nullable=False),
+    Column("type", String(64), nullable=False),
+    Column("platform", String(64), nullable=False),
+    Column("impressions", BigInteger, nullable=False, default=0),
+    Column("clicks", BigInteger, nullable=False, default=0),
+    Column("spend", String(32), nullable=False),
+    Column("status", String(16), nullable=False),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("version", Integer, nullable=False, default=1, server_default="1"),
+    Index("ix_pc_campaigns_client_seq", "client_id", "seq"),
+    Index("ix_pc_campaigns_client_platform", "client_id", "platform"),
+    Index("ix_pc_campaigns_client_status", "client_id", "status"),
+    Index("ix_pc_campaigns_client_type", "client_id", "type"),
+)
+
+metrics_table = Table(
+    "pc_metrics", metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=True),
+    Column("id", String(36), nullable=False, unique=True),
+    Column("client_id", String(64), nullable=False, server_default=DEFAULT_CLIENT_ID),
+    Column("name", String(200), nullable=False),
+    Column("value", String(64), nullable=False),
+    Column("change", String(32), nullable=False),
+    Column("period", String(16), nullable=False),
+    Column("created_at", DateTime),
+    Index("ix_pc_metrics_client_seq", "client_id", "seq"),
+)
+
+integrations_table = Table(
+    "pc_integrations", metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=True),
+    Column("id", String(36), nullable=False, unique=True),
+    Column("client_id", String(64), nullable=False, server_default=DEFAULT_CLIENT_ID),
+    Column("platform", String(64), nullable=False),
+    Column("status", String(16), nullable=False),
+    Column("api_key", String(512)),
+    Column("account_id", String(200)),
+    Column("last_sync", DateTime),
+    Column("created_at", DateTime),
+    Column("version", Integer, nullable=False, default=1, server_default="1"),
+    Index("ix_pc_integrations_client_seq", "client_id", "seq"),
+    Index("ix_pc_integrations_client_platform", "client_id", "platform"),
+    Index("ix_pc_integrations_client_status", "client_id", "status"),
+)
+
+performance_table = Table(
+    "pc_performance_data", metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=True),
+    Column("id", String(36), nullable=False, unique=True),
+    Column("client_id", String(64), nullable=False, server_default=DEFAULT_CLIENT_ID),
+    Column("date", String(10), nullable=False),
+    Column("impressions", BigInteger, nullable=False, default=0),
+    Column("clicks", BigInteger, nullable=False, default=0),
+    Column("conversions", BigInteger, nullable=False, default=0),
+    Column("spend", Float, nullable=False, default=0.0),
+    Column("revenue", Float, nullable=False, default=0.0),
+    Column("platform", String(64)),
+    Column("created_at", DateTime),
+    Index("ix_pc_performance_client_seq", "client_id", "seq"),
+    Index("ix_pc_performance_client_date", "client_id", "date"),
+    Index("ix_pc_performance_client_platform_date", "client_id", "platform", "date"),
+)
+
+# Incrementally maintained totals per (client, grain, bucket, platform), written in the
+# same transaction as the rows they summarize. Platform "*" is the all-platforms
+# series and "" stands for rows without a platform.
+ALL_PLATFORMS_KEY = "*"
+
+performance_rollups_table = Table(
+    "pc_performance_rollups", metadata,
+    Column("client_id", String(64), primary_key=True),
+    Column("grain", String(8), primary_key=True),
+    Column("bucket", String(10), primary_key=True),
+    Column("platform", String(64), primary_key=True),
+    Column("row_count", BigInteger, nullable=False, default=0),
+    Column("impressions", BigInteger, nullable=False, default=0),
+    Column("clicks", BigInteger, nullable=False, default=0),
+    Column("conversions", BigInteger, nullable=False, default=0),
+    Column("spend", Float, nullable=False, default=0.0),
+    Column("revenue", Float, nullable=False, default=0.0),
+)
+
+# Newest compaction cutoff (YYYY-MM-DD) per client; rows dated before it only
+# survive in the rollups, so upserts may no longer target them
+performance_compactions_table = Table(
+    "pc_performance_compactions", metadata,
+    Column("client_id", String(64), primary_key=True),
+    Column("compacted_before", String(10), nullable=False),
+)
+
+# Change feed: one row per committed mutation, written in the mutation's own
+# transaction. The newest CHANGE_LOG_SIZE rows are kept. On databases with
+# concurrent writers a lower seq can commit after a higher one, so subscribers
+# may miss a change in that window; SQLite serializes writers and is exact.
+changes_table = Table(
+    "pc_changes", metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=True),
+    Column("client_id", String(64), nullable=False, server_default=DEFAULT_CLIENT_ID),
+    Column("collection", String(32), nullable=False),
+    Column("op", String(8), nullable=False),
+    Column("record_id", String(36), nullable=False),
+    Column("record", Text),
+    Column("created_at", DateTime),
+    Index("ix_pc_changes_client_seq", "client_id", "seq"),
+    sqlite_autoincrement=True,
+)
+
+ROLLUP_METRICS = ("row_count", "impressions", "clicks", "conversions", "spend", "revenue")
+PERFORMANCE_METRICS = ROLLUP_METRICS[1:]
+
+# Rows deleted per transaction when compacting, so writers are never locked out for long
+COMPACTION_BATCH = 5000
+
+def _owned(table: Table):
+    """Restrict a statement to the calling storage's client (bound as ``client_id``)."""
+    return table.c.client_id == bindparam("client_id")
+
+def _by_id(table: Table):
+    return (table.c.id == bindparam("record_id")) & _owned(table)
+
+# Statements are built once at import time so SQLAlchemy's compiled cache
+# serves them on every call instead of recompiling per request
+_select_campaigns = select(campaigns_table).where(_owned(campaigns_table)).order_by(campaigns_table.c.seq)
+_select_campaign = select(campaigns_table).where(_by_id(campaigns_table))
+_select_metrics = select(metrics_table).where(_owned(metrics_table)).order_by(metrics_table.c.seq)
+_select_performance = select(performance_table).where(_owned(performance_table)).order_by(performance_table.c.seq)
+_select_performance_row = select(performance_table).where(_by_id(performance_table))
+_select_performance_keys = (
+    select(
+        performance_table.c.seq, performance_table.c.id, performance_table.c.date, performance_table.c.platform,
+        performance_table.c.impressions, performance_table.c.clicks, performance_table.c.conversions,
+        performance_table.c.spend, performance_table.c.revenue,
+    )
+    .where(_owned(performance_table), performance_table.c.date.in_(bindparam("dates", expanding=True)))
+    .order_by(performance_table.c.seq)
+)
+_update_performance_metrics = (
+    update(performance_table)
+    .where(performance_table.c.seq == bindparam("b_seq"))
+    .values({name: bindparam(f"b_{name}") for name in PERFORMANCE_METRICS})
+)
+_select_compaction_cutoff = (
+    select(performance_compactions_table.c.compacted_before).where(_owned(performance_compactions_table))
+)
+_select_integrations = select(integrations_table).where(_owned(integrations_table)).order_by(integrations_table.c.seq)
+_select_integration = select(integrations_table).where(_by_id(integrations_table))
+_select_change_seq = select(func.max(changes_table.c.seq)).where(_owned(changes_table))
+# Retention is global, so the oldest retained change is looked up across all clients
+_select_latest_change_seq = select(func.max(changes_table.c.seq))
+_select_first_change_seq = select(func.min(changes_table.c.seq))
+
+_COLLECTIONS = {campaigns_table.name: "campaigns", integrations_table.name: "integrations"}
+
+
+# Engines (and their pools) are shared by the storages of all clients
+_engines: Dict[str, Engine] = {}
+_prepared_engines: set = set()
+
+def shared_engine(database_url: str) -> Engine:
+    engine = _engines.get(database_url)
+    if engine is None:
+        engine = _engines[database_url] = create_storage_engine(database_url)
+    return engine
+
+def create_storage_engine(database_url: str) -> Engine:
+    """Create an engine with pool settings suited to the API workers.
+
+    SQLite (used for local runs and tests) gets WAL journaling; server databases
+    get a bounded, pre-pinged connection pool sized by DB_POOL_SIZE/DB_MAX_OVERFLOW.
+    """
+    if database_url.startswith("sqlite"):
+        engine = create_engine(database_url, connect_args={"check_same_thread": False})
+
+        @event.listens_for(engine, "connect")
+        def _configure_sqlite(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+
+        return engine
+
+    return create_engine(
+        database_url,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        pool_pre_ping=True,
+        pool_recycle=1800,
+    )
+
+
+def _row_values(row) -> Dict[str, Any]:
+    values = dict(row._mapping)
+    values.pop("seq", None)
+    values.pop("sort_value", None)
+    return values
+
+def _encode_record(record: Any) -> Optional[str]:
+    if record is None:
+        return None
+    return record.model_dump_json() if isinstance(record, BaseModel) else json.dumps(record)
+
+def _rollup_deltas(changes: Iterable[Tuple[PerformanceData, int]]) -> Dict[Tuple[str, str, str], List[float]]:
+    """Fold (row, +1/-1) changes into per-bucket deltas for the rollup table."""
+    deltas: Dict[Tuple[str, str, str], List[float]] = {}
+    for row, sign in changes:
+        ordinal = parse_date(row.date)
+        metrics = (1, row.impressions, row.clicks, row.conversions, row.spend, row.revenue)
+        for grain in ROLLUP_GRAINS:
+            bucket = format_date(bucket_start(ordinal, grain))
+            for platform in (row.platform or "", ALL_PLATFORMS_KEY):
+                totals = deltas.setdefault((grain, bucket, platform), [0, 0, 0, 0, 0.0, 0.0])
+                for index, value in enumerate(metrics):
+                    totals[index] += sign * value
+    return deltas
+
+def _campaign_conditions(query: CampaignQuery) -> List[Any]:
+    c = campaigns_table.c
+    conditions = [_owned(campaigns_table)]
+    if query.platform is not None:
+        conditions.append(c.platform == query.platform)
+    if query.status is not None:
+        conditions.append(c.status == _index_key(query.status))
+    if query.type is not None:
+        conditions.append(c.type == query.type)
+    if query.min_spend is not None:
+        conditions.append(cast(c.spend, Float) >= query.min_spend)
+    return conditions
+
+def _campaign_sort_expression(query: CampaignQuery):
+    if query.sort_by is None:
+        return None
+    if query.sort_by.value == "spend":
+        return cast(campaigns_table.c.spend, Float)
+    return campaigns_table.c[query.sort_by.value]
+
+def _performance_conditions(query: PerformanceQuery) -> List[Any]:
+    c = performance_table.c
+    conditions = [_owned(performance_table)]
+    if query.platform is not None:
+        conditions.append(c.platform == query.platform)
+    if query.start_date is not None:
+        conditions.append(c.date >= query.start_date)
+    if query.end_date is not None:
+        conditions.append(c.date <= query.end_date)
+    if query.min_spend is not None:
+        conditions.append(c.spend >= query.min_spend)
+    return conditions
+
+def _performance_window(start: Optional[str], end: Optional[str], platform: Optional[str]):
+    """Select for a plain date-window read (see ``IStorage.get_performance``)."""
+    if start is None and end is None and platform is None:
+        return _select_performance
+    query = PerformanceQuery(platform=platform, start_date=start, end_date=end)
+    c = performance_table.c
+    # (client, platform, date) and (client, date) indexes serve the range scan
+    return select(performance_table).where(*_performance_conditions(query)).order_by(c.date, c.seq)
+
+def _performance_sort_expression(query: PerformanceQuery):
+    if query.sort_by is None:
+        return None
+    if query.sort_by.value == "platform":
+        # Same ordering as MemoryStorage, which sorts missing platforms first
+        return func.coalesce(performance_table.c.platform, "")
+    return performance_table.c[query.sort_by.value]
+
+
+class SqlStorage(IStorage):
+    """IStorage backed by a relational database through SQLAlchemy Core.
+
+    The engine is synchronous (psycopg2 / sqlite3 drivers); each call runs on a
+    worker thread so the event loop is never blocked on database I/O. Each
+    instance serves one client and every statement is bound to its client_id.
+    """
+
+    def __init__(self, database_url: str, engine: Optional[Engine] = None, client_id: str = DEFAULT_CLIENT_ID):
+        super().__init__()
+        self.engine = engine or shared_engine(database_url)
+        self.client_id = client_id
+        self._params = {"client_id": client_id}
+        self._changes_since_trim = 0
+        if self.engine not in _prepared_engines:
+            metadata.create_all(self.engine)
+            self._migrate_schema()
+            _prepared_engines.add(self.engine)
+        self._ensure_rollups()
+
+    async def close(self) -> None:
+        self.engine.dispose()
+
+    async def _run(self, fn, *args):
+        return await asyncio.to_thread(fn, *args)
+
+    async def _write(self, fn, *args):
+        # Subscribers are woken only after the transaction has committed
+        result = await self._run(fn, *args)
+        self.change_notifier.notify()
+        return result
+
+    def _log_changes(self, conn: Connection, collection: str, op: str, changes: List[Tuple[str, Any]]) -> None:
+        """Append ``(record id, record or None)`` mutations to the change feed."""
+        if not changes:
+            return
+        now = datetime.now()
+        conn.execute(insert(changes_table), [
+            {
+                "client_id": self.client_id, "collection": collection, "op": op, "record_id": record_id,
+                "record": _encode_record(record), "created_at": now,
+            }
+            for record_id, record in changes
+        ])
+        self._changes_since_trim += len(changes)
+        if self._changes_since_trim >= CHANGE_LOG_SIZE // 10:
+            self._changes_since_trim = 0
+            latest = conn.execute(_select_latest_change_seq).scalar()
+            conn.execute(delete(changes_table).where(changes_table.c.seq <= latest - CHANGE_LOG_SIZE))
+
+    def _get_change_seq(self) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(_select_change_seq, self._params).scalar() or 0
+
+    async def get_change_seq(self) -> int:
+        return await self._run(self._get_change_seq)
+
+    def _get_changes(self, since: int, limit: Optional[int]) -> List[ChangeEvent]:
+        c = changes_table.c
+        statement = select(changes_table).where(_owned(changes_table), c.seq > since).order_by(c.seq)
+        if limit is not None:
+            statement = statement.limit(limit)
+        with self.engine.connect() as conn:
+            latest = conn.execute(_select_change_seq, self._params).scalar() or 0
+            # A client's sequence numbers are not contiguous, so a gap is detected
+            # against the oldest change still retained for anyone
+            first = conn.execute(_select_first_change_seq).scalar()
+            if since > latest or (first is not None and since < first - 1):
+                raise ChangeFeedGapError(since, latest)
+            rows = conn.execute(statement, self._params).all()
+        return [
+            ChangeEvent(
+                seq=row.seq, collection=row.collection, op=row.op, id=row.record_id,
+                record=json.loads(row.record) if row.record is not None else None,
+            )
+            for row in rows
+        ]
+
+    async def get_changes(self, since: int, limit: Optional[int] = None) -> List[ChangeEvent]:
+        return await self._run(self._get_changes, since, limit)
+
+    def _migrate_schema(self) -> None:
+        """Bring tables created by earlier versions up to date.
+
+        Existing rows are assigned to the default client. The rollup table is
+        derived data, so an old one is dropped and rebuilt by _ensure_rollups.
+        """
+        inspector = inspect(self.engine)
+        with self.engine.begin() as conn:
+            for table in (campaigns_table, metrics_table, integrations_table, performance_table, changes_table):
+                columns = {column["name"] for column in inspector.get_columns(table.name)}
+                if "version" in table.c and "version" not in columns:
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+                if "client_id" not in columns:
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN client_id VARCHAR(64) NOT NULL DEFAULT '{DEFAULT_CLIENT_ID}'"
+                    ))
+            rollup_columns = {column["name"] for column in inspector.get_columns(performance_rollups_table.name)}
+            if "client_id" not in rollup_columns:
+                performance_rollups_table.drop(conn)
+                performance_rollups_table.create(conn)
+            for table in metadata.sorted_tables:
+                current = {index.name for index in table.indexes}
+                for index in inspector.get_indexes(table.name):
+                    # Indexes from before client partitioning, superseded by the client_* ones
+                    if index["name"].startswith("ix_pc_") and index["name"] not in current:
+                        conn.execute(text(f"DROP INDEX {index['name']}"))
+                for index in table.indexes:
+                    index.create(conn, checkfirst=True)
+
+    def _writable(self, table: Table, updates: Dict[str, Any]) -> Dict[str, Any]:
+        # Same semantics as MemoryStorage: unknown keys are ignored, the id and
+        # owning client are immutable and the version only moves through _versioned_update
+        return {
+            key: _index_key(value)
+            for key, value in updates.items()
+            if key in table.c and key not in ("seq", "id", "version", "client_id")
+        }
+
+    def _validated_updates(
+        self, conn: Connection, statement, model, record_id: str, updates: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """``updates`` validated as part of the record they produce, like MemoryStorage does;
+        None when the record does not exist. Raises pydantic's ValidationError (a ValueError)."""
+        row = conn.execute(statement, {"record_id": record_id, **self._params}).one_or_none()
+        if row is None:
+            return None
+        current = _row_values(row)
+        changes = {key: value for key, value in updates.items() if key in current}
+        validated = model.model_validate({**current, **changes})
+        return {key: getattr(validated, key) for key in changes}
+
+    def _raise_if_conflict(self, conn: Connection, table: Table, record_id: str, expected_version: int) -> None:
+        # A conditional write touched no row: either the record is gone or its version moved on
+        current = conn.execute(
+            select(table.c.version).where(_by_id(table)), {"record_id": record_id, **self._params}
+        ).scalar_one_or_none()
+        if current is not None:
+            raise VersionConflictError(record_id, expected_version, current)
+
+    def _versioned_update(
+        self, conn: Connection, table: Table, record_id: str, values: Dict[str, Any],
+        expected_version: Optional[int],
+    ) -> bool:
+        """Apply ``values`` and bump the version in one statement, only if the
+        record is still at ``expected_version`` (when given)."""
+        statement = update(table).where(table.c.id == record_id, table.c.client_id == self.client_id)
+        if expected_version is not None:
+            statement = statement.where(table.c.version == expected_version)
+        if conn.execute(statement.values(**values, version=table.c.version + 1)).rowcount > 0:
+            return True
+        if expected_version is not None:
+            self._raise_if_conflict(conn, table, record_id, expected_version)
+        return False
+
+    def _select_one(self, statement, model, record_id: str):
+        with self.engine.connect() as conn:
+            row = conn.execute(statement, {"record_id": record_id, **self._params}).one_or_none()
+        return model(**_row_values(row)) if row is not None else None
+
+    def _select_all(self, statement, model):
+        with self.engine.connect() as conn:
+            return [model(**_row_values(row)) for row in conn.execute(statement, self._params)]
+
+    def _select_values(self, statement, fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+        """Just ``fields`` of the rows ``statement`` selects, as plain dicts."""
+        columns = statement.selected_columns
+        statement = statement.with_only_columns(*(columns[field] for field in fields))
+        with self.engine.connect() as conn:
+            return [dict(zip(fields, row)) for row in conn.execute(statement, self._params)]
+
+    def _select_query(
+        self, table: Table, model, conditions: List[Any], sort_expression,
+        sort_dir: SortDirection, limit: Optional[int], cursor: Optional[str],
+    ) -> Page:
+        """Run a filtered, keyset-paginated select ordered by (sort value, seq)."""
+        descending = sort_dir == SortDirection.DESC
+        seq = table.c.seq
+        if sort_expression is None:
+            # Unsorted reads keep plain seq cursors, so they stay valid across both paths
+            after = decode_seq_cursor(cursor)
+            if after >= 0:
+                conditions = conditions + [seq > after]
+            statement = select(table).order_by(seq)
+            key_of = lambda row: row.seq
+        else:
+            after = decode_sorted_cursor(cursor)
+            key = tuple_(sort_expression, seq)
+            if after is not None:
+                conditions = conditions + [key < tuple_(*after) if descending else key > tuple_(*after)]
+            order = (sort_expression.desc(), seq.desc()) if descending else (sort_expression, seq)
+            statement = select(table, sort_expression.label("sort_value")).order_by(*order)
+            key_of = lambda row: [row.sort_value, row.seq]
+        statement = statement.where(*conditions)
+        if limit is not None:
+            # Fetch one extra row to learn whether another page follows
+            statement = statement.limit(limit + 1)
+        with self.engine.connect() as conn:
+            rows = conn.execute(statement, self._params).all()
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(key_of(rows[-1]))
+        return [model(**_row_values(row)) for row in rows], next_cursor
+
+    def _insert_many(self, conn: Connection, table: Table, models: List[Any]) -> None:
+        if not models:
+            return
+        rows = [
+            {key: _index_key(value) for key, value in model.model_dump().items() if key in table.c}
+            for model in models
+        ]
+        for row in rows:
+            row["client_id"] = self.client_id
+        # A list of parameter sets is sent as a single executemany round trip
+        conn.execute(insert(table), rows)
+
+    def _delete_many(self, table: Table, record_ids: List[str]) -> List[bool]:
+        with self.engine.begin() as conn:
+            existing = set()
+            owned = table.c.client_id == self.client_id
+            for start in range(0, len(record_ids), 500):
+                chunk = record_ids[start:start + 500]
+                existing.update(conn.execute(select(table.c.id).where(owned, table.c.id.in_(chunk))).scalars())
+                conn.execute(delete(table).where(owned, table.c.id.in_(chunk)))
+            results = []
+            for record_id in record_ids:
+                results.append(record_id in existing)
+                existing.discard(record_id)
+            self._log_changes(conn, _COLLECTIONS[table.name], "delete", [
+                (record_id, None) for record_id, deleted in zip(record_ids, results) if deleted
+            ])
+        return results
+
+    # Campaigns
+
+    async def get_campaigns(self) -> List[Campaign]:
+        return await self._run(self._select_all, _select_campaigns, Campaign)
+
+    async def get_campaigns_json(self, fields: Fields = None) -> JsonBody:
+        if fields is None:
+            return await super().get_campaigns_json()
+        return json_body(values_json.dump_json(await self._run(self._select_values, _select_campaigns, fields)))
+
+    async def get_campaign(self, campaign_id: str) -> Optional[Campaign]:
+        return await self._run(self._select_one, _select_campaign, Campaign, campaign_id)
+
+    async def query_campaigns(
+        self, query: CampaignQuery, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Page:
+        return await self._run(
+            self._select_query, campaigns_table, Campaign, _campaign_conditions(query),
+            _campaign_sort_expression(query), query.sort_dir, limit, cursor,
+        )
+
+    def _create_campaigns(self, campaigns: List[Campaign]) -> List[Campaign]:
+        now = datetime.now()
+        campaigns = [
+            campaign.model_copy(update={
+                "id": str(uuid.uuid4()), "client_id": self.client_id, "created_at": now, "updated_at": now, "version": 1,
+            })
+            for campaign in campaigns
+        ]
+        with self.engine.begin() as conn:
+            self._insert_many(conn, campaigns_table, campaigns)
+            self._log_changes(conn, "campaigns", "create", [(campaign.id, campaign) for campaign in campaigns])
+        return campaigns
+
+    async def create_campaign(self, campaign: Campaign) -> Campaign:
+        return (await self._write(self._create_campaigns, [campaign]))[0]
+
+    async def create_campaigns(self, campaigns: List[Campaign]) -> List[Campaign]:
+        return await self._write(self._create_campaigns, campaigns)
+
+    def _apply_campaign_update(
+        self, conn: Connection, campaign_id: str, updates: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Optional[Campaign]:
+        changes = self._validated_updates(conn, _select_campaign, Campaign, campaign_id, updates)
+        if changes is None:
+            return None
+        values = self._writable(campaigns_table, changes)
+        values["updated_at"] = datetime.now()
+        if not self._versioned_update(conn, campaigns_table, campaign_id, values, expected_version):
+            return None
+        row = conn.execute(_select_campaign, {"record_id": campaign_id, **self._params}).one()
+        campaign = Campaign(**_row_values(row))
+        self._log_changes(conn, "campaigns", "update", [(campaign_id, campaign)])
+        return campaign
+
+    def _update_campaigns(self, updates: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Campaign]]:
+        # One transaction (and one commit) for the whole batch
+        with self.engine.begin() as conn:
+            return [self._apply_campaign_update(conn, campaign_id, changes) for campaign_id, changes in updates]
+
+    def _update_campaign(
+        self, campaign_id: str, updates: Dict[str, Any], expected_version: Optional[int]
+    ) -> Optional[Campaign]:
+        with self.engine.begin() as conn:
+            return self._apply_campaign_update(conn, campaign_id, updates, expected_version)
+
+    async def update_campaign(
+        self, campaign_id: str, updates: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Campaign:
+        campaign = await self._write(self._update_campaign, campaign_id, updates, expected_version)
+        if campaign is None:
+            raise ValueError(f"Campaign with id {campaign_id} not found")
+        return campaign
+
+    async def update_campaigns(self, updates: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Campaign]]:
+        return await self._write(self._update_campaigns, updates)
+
+    def _delete(self, table: Table, record_id: str, expected_version: Optional[int]) -> bool:
+        statement = delete(table).where(table.c.id == record_id, table.c.client_id == self.client_id)
+        if expected_version is not None:
+            statement = statement.where(table.c.version == expected_version)
+        with self.engine.begin() as conn:
+            if conn.execute(statement).rowcount > 0:
+                self._log_changes(conn, _COLLECTIONS[table.name], "delete", [(record_id, None)])
+                return True
+            if expected_version is not None:
+                self._raise_if_conflict(conn, table, record_id, expected_version)
+            return False
+
+    async def delete_campaign(self, campaign_id: str, expected_version: Optional[int] = None) -> bool:
+        return await self._write(self._delete, campaigns_table, campaign_id, expected_version)
+
+    async def delete_campaigns(self, campaign_ids: List[str]) -> List[bool]:
+        return await self._write(self._delete_many, campaigns_table, campaign_ids)
+
+    # Metrics and performance
+
+    async def get_metrics(self) -> List[Metric]:
+        return await self._run(self._select_all, _select_metrics, Metric)
+
+    async def get_metrics_json(self, fields: Fields = None) -> JsonBody:
+        if fields is None:
+            return await super().get_metrics_json()
+        return json_body(values_json.dump_json(await self._run(self._select_values, _select_metrics, fields)))
+
+    async def get_performance(
+        self, start: Optional[str] = None, end: Optional[str] = None, platform: Optional[str] = None
+    ) -> List[PerformanceData]:
+        return await self._run(self._select_all, _performance_window(start, end, platform), PerformanceData)
+
+    async def get_performance_json(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        platform: Optional[str] = None,
+        fields: Fields = None,
+    ) -> JsonBody:
+        if fields is None:
+            return await super().get_performance_json(start, end, platform)
+        statement = _performance_window(start, end, platform)
+        return json_body(values_json.dump_json(await self._run(self._select_values, statement, fields)))
+
+    async def query_performance(
+        self, query: PerformanceQuery, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Page:
+        return await self._run(
+            self._select_query, performance_table, PerformanceData, _performance_conditions(query),
+            _performance_sort_expression(query), query.sort_dir, limit, cursor,
+        )
+
+    def _aggregate_performance(
+        self, query: PerformanceQuery, group_by: Optional[PerformanceGroupBy]
+    ) -> List[PerformanceAggregate]:
+        c = performance_table.c
+        totals = [func.count().label("rows")] + [
+            func.coalesce(func.sum(c[column]), 0).label(column)
+            for column in ("impressions", "clicks", "conversions", "spend", "revenue")
+        ]
+        if group_by is None:
+            statement = select(*totals)
+        else:
+            group_column = c[group_by.value]
+            statement = select(group_column.label("group"), *totals).group_by(group_column).order_by(group_column)
+        statement = statement.where(*_performance_conditions(query))
+        with self.engine.connect() as conn:
+            return [PerformanceAggregate(**row._mapping) for row in conn.execute(statement, self._params)]
+
+    async def aggregate_performance(
+        self, query: PerformanceQuery, group_by: Optional[PerformanceGroupBy] = None
+    ) -> List[PerformanceAggregate]:
+        return await self._run(self._aggregate_performance, query, group_by)
+
+    def _apply_rollup_deltas(self, conn: Connection, deltas: Dict[Tuple[str, str, str], List[float]]) -> None:
+        table = performance_rollups_table
+        rows = [
+            {
+                "client_id": self.client_id, "grain": grain, "bucket": bucket, "platform": platform,
+                **dict(zip(ROLLUP_METRICS, totals)),
+            }
+            for (grain, bucket, platform), totals in deltas.items()
+            if any(totals)
+        ]
+        if not rows:
+            return
+        dialect_insert = postgresql.insert if self.engine.dialect.name == "postgresql" else sqlite.insert
+        statement = dialect_insert(table)
+        # A single upsert keeps concurrent writers from racing on new buckets
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.client_id, table.c.grain, table.c.bucket, table.c.platform],
+            set_={column: table.c[column] + statement.excluded[column] for column in ROLLUP_METRICS},
+        )
+        conn.execute(statement, rows)
+        if any(totals[0] < 0 for totals in deltas.values()):
+            conn.execute(delete(table).where(table.c.client_id == self.client_id, table.c.row_count <= 0))
+
+    def _ensure_rollups(self) -> None:
+        """Build the client's rollups from existing rows when they are missing (e.g. after an upgrade)."""
+        with self.engine.begin() as conn:
+            c = performance_rollups_table.c
+            if conn.execute(select(c.grain).where(c.client_id == self.client_id).limit(1)).first() is not None:
+                return
+            rows = conn.execute(_select_performance, self._params).yield_per(10000)
+            deltas = _rollup_deltas((PerformanceData(**_row_values(row)), 1) for row in rows)
+            self._apply_rollup_deltas(conn, deltas)
+
+    def _create_performance(self, rows: List[PerformanceData]) -> List[PerformanceData]:
+        now = datetime.now()
+        rows = [
+            row.model_copy(update={"id": str(uuid.uuid4()), "client_id": self.client_id, "created_at": now})
+            for row in rows
+        ]
+        with self.engine.begin() as conn:
+            self._insert_many(conn, performance_table, rows)
+            self._apply_rollup_deltas(conn, _rollup_deltas((row, 1) for row in rows))
+            self._log_changes(conn, "performance", "create", [(row.id, row) for row in rows])
+        return rows
+
+    async def create_performance(self, rows: List[PerformanceData]) -> List[PerformanceData]:
+        return await self._write(self._create_performance, rows)
+
+    def _performance_columns_page(self, conditions: List[Any], after: int, limit: int) -> Tuple[Dict[str, list], int]:
+        c = performance_table.c
+        statement = (
+            select(c.seq, c.id, c.date, c.platform, c.impressions, c.clicks, c.conversions, c.spend, c.revenue, c.created_at)
+            .where(*conditions, c.seq > after)
+            .order_by(c.seq)
+            .limit(limit)
+        )
+        with self.engine.connect() as conn:
+            rows = conn.execute(statement, self._params).all()
+        columns = {name: [] for name in ("id", "date", "platform", "impressions", "clicks", "conversions", "spend", "revenue", "created_at")}
+        for row in rows:
+            columns["id"].append(row.id)
+            columns["date"].append(parse_date(row.date))
+            columns["platform"].append(row.platform)
+            columns["impressions"].append(row.impressions)
+            columns["clicks"].append(row.clicks)
+            columns["conversions"].append(row.conversions)
+            columns["spend"].append(row.spend)
+            columns["revenue"].append(row.revenue)
+            columns["created_at"].append(row.created_at.timestamp() if row.created_at else math.nan)
+        return columns, rows[-1].seq if rows else after
+
+    async def iter_performance_columns(
+        self, query: PerformanceQuery, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[Dict[str, Sequence[Any]]]:
+        if query.sort_by is not None:
+            async for columns in super().iter_performance_columns(query, batch_size):
+                yield columns
+            return
+        # Keyset pages over seq, read as plain tuples rather than models
+        conditions = _performance_conditions(query)
+        after = -1
+        while True:
+            columns, after = await self._run(self._performance_columns_page, conditions, after, batch_size)
+            if columns["id"]:
+                yield columns
+            if len(columns["id"]) < batch_size:
+                return
+
+    def _column_rows(
+        self, columns: Dict[str, Sequence[Any]], indexes: Iterable[int], now: datetime
+    ) -> List[PerformanceData]:
+        # Values were validated by the importer, so models are only built as row carriers
+        return [
+            PerformanceData.model_construct(
+                id=str(uuid.uuid4()), client_id=self.client_id, date=format_date(columns["date"][i]),
+                platform=columns["platform"][i], impressions=columns["impressions"][i], clicks=columns["clicks"][i],
+                conversions=columns["conversions"][i], spend=columns["spend"][i], revenue=columns["revenue"][i],
+                created_at=now,
+            )
+            for i in indexes
+        ]
+
+    def _import_performance(self, columns: Dict[str, Sequence[Any]]) -> int:
+        rows = self._column_rows(columns, range(len(columns["date"])), datetime.now())
+        if not rows:
+            return 0
+        with self.engine.begin() as conn:
+            self._insert_many(conn, performance_table, rows)
+            self._apply_rollup_deltas(conn, _rollup_deltas((row, 1) for row in rows))
+            # One feed event per batch, as in MemoryStorage
+            self._log_changes(conn, "performance", "import", [
+                (rows[0].id, {"first_id": rows[0].id, "last_id": rows[-1].id, "rows": len(rows)}),
+            ])
+        return len(rows)
+
+    async def import_performance_columns(self, columns: Dict[str, Sequence[Any]]) -> int:
+        return await self._write(self._import_performance, columns)
+
+    def _upsert_performance(self, columns: Dict[str, Sequence[Any]]) -> Tuple[int, int]:
+        latest: Dict[Tuple[int, Optional[str]], int] = {}
+        for index, key in enumerate(zip(columns["date"], columns["platform"])):
+            latest[key] = index
+        if not latest:
+            return 0, 0
+        dates = sorted({format_date(ordinal) for ordinal, _ in latest})
+        with self.engine.begin() as conn:
+            cutoff = conn.execute(_select_compaction_cutoff, self._params).scalar()
+            if cutoff is not None and dates[0] < cutoff:
+                raise ValueError(
+                    f"Rows dated before {cutoff} have been compacted into rollups and cannot be upserted "
+                    f"(got {dates[0]})"
+                )
+            # Ordered by seq, so the newest row of each key is the one kept
+            stored = {
+                (parse_date(row.date), row.platform): row
+                for row in conn.execute(_select_performance_keys, {"dates": dates, **self._params})
+            }
+            new = []
+            updates = []
+            changes = []
+            for key, index in latest.items():
+                row = stored.get(key)
+                if row is None:
+                    new.append(index)
+                    continue
+                metrics = {name: columns[name][index] for name in PERFORMANCE_METRICS}
+                updates.append({"b_seq": row.seq, **{f"b_{name}": value for name, value in metrics.items()}})
+                current = PerformanceData.model_construct(**_row_values(row))
+                changes += [(current, -1), (current.model_copy(update=metrics), 1)]
+            rows = self._column_rows(columns, new, datetime.now())
+            if updates:
+                conn.execute(_update_performance_metrics, updates)
+            self._insert_many(conn, performance_table, rows)
+            self._apply_rollup_deltas(conn, _rollup_deltas(changes + [(row, 1) for row in rows]))
+            first_id = changes[0][0].id if changes else rows[0].id
+            summary = {"rows": len(columns["date"]), "inserted": len(rows), "updated": len(updates)}
+            self._log_changes(conn, "performance", "upsert", [(first_id, summary)])
+        return len(rows), len(updates)
+
+    async def upsert_performance_columns(self, columns: Dict[str, Sequence[Any]]) -> Tuple[int, int]:
+        return await self._write(self._upsert_performance, columns)
+
+    def _update_performance(self, row_id: str, updates: Dict[str, Any]) -> PerformanceData:
+        with self.engine.begin() as conn:
+            row = conn.execute(_select_performance_row, {"record_id": row_id, **self._params}).one_or_none()
+            if row is None:
+                raise ValueError(f"Performance row with id {row_id} not found")
+            current = PerformanceData(**_row_values(row))
+            changes = {key: value for key, value in updates.items() if key in current.model_fields and key not in ("id", "client_id", "created_at")}
+            corrected = PerformanceData.model_validate({**current.model_dump(), **changes})
+            conn.execute(
+                update(performance_table)
+                .where(performance_table.c.id == row_id, performance_table.c.client_id == self.client_id)
+                .values(**self._writable(performance_table, corrected.model_dump()))
+            )
+            self._apply_rollup_deltas(conn, _rollup_deltas([(current, -1), (corrected, 1)]))
+            self._log_changes(conn, "performance", "update", [(row_id, corrected)])
+        return corrected
+
+    async def update_performance(self, row_id: str, updates: Dict[str, Any]) -> PerformanceData:
+        return await self._write(self._update_performance, row_id, updates)
+
+    def _get_performance_rollup(
+        self, grain: RollupGrain, platform: Optional[str], start: Optional[str], end: Optional[str]
+    ) -> List[PerformanceAggregate]:
+        c = performance_rollups_table.c
+        statement = (
+            select(c.bucket.label("group"), c.row_count.label("rows"), c.impressions, c.clicks,
+                   c.conversions, c.spend, c.revenue)
+            .where(
+                c.client_id == self.client_id, c.grain == grain.value,
+                c.platform == (platform if platform is not None else ALL_PLATFORMS_KEY),
+            )
+            .order_by(c.bucket)
+        )
+        if start:
+            statement = statement.where(c.bucket >= format_date(bucket_start(parse_date(start), grain.value)))
+        if end:
+            statement = statement.where(c.bucket <= format_date(parse_date(end)))
+        with self.engine.connect() as conn:
+            return [PerformanceAggregate(**row._mapping) for row in conn.execute(statement)]
+
+    async def get_performance_rollup(
+        self,
+        grain: RollupGrain,
+        platform: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> List[PerformanceAggregate]:
+        return await self._run(self._get_performance_rollup, grain, platform, start, end)
+
+    def _mark_compacted(self, before: str) -> None:
+        # Marked before any row goes, so an upsert can never re-add a row whose totals are kept
+        t = performance_compactions_table
+        with self.engine.begin() as conn:
+            cutoff = conn.execute(_select_compaction_cutoff, self._params).scalar()
+            if cutoff is None:
+                conn.execute(insert(t).values(client_id=self.client_id, compacted_before=before))
+            elif before > cutoff:
+                conn.execute(update(t).where(t.c.client_id == self.client_id).values(compacted_before=before))
+
+    def _compact_performance(self, before: str, keep_grains: List[RollupGrain]) -> PerformanceCompaction:
+        # Rollups already hold the totals of every row, so compaction only deletes
+        self._mark_compacted(before)
+        c = performance_table.c
+        expired = select(c.seq).where(c.client_id == self.client_id, c.date < before).limit(COMPACTION_BATCH)
+        removed = 0
+        while True:
+            with self.engine.begin() as conn:
+                deleted = conn.execute(delete(performance_table).where(c.seq.in_(expired))).rowcount
+            removed += deleted
+            if deleted < COMPACTION_BATCH:
+                break
+        result = PerformanceCompaction(before=before, keep_grains=keep_grains, rows=removed)
+        r = performance_rollups_table.c
+        kept = {grain.value for grain in keep_grains}
+        with self.engine.begin() as conn:
+            pruned = 0
+            for grain in ROLLUP_GRAINS:
+                if grain not in kept:
+                    low = format_date(bucket_start(parse_date(before), grain))
+                    pruned += conn.execute(delete(performance_rollups_table).where(
+                        r.client_id == self.client_id, r.grain == grain, r.bucket < low,
+                    )).rowcount
+            if removed or pruned:
+                self._log_changes(conn, "performance", "compact", [(before, result)])
+        # Freed pages are reused by the database; returning them to the OS needs a VACUUM
+        return result
+
+    async def compact_performance(self, before: str, keep_grains: List[RollupGrain]) -> PerformanceCompaction:
+        # The cutoff is compared with stored YYYY-MM-DD strings, so it is normalized first
+        before = format_date(parse_date(before))
+        async with self.performance_lock:
+            return await self._write(self._compact_performance, before, keep_grains)
+
+    def _get_compaction_cutoff(self) -> Optional[str]:
+        with self.engine.connect() as conn:
+            return conn.execute(_select_compaction_cutoff, self._params).scalar()
+
+    async def get_compaction_cutoff(self) -> Optional[str]:
+        return await self._run(self._get_compaction_cutoff)
+
+    # Integrations
+
+    async def get_integrations(self) -> List[Integration]:
+        return await self._run(self._select_all, _select_integrations, Integration)
+
+    async def get_integrations_json(self, fields: Fields = None) -> JsonBody:
+        if fields is None:
+            return await super().get_integrations_json()
+        return json_body(values_json.dump_json(await self._run(self._select_values, _select_integrations, fields)))
+
+    async def get_integration(self, integration_id: str) -> Optional[Integration]:
+        return await self._run(self._select_one, _select_integration, Integration, integration_id)
+
+    def _create_integrations(self, integrations: List[Integration]) -> List[Integration]:
+        now = datetime.now()
+        integrations = [
+            Integration(
+                id=str(uuid.uuid4()),
+                client_id=self.client_id,
+                platform=integration.platform,
+                status=integration.status,
+                api_key=integration.api_key,
+                account_id=integration.account_id,
+                created_at=now
+            )
+            for integration in integrations
+        ]
+        with self.engine.begin() as conn:
+            self._insert_many(conn, integrations_table, integrations)
+            self._log_changes(
+                conn, "integrations", "create", [(integration.id, integration) for integration in integrations]
+            )
+        return integrations
+
+    async def create_integration(self, integration: Integration) -> Integration:
+        return (await self._write(self._create_integrations, [integration]))[0]
+
+    async def create_integrations(self, integrations: List[Integration]) -> List[Integration]:
+        return await self._write(self._create_integrations, integrations)
+
+    def _apply_integration_update(
+        self, conn: Connection, integration_id: str, updates: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Optional[Integration]:
+        changes = self._validated_updates(conn, _select_integration, Integration, integration_id, updates)
+        if changes is None:
+            return None
+        values = self._writable(integrations_table, changes)
+        if 'status' in updates and updates['status'] == 'connected':
+            values["last_sync"] = datetime.now()
+        if not self._versioned_update(conn, integrations_table, integration_id, values, expected_version):
+            return None
+        row = conn.execute(_select_integration, {"record_id": integration_id, **self._params}).one()
+        integration = Integration(**_row_values(row))
+        self._log_changes(conn, "integrations", "update", [(integration_id, integration)])
+        return integration
+
+    def _update_integrations(self, updates: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Integration]]:
+        with self.engine.begin() as conn:
+            return [
+                self._apply_integration_update(conn, integration_id, changes)
+                for integration_id, changes in updates
+            ]
+
+    def _update_integration(
+        self, integration_id: str, updates: Dict[str, Any], expected_version: Optional[int]
+    ) -> Optional[Integration]:
+        with self.engine.begin() as conn:
+            return self._apply_integration_update(conn, integration_id, updates, expected_version)
+
+    async def update_integration(
+        self, integration_id: str, updates: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Integration:
+        integration = await self._write(self._update_integration, integration_id, updates, expected_version)
+        if integration is None:
+            raise ValueError(f"Integration with id {integration_id} not found")
+        return integration
+
+    async def update_integrations(self, updates: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Integration]]:
+        return await self._write(self._update_integrations, updates)
+
+    async def delete_integration(self, integration_id: str, expected_version: Optional[int] = None) -> bool:
+        return await self._write(self._delete, integrations_table, integration_id, expected_version)
+
+    async def delete_integrations(self, integration_ids: List[str]) -> List[bool]:
+        return await self._write(self._delete_many, integrations_table, integration_ids)
@@ -0,0 +1,147 @@
+"""Serving the React build.
+
+Vite names the files under ``assets/`` after a hash of their content, so a
+given URL never changes and can be cached by browsers for good. Next to each
+asset the build may hold ``.br`` and ``.gz`` variants (see
+scripts/compress_assets.py), which are sent as-is to clients accepting that
+encoding instead of compressing on every request.
+
+``index.html`` is not hashed; it is kept in memory, compressed once, and
+revalidated by clients through its ETag.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import time
+from typing import Dict, NamedTuple, Optional, Set, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; index.html is then only gzipped in memory
+    brotli = None
+
+# Content-hashed assets never change under the same URL
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Preferred first
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+# How often the in-memory index.html checks whether a new build replaced it
+INDEX_RECHECK_SECONDS = 2.0
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> Set[str]:
+    """Content codings an Accept-Encoding header allows (those not given q=0)."""
+    accepted = set()
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding.strip():
+            accepted.add(coding.strip())
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles for hashed build assets: immutable caching and prebuilt .br/.gz variants."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # full path -> (encoding, variant path, variant stat) per existing variant;
+        # assets never change under their name, so each is looked up once
+        self._variants: Dict[str, Tuple[Tuple[str, str, os.stat_result], ...]] = {}
+
+    def _find_variants(self, full_path: str) -> Tuple[Tuple[str, str, os.stat_result], ...]:
+        variants = self._variants.get(full_path)
+        if variants is None:
+            found = []
+            for encoding, suffix in PRECOMPRESSED:
+                try:
+                    found.append((encoding, full_path + suffix, os.stat(full_path + suffix)))
+                except OSError:
+                    pass
+            variants = self._variants[full_path] = tuple(found)
+        return variants
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL}
+        path, media_type = full_path, mimetypes.guess_type(full_path)[0] or "text/plain"
+        variants = self._find_variants(full_path)
+        if variants:
+            headers["Vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(request_headers.get("accept-encoding"))
+            for encoding, variant_path, variant_stat in variants:
+                if encoding in accepted:
+                    headers["Content-Encoding"] = encoding
+                    path, stat_result = variant_path, variant_stat
+                    break
+        response = FileResponse(
+            path, status_code=status_code, headers=headers, media_type=media_type, stat_result=stat_result
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class EncodedBody(NamedTuple):
+    body: bytes
+    etag: str
+    encoding: Optional[str]  # Content-Encoding, None for identity
+
+
+class IndexPage:
+    """The build's index.html, held in memory in every encoding with ETags.
+
+    The file is re-read only when a stat, made at most every
+    ``recheck_interval`` seconds, shows a new build replaced it.
+    """
+
+    def __init__(self, path: str, recheck_interval: float = INDEX_RECHECK_SECONDS):
+        self.path = path
+        self.recheck_interval = recheck_interval
+        self._signature: Optional[Tuple[int, int]] = None
+        self._bodies: Dict[Optional[str], EncodedBody] = {}
+        self._checked_at = float("-inf")
+
+    def _load(self) -> None:
+        try:
+            stat_result = os.stat(self.path)
+        except OSError:
+            self._signature, self._bodies = None, {}
+            return
+        signature = (stat_result.st_mtime_ns, stat_result.st_size)
+        if signature == self._signature:
+            return
+        with open(self.path, "rb") as f:
+            body = f.read()
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        # Each encoding is a different representation, so each gets its own strong tag
+        bodies = {None: EncodedBody(body, f'"{digest}"', None)}
+        bodies["gzip"] = EncodedBody(gzip.compress(body, 9, mtime=0), f'"{digest}-gzip"', "gzip")
+        if brotli is not None:
+            bodies["br"] = EncodedBody(brotli.compress(body), f'"{digest}-br"', "br")
+        self._signature, self._bodies = signature, bodies
+
+    def get(self, accept_encoding: Optional[str] = None) -> Optional[EncodedBody]:
+        """The page in the best encoding the client accepts; None while there is no build."""
+        now = time.monotonic()
+        if now - self._checked_at >= self.recheck_interval:
+            self._checked_at = now
+            self._load()
+        if not self._bodies:
+            return None
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, _ in PRECOMPRESSED:
+            if encoding in accepted and encoding in self._bodies:
+                return self._bodies[encoding]
+        return self._bodies[None]
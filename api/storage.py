@@ -1,24 +1,329 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
-from models import Campaign, Metric, Integration, PerformanceData, CampaignStatus, IntegrationStatus
+from collections import OrderedDict, deque
+from typing import List, Optional, Dict, Any, Tuple, Deque, AsyncIterator, NamedTuple, Sequence, Iterable, Callable
+from models import (
+    Campaign, Metric, Integration, PerformanceData, CampaignStatus, IntegrationStatus, ChangeEvent,
+    CampaignQuery, PerformanceQuery, PerformanceSortField, SortDirection, PerformanceGroupBy, PerformanceAggregate,
+    RollupGrain, PerformanceCompaction,
+)
+from pydantic import BaseModel, TypeAdapter
+from performance_store import PerformanceColumns, ALL_PLATFORMS, format_date, parse_date
+from records import RecordType, CAMPAIGN_RECORDS, METRIC_RECORDS, INTEGRATION_RECORDS
 from datetime import datetime
+from enum import Enum
+import asyncio
+import base64
+import bisect
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import os
+import re
+import time
 import uuid
+from operator import itemgetter
+
+Page = Tuple[List[Any], Optional[str]]
+
+# Storage is partitioned per client (tenant); requests without a client use this one
+DEFAULT_CLIENT_ID = "default"
+CLIENT_ID_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$"
+# Partitions get_storage creates at most when STORAGE_MAX_CLIENTS is unset
+MAX_CLIENTS = 100
+
+# Serializers for the list reads, built once; used for the pre-serialized JSON
+# bodies of the hot list endpoints
+campaigns_json = TypeAdapter(List[Campaign])
+metrics_json = TypeAdapter(List[Metric])
+integrations_json = TypeAdapter(List[Integration])
+performance_json = TypeAdapter(List[PerformanceData])
+# Sparse list reads come back as plain dicts of just the requested fields
+values_json = TypeAdapter(List[Dict[str, Any]])
+
+# Field names picked by a ``fields`` query, in model field order; None means every field
+Fields = Optional[Tuple[str, ...]]
+
+
+def dump_fields(adapter: TypeAdapter, items: List[Any], fields: Fields = None) -> bytes:
+    """JSON array of ``items``, keeping only ``fields`` of each when given."""
+    return adapter.dump_json(items, include=None if fields is None else {"__all__": set(fields)})
+
+
+class JsonBody(NamedTuple):
+    """Serialized body of a list read with its strong ETag."""
+    body: bytes
+    etag: str
+
+
+def json_body(body: bytes) -> JsonBody:
+    # The tag is a digest of the bytes, so it only changes when the content does
+    # and stays valid across restarts and between workers
+    return JsonBody(body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+
+
+# Upper bound on the serialized list bodies MemoryStorage keeps between writes
+JSON_BODY_CACHE_BYTES = int(os.getenv("STORAGE_JSON_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+
+class JsonBodyCache:
+    """LRU of serialized list bodies, dropped per collection on every write.
+
+    Keys are tuples starting with the collection name. Builders run
+    synchronously, so no write can land between building a body and
+    storing it.
+    """
+
+    def __init__(self, max_bytes: int = JSON_BODY_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[Tuple[Any, ...], JsonBody]" = OrderedDict()
+
+    def get(self, key: Tuple[Any, ...], build: Callable[[], bytes]) -> JsonBody:
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+            return cached
+        value = json_body(build())
+        if len(value.body) <= self.max_bytes:
+            self._entries[key] = value
+            self.bytes += len(value.body)
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted.body)
+        return value
+
+    def invalidate(self, collection: str) -> None:
+        for key in [key for key in self._entries if key[0] == collection]:
+            self.bytes -= len(self._entries.pop(key).body)
+
+# Number of recent mutations kept in the change feed
+CHANGE_LOG_SIZE = int(os.getenv("CHANGE_LOG_SIZE", "10000"))
+# How often change-feed subscribers re-check storage when not woken by a local
+# write, which is how they see writes made by other worker processes
+CHANGE_POLL_INTERVAL = 1.0
+
+# Rows per batch when streaming performance rows out of storage
+EXPORT_BATCH_SIZE = 5000
+
+# Keys of a performance column batch (see IStorage.iter_performance_columns).
+# Dates are proleptic Gregorian ordinals and created_at a Unix timestamp (NaN
+# when unknown); numeric columns may be ``array.array``s or any sequence.
+PERFORMANCE_COLUMNS = (
+    "id", "date", "platform", "impressions", "clicks", "conversions", "spend", "revenue", "created_at",
+)
+
+# Times MemoryStorage rebuilds a compacted table before giving up because
+# rows it copied kept being corrected meanwhile
+COMPACTION_ATTEMPTS = 3
+
+# Column imports of at least this many rows are applied to a copy of the
+# table on a worker thread, so the event loop keeps serving meanwhile
+IMPORT_THREAD_ROWS = 50000
+
+def encode_cursor(key: Any) -> str:
+    """Encode the keyset position of the last row on a page as an opaque cursor.
+
+    The key is the row's storage sequence, or ``[sort value, sequence]`` for
+    sorted queries.
+    """
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Any:
+    """Return the keyset position after which the next page starts (None for the first page)."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor {cursor!r}")
+
+def decode_seq_cursor(cursor: Optional[str]) -> int:
+    """Decode a cursor for unsorted pages; -1 means start from the beginning."""
+    after = decode_cursor(cursor)
+    if after is None:
+        return -1
+    if not isinstance(after, int):
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    return after
+
+def decode_sorted_cursor(cursor: Optional[str]) -> Optional[Tuple[Any, int]]:
+    """Decode a cursor for sorted pages into its (sort value, sequence) pair."""
+    after = decode_cursor(cursor)
+    if after is None:
+        return None
+    if not (isinstance(after, list) and len(after) == 2 and isinstance(after[1], int)):
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    return after[0], after[1]
+
+def paginate_sorted(
+    rows: Iterable[Tuple[Tuple[Any, int], Any]],
+    sort_dir: SortDirection,
+    limit: Optional[int],
+    cursor: Optional[str],
+) -> Page:
+    """Keyset-paginate in-memory ``((sort value, seq), record)`` pairs.
+
+    Rows are filtered by the cursor first and a page is picked with a bounded
+    heap, so a page costs O(n log limit) rather than a sort of every row.
+    """
+    after = decode_sorted_cursor(cursor)
+    descending = sort_dir == SortDirection.DESC
+    if after is not None:
+        try:
+            rows = [row for row in rows if (row[0] < after if descending else row[0] > after)]
+        except TypeError:
+            raise ValueError(f"Invalid cursor {cursor!r}")
+    if limit is None:
+        return [record for _, record in sorted(rows, key=itemgetter(0), reverse=descending)], None
+    select = heapq.nlargest if descending else heapq.nsmallest
+    page = select(limit + 1, rows, key=itemgetter(0))
+    if len(page) <= limit:
+        return [record for _, record in page], None
+    return [record for _, record in page[:limit]], encode_cursor(list(page[limit - 1][0]))
+
+def paginate_presorted(
+    records: Sequence[Any],
+    key: Callable[[Any], Tuple[Any, int]],
+    sort_dir: SortDirection,
+    limit: Optional[int],
+    cursor: Optional[str],
+) -> Page:
+    """Keyset-paginate ``records`` that are already in ascending ``key`` order,
+    locating the cursor by binary search instead of sorting."""
+    after = decode_sorted_cursor(cursor)
+    descending = sort_dir == SortDirection.DESC
+    start, stop = 0, len(records)
+    if after is not None:
+        try:
+            if descending:
+                stop = bisect.bisect_left(records, after, key=key)
+            else:
+                start = bisect.bisect_right(records, after, key=key)
+        except TypeError:
+            raise ValueError(f"Invalid cursor {cursor!r}")
+    if descending:
+        first = 0 if limit is None else max(stop - limit, 0)
+        page, more = list(reversed(records[first:stop])), first > 0
+    else:
+        last = stop if limit is None else min(start + limit, stop)
+        page, more = list(records[start:last]), last < stop
+    return page, encode_cursor(list(key(page[-1]))) if more and page else None
+
+class VersionConflictError(Exception):
+    """A conditional write found the record at a different version than expected."""
+
+    def __init__(self, record_id: str, expected: int, actual: int):
+        super().__init__(f"Record {record_id} is at version {actual}, expected {expected}")
+        self.record_id = record_id
+        self.expected = expected
+        self.actual = actual
+
+class UnknownClientError(Exception):
+    """A well-formed client id that is not provisioned, or that would exceed the partition limit."""
+
+class ChangeFeedGapError(Exception):
+    """The requested change-feed position is no longer (or not yet) retained;
+    the client has to re-read current state and continue from ``latest``."""
+
+    def __init__(self, since: int, latest: int):
+        super().__init__(f"Changes after sequence {since} are not available (latest is {latest})")
+        self.since = since
+        self.latest = latest
+
+class ChangeNotifier:
+    """Wakes change-feed subscribers waiting on the event loop when a write commits."""
+
+    def __init__(self):
+        self._event: Optional[asyncio.Event] = None
+
+    def notify(self) -> None:
+        if self._event is not None:
+            self._event.set()
+            self._event = None
+
+    async def wait(self, timeout: float) -> None:
+        if self._event is None:
+            self._event = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
 
 class IStorage(ABC):
+    """Storage backend contract.
+
+    Campaigns and integrations carry a ``version`` that every update bumps.
+    Single-record updates and deletes accept an ``expected_version``: the write
+    only happens if the record is still at that version (checked and applied
+    atomically per record), otherwise VersionConflictError is raised.
+
+    Every committed mutation is also appended to a change feed under a
+    monotonically increasing sequence number (see ``get_changes``).
+
+    An instance holds the data of a single client: every method only reads
+    and writes that client's partition, and created records are stamped with
+    its ``client_id``. Use ``get_storage(client_id)`` to get a partition.
+    """
+
+    def __init__(self):
+        self.change_notifier = ChangeNotifier()
+        # Held by compaction and by performance imports that span awaits, so a
+        # compaction in this process never lands in the middle of one
+        self.performance_lock = asyncio.Lock()
+
     @abstractmethod
     async def get_campaigns(self) -> List[Campaign]:
         pass
     
+    @abstractmethod
+    async def get_campaign(self, campaign_id: str) -> Optional[Campaign]:
+        pass
+    
     @abstractmethod
     async def create_campaign(self, campaign: Campaign) -> Campaign:
         pass
     
     @abstractmethod
-    async def update_campaign(self, campaign_id: str, updates: Dict[str, Any]) -> Campaign:
+    async def update_campaign(
+        self, campaign_id: str, updates: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Campaign:
+        pass
+    
+    @abstractmethod
+    async def delete_campaign(self, campaign_id: str, expected_version: Optional[int] = None) -> bool:
         pass
     
     @abstractmethod
-    async def delete_campaign(self, campaign_id: str) -> bool:
+    async def query_campaigns(
+        self, query: CampaignQuery, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Page:
+        """Return campaigns matching ``query`` in its sort order, one keyset page at a time.
+
+        With ``limit`` None every match is returned; the second element is the
+        cursor for the next page, or None when exhausted.
+        """
+        pass
+    
+    async def get_campaigns_page(self, limit: int, cursor: Optional[str] = None) -> Page:
+        """Return up to ``limit`` campaigns after ``cursor`` plus the next cursor (None when exhausted)."""
+        return await self.query_campaigns(CampaignQuery(), limit, cursor)
+    
+    @abstractmethod
+    async def create_campaigns(self, campaigns: List[Campaign]) -> List[Campaign]:
+        """Create many campaigns in one pass, returning them in input order."""
+        pass
+    
+    @abstractmethod
+    async def update_campaigns(self, updates: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Campaign]]:
+        """Apply ``(campaign_id, updates)`` pairs in one pass; None marks an unknown id."""
+        pass
+    
+    @abstractmethod
+    async def delete_campaigns(self, campaign_ids: List[str]) -> List[bool]:
+        """Delete many campaigns in one pass; False marks an id that did not exist."""
         pass
     
     @abstractmethod
@@ -26,28 +331,408 @@ class IStorage(ABC):
         pass
     
     @abstractmethod
-    async def get_performance(self) -> List[PerformanceData]:
+    async def get_performance(
+        self, start: Optional[str] = None, end: Optional[str] = None, platform: Optional[str] = None
+    ) -> List[PerformanceData]:
+        """Return performance rows, or only those dated within [start, end] (YYYY-MM-DD,
+        both optional) for ``platform``; windowed results are in date order."""
+        pass
+    
+    @abstractmethod
+    async def query_performance(
+        self, query: PerformanceQuery, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Page:
+        """Return performance rows matching ``query``, paginated like ``query_campaigns``."""
+        pass
+    
+    async def get_performance_page(self, limit: int, cursor: Optional[str] = None) -> Page:
+        """Return up to ``limit`` performance rows after ``cursor`` plus the next cursor."""
+        return await self.query_performance(PerformanceQuery(), limit, cursor)
+    
+    async def iter_performance(
+        self, query: PerformanceQuery, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[List[PerformanceData]]:
+        """Yield rows matching ``query`` in batches, in ``query_performance`` order.
+
+        Only one batch is held at a time, so exports of any size run in
+        constant memory.
+        """
+        cursor = None
+        while True:
+            rows, cursor = await self.query_performance(query, batch_size, cursor)
+            if rows:
+                yield rows
+            if cursor is None:
+                return
+    
+    async def iter_performance_columns(
+        self, query: PerformanceQuery, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[Dict[str, Sequence[Any]]]:
+        """Like ``iter_performance``, but each batch maps PERFORMANCE_COLUMNS to column values.
+
+        Columnar backends override this to skip building a model per row.
+        """
+        async for rows in self.iter_performance(query, batch_size):
+            yield {
+                "id": [row.id for row in rows],
+                "date": [parse_date(row.date) for row in rows],
+                "platform": [row.platform for row in rows],
+                "impressions": [row.impressions for row in rows],
+                "clicks": [row.clicks for row in rows],
+                "conversions": [row.conversions for row in rows],
+                "spend": [row.spend for row in rows],
+                "revenue": [row.revenue for row in rows],
+                "created_at": [row.created_at.timestamp() if row.created_at else math.nan for row in rows],
+            }
+    
+    async def import_performance_columns(self, columns: Dict[str, Sequence[Any]]) -> int:
+        """Insert already-validated rows given as a column batch (id and created_at are
+        ignored and assigned by storage, as in ``create_performance``); returns the row count."""
+        rows = [
+            PerformanceData(
+                date=format_date(ordinal), platform=platform, impressions=impressions, clicks=clicks,
+                conversions=conversions, spend=spend, revenue=revenue,
+            )
+            for ordinal, platform, impressions, clicks, conversions, spend, revenue in zip(
+                columns["date"], columns["platform"], columns["impressions"], columns["clicks"],
+                columns["conversions"], columns["spend"], columns["revenue"],
+            )
+        ]
+        await self.create_performance(rows)
+        return len(rows)
+    
+    @abstractmethod
+    async def upsert_performance_columns(self, columns: Dict[str, Sequence[Any]]) -> Tuple[int, int]:
+        """Write already-validated rows keyed by (date, platform) and return (inserted, updated).
+
+        A key that is already stored has the metrics of its newest row
+        replaced, so re-uploading a file does not duplicate it; within the
+        batch the last row for a key wins. Raises ValueError, writing nothing,
+        when a row is dated before the compaction cutoff.
+        """
+        pass
+    
+    @abstractmethod
+    async def create_performance(self, rows: List[PerformanceData]) -> List[PerformanceData]:
+        """Insert performance rows (assigning ids) and fold them into the rollups."""
+        pass
+    
+    @abstractmethod
+    async def update_performance(self, row_id: str, updates: Dict[str, Any]) -> PerformanceData:
+        """Correct a stored performance row; its rollup buckets are adjusted to match."""
+        pass
+    
+    @abstractmethod
+    async def get_performance_rollup(
+        self,
+        grain: RollupGrain,
+        platform: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> List[PerformanceAggregate]:
+        """Pre-aggregated totals per day/ISO week/month bucket, overall or for one platform.
+
+        Each result's ``group`` is the bucket's first day; buckets overlapping
+        [start, end] are included whole.
+        """
+        pass
+    
+    @abstractmethod
+    async def aggregate_performance(
+        self, query: PerformanceQuery, group_by: Optional[PerformanceGroupBy] = None
+    ) -> List[PerformanceAggregate]:
+        """Row counts and metric sums for rows matching ``query``, optionally grouped."""
+        pass
+    
+    @abstractmethod
+    async def compact_performance(self, before: str, keep_grains: List[RollupGrain]) -> PerformanceCompaction:
+        """Delete performance rows dated before ``before`` (YYYY-MM-DD), keeping their totals
+        in the ``keep_grains`` rollups; buckets of other grains that end before it are dropped.
+
+        Recorded in the change feed as one "compact" event.
+        """
+        pass
+    
+    @abstractmethod
+    async def get_compaction_cutoff(self) -> Optional[str]:
+        """Newest ``before`` compaction has run with (YYYY-MM-DD), or None.
+
+        Rows dated before it only survive in the rollups, so they can no longer be upserted.
+        """
         pass
     
     @abstractmethod
     async def get_integrations(self) -> List[Integration]:
         pass
     
+    @abstractmethod
+    async def get_integration(self, integration_id: str) -> Optional[Integration]:
+        pass
+    
     @abstractmethod
     async def create_integration(self, integration: Integration) -> Integration:
         pass
     
     @abstractmethod
-    async def update_integration(self, integration_id: str, updates: Dict[str, Any]) -> Integration:
+    async def update_integration(
+        self, integration_id: str, updates: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Integration:
+        pass
+    
+    @abstractmethod
+    async def delete_integration(self, integration_id: str, expected_version: Optional[int] = None) -> bool:
+        pass
+    
+    @abstractmethod
+    async def create_integrations(self, integrations: List[Integration]) -> List[Integration]:
+        pass
+    
+    @abstractmethod
+    async def update_integrations(self, updates: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Integration]]:
         pass
     
     @abstractmethod
-    async def delete_integration(self, integration_id: str) -> bool:
+    async def delete_integrations(self, integration_ids: List[str]) -> List[bool]:
         pass
+    
+    # JSON bodies and ETags of the plain list reads; caching backends serve stored ones.
+    # With ``fields`` only those fields of each record are encoded, and backends
+    # override these to only read and decode those fields in the first place.
+    
+    async def get_campaigns_json(self, fields: Fields = None) -> JsonBody:
+        return json_body(dump_fields(campaigns_json, await self.get_campaigns(), fields))
+    
+    async def get_metrics_json(self, fields: Fields = None) -> JsonBody:
+        return json_body(dump_fields(metrics_json, await self.get_metrics(), fields))
+    
+    async def get_integrations_json(self, fields: Fields = None) -> JsonBody:
+        return json_body(dump_fields(integrations_json, await self.get_integrations(), fields))
+    
+    async def get_performance_json(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        platform: Optional[str] = None,
+        fields: Fields = None,
+    ) -> JsonBody:
+        return json_body(dump_fields(performance_json, await self.get_performance(start, end, platform), fields))
+    
+    @abstractmethod
+    async def get_change_seq(self) -> int:
+        """Sequence number of the latest committed mutation (0 before the first)."""
+        pass
+    
+    @abstractmethod
+    async def get_changes(self, since: int, limit: Optional[int] = None) -> List[ChangeEvent]:
+        """Mutations with a sequence number above ``since``, oldest first.
+
+        Raises ChangeFeedGapError when some of those changes have been dropped
+        from the retained history or ``since`` is ahead of the feed.
+        """
+        pass
+    
+    async def wait_for_changes(self, since: int, timeout: float) -> bool:
+        """Wait until a mutation after ``since`` exists or ``timeout`` seconds pass; True if one does."""
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            if await self.get_change_seq() != since:
+                return True
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                return False
+            await self.change_notifier.wait(min(remaining, CHANGE_POLL_INTERVAL))
+    
+    async def close(self) -> None:
+        """Release resources and flush durable state at application shutdown."""
+        pass
+
+def _index_key(value: Any) -> Any:
+    # Enum members and their raw values must land in the same index bucket,
+    # since PATCH bodies carry plain strings (e.g. "paused")
+    return value.value if isinstance(value, Enum) else value
+
+class IndexedCollection:
+    """Id-keyed record store that keeps insertion order and secondary indexes.
+
+    Point lookups, updates and deletes are O(1); reads filtered on an indexed
+    field only touch the matching records.
+    """
+
+    def __init__(self, indexed_fields: Tuple[str, ...] = ()):
+        self._records: Dict[str, Any] = {}
+        # Insertion sequence per id, so index hits come back in storage order
+        self._seq: Dict[str, int] = {}
+        self._next_seq = 0
+        # Append-only (seq, id) log for keyset pagination; deleted ids are
+        # skipped lazily and purged once they make up half of the log
+        self._order_seqs: List[int] = []
+        self._order_ids: List[str] = []
+        # field -> value -> ordered set of ids (dict keys keep insertion order)
+        self._indexes: Dict[str, Dict[Any, Dict[str, None]]] = {field: {} for field in indexed_fields}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._records
+
+    def __iter__(self):
+        return iter(self._records.values())
+
+    def get(self, record_id: str) -> Optional[Any]:
+        return self._records.get(record_id)
+
+    def all(self) -> List[Any]:
+        return list(self._records.values())
+
+    def lookup(self, field: str, value: Any) -> List[Any]:
+        ids = self._indexes[field].get(_index_key(value), {})
+        return [self._records[record_id] for record_id in sorted(ids, key=self._seq.__getitem__)]
+
+    def add(self, record: Any) -> Any:
+        if record.id in self._records:
+            self._unindex(self._records[record.id])
+        else:
+            self._seq[record.id] = self._next_seq
+            self._order_seqs.append(self._next_seq)
+            self._order_ids.append(record.id)
+            self._next_seq += 1
+        self._records[record.id] = record
+        self._index(record)
+        return record
+
+    def update(self, record_id: str, updates: Dict[str, Any]) -> Optional[Any]:
+        record = self._records.get(record_id)
+        if record is None:
+            return None
+        for key, value in updates.items():
+            # The id is the storage key; the version and owning client are managed by the storage
+            if key in ("id", "version", "client_id") or not hasattr(record, key):
+                continue
+            if key in self._indexes:
+                self._unindex_field(key, record)
+            setattr(record, key, value)
+            if key in self._indexes:
+                self._index_field(key, record)
+        return record
+
+    def remove(self, record_id: str) -> bool:
+        record = self._records.pop(record_id, None)
+        if record is None:
+            return False
+        del self._seq[record_id]
+        self._unindex(record)
+        if len(self._order_ids) > 2 * len(self._records) + 64:
+            self._compact_order()
+        return True
+
+    def seq_of(self, record_id: str) -> int:
+        return self._seq[record_id]
+
+    def items_with_seq(self) -> List[Tuple[int, Any]]:
+        """Records with their insertion sequence, in insertion order (for snapshots)."""
+        return [(self._seq[record_id], record) for record_id, record in self._records.items()]
+
+    def restore(self, seq: int, record: Any) -> None:
+        """Re-insert a snapshotted record under its original sequence, so cursors survive restarts.
+
+        Records must be restored in ascending sequence order.
+        """
+        self._seq[record.id] = seq
+        self._order_seqs.append(seq)
+        self._order_ids.append(record.id)
+        self._next_seq = max(self._next_seq, seq + 1)
+        self._records[record.id] = record
+        self._index(record)
+
+    def page(self, after_seq: int, limit: Optional[int]) -> Tuple[List[Any], Optional[int]]:
+        """Return up to ``limit`` records inserted after ``after_seq`` and the last seq
+        returned, or None when no records follow."""
+        records: List[Any] = []
+        last_seq: Optional[int] = None
+        position = bisect.bisect_right(self._order_seqs, after_seq)
+        while position < len(self._order_ids):
+            record_id = self._order_ids[position]
+            seq = self._order_seqs[position]
+            position += 1
+            if self._seq.get(record_id) != seq:
+                continue
+            if len(records) == limit:
+                return records, last_seq
+            records.append(self._records[record_id])
+            last_seq = seq
+        return records, None
+
+    def _compact_order(self) -> None:
+        live = [
+            (seq, record_id)
+            for seq, record_id in zip(self._order_seqs, self._order_ids)
+            if self._seq.get(record_id) == seq
+        ]
+        self._order_seqs = [seq for seq, _ in live]
+        self._order_ids = [record_id for _, record_id in live]
+
+    def _index(self, record: Any) -> None:
+        for field in self._indexes:
+            self._index_field(field, record)
+
+    def _unindex(self, record: Any) -> None:
+        for field in self._indexes:
+            self._unindex_field(field, record)
+
+    def _index_field(self, field: str, record: Any) -> None:
+        key = _index_key(getattr(record, field))
+        self._indexes[field].setdefault(key, {})[record.id] = None
+
+    def _unindex_field(self, field: str, record: Any) -> None:
+        key = _index_key(getattr(record, field))
+        bucket = self._indexes[field].get(key)
+        if bucket is not None:
+            bucket.pop(record.id, None)
+            if not bucket:
+                del self._indexes[field][key]
+
+def _campaign_sort_value(record: Any, field: Optional[str]) -> Any:
+    if field is None:
+        return 0
+    if field == "spend":
+        return float(record.spend)
+    return _index_key(getattr(record, field))
+
+def _performance_sort_keys(store: PerformanceColumns, field: Optional[str]):
+    """Sort value accessor over row positions in the columnar store."""
+    if field is None:
+        return lambda position: 0
+    if field == "platform":
+        # Rows without a platform sort first, matching COALESCE(platform, '') in SQL
+        return lambda position: store.decode_platform(store.platforms[position]) or ""
+    column = store.dates if field == "date" else getattr(store, field)
+    return column.__getitem__
+
+
+def _records_json(adapter: TypeAdapter, record_type: RecordType, records: IndexedCollection, fields: Fields) -> bytes:
+    """JSON array of a record collection, or of just ``fields`` of each record."""
+    if fields is None:
+        return adapter.dump_json([record_type.unpack(record) for record in records])
+    return values_json.dump_json(record_type.values(records.all(), fields))
 
 class MemoryStorage(IStorage):
-    def __init__(self):
-        self.campaigns: List[Campaign] = [
+    def __init__(self, seed: bool = True, client_id: str = DEFAULT_CLIENT_ID):
+        super().__init__()
+        self.client_id = client_id
+        self.changes: Deque[ChangeEvent] = deque(maxlen=CHANGE_LOG_SIZE)
+        self.change_seq = 0
+        self.campaigns = IndexedCollection(("platform", "status", "type"))
+        self.metrics = IndexedCollection()
+        self.integrations = IndexedCollection(("platform", "status"))
+        self.performance = PerformanceColumns(client_id)
+        # Serialized list bodies, so repeated and conditional reads skip serialization
+        self.json_bodies = JsonBodyCache()
+        if seed:
+            self._seed()
+
+    def _seed(self):
+        for campaign in [
             Campaign(
                 id="1",
                 name="Summer Sale Campaign",
@@ -81,9 +766,10 @@ class MemoryStorage(IStorage):
                 status=CampaignStatus.PAUSED,
                 created_at=datetime.now()
             )
-        ]
+        ]:
+            self.campaigns.add(CAMPAIGN_RECORDS.pack(campaign, client_id=self.client_id))
         
-        self.metrics: List[Metric] = [
+        for metric in [
             Metric(
                 id="1",
                 name="Total Impressions",
@@ -116,9 +802,10 @@ class MemoryStorage(IStorage):
                 period="30d", 
                 created_at=datetime.now()
             )
-        ]
+        ]:
+            self.metrics.add(METRIC_RECORDS.pack(metric, client_id=self.client_id))
         
-        self.performance_data: List[PerformanceData] = [
+        self.performance.extend([
             PerformanceData(
                 id="1",
                 date="2024-01-01",
@@ -152,9 +839,9 @@ class MemoryStorage(IStorage):
                 platform="LinkedIn",
                 created_at=datetime.now()
             )
-        ]
+        ])
         
-        self.integrations: List[Integration] = [
+        for integration in [
             Integration(
                 id="1",
                 platform="Facebook",
@@ -183,14 +870,58 @@ class MemoryStorage(IStorage):
                 status=IntegrationStatus.ERROR,
                 created_at=datetime.now()
             )
-        ]
+        ]:
+            self.integrations.add(INTEGRATION_RECORDS.pack(integration, client_id=self.client_id))
+
+    def _record_change(
+        self, collection: str, op: str, record_id: str, record: Optional[Any] = None,
+        batch: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Called after every committed mutation with op "create", "update", "delete",
+        "compact", "import" or "upsert".
+
+        Appends the change to the feed; subclasses hook persistence in. An
+        upsert's feed record is only a summary, so ``batch`` carries the
+        ``upsert_columns`` arguments for them.
+        """
+        self.json_bodies.invalidate(collection)
+        self.change_seq += 1
+        self.changes.append(ChangeEvent(
+            seq=self.change_seq, collection=collection, op=op, id=record_id,
+            record=record.model_dump(mode="json") if isinstance(record, BaseModel) else record,
+        ))
+        self.change_notifier.notify()
+
+    async def get_change_seq(self) -> int:
+        return self.change_seq
+
+    async def get_changes(self, since: int, limit: Optional[int] = None) -> List[ChangeEvent]:
+        # Sequence numbers in the deque are contiguous, so positions follow from the first one
+        first = self.changes[0].seq if self.changes else self.change_seq + 1
+        if since > self.change_seq or since < first - 1:
+            raise ChangeFeedGapError(since, self.change_seq)
+        start = since - first + 1
+        return list(itertools.islice(self.changes, start, None if limit is None else start + limit))
 
+    def _check_version(self, records: IndexedCollection, record_id: str, expected_version: Optional[int]) -> None:
+        # Callers apply the write right after this without awaiting, so no other
+        # request can run between the check and the update
+        record = records.get(record_id)
+        if record is not None and expected_version is not None and record.version != expected_version:
+            raise VersionConflictError(record_id, expected_version, record.version)
+
+    # Collections hold compact records (see records.py); models are built on the way out
+    
     async def get_campaigns(self) -> List[Campaign]:
-        return self.campaigns
+        return [CAMPAIGN_RECORDS.unpack(record) for record in self.campaigns]
+    
+    async def get_campaign(self, campaign_id: str) -> Optional[Campaign]:
+        return CAMPAIGN_RECORDS.unpack_optional(self.campaigns.get(campaign_id))
     
     async def create_campaign(self, campaign: Campaign) -> Campaign:
         campaign = Campaign(
             id=str(uuid.uuid4()),
+            client_id=self.client_id,
             name=campaign.name,
             type=campaign.type,
             platform=campaign.platform,
@@ -201,71 +932,489 @@ class MemoryStorage(IStorage):
             created_at=datetime.now(),
             updated_at=datetime.now()
         )
-        self.campaigns.append(campaign)
+        self.campaigns.add(CAMPAIGN_RECORDS.pack(campaign))
+        self._record_change("campaigns", "create", campaign.id, campaign)
         return campaign
     
-    async def update_campaign(self, campaign_id: str, updates: Dict[str, Any]) -> Campaign:
-        for i, campaign in enumerate(self.campaigns):
-            if campaign.id == campaign_id:
-                # Update fields
-                for key, value in updates.items():
-                    if hasattr(campaign, key):
-                        setattr(campaign, key, value)
-                campaign.updated_at = datetime.now()
-                self.campaigns[i] = campaign
-                return campaign
-        raise ValueError(f"Campaign with id {campaign_id} not found")
-    
-    async def delete_campaign(self, campaign_id: str) -> bool:
-        for i, campaign in enumerate(self.campaigns):
-            if campaign.id == campaign_id:
-                del self.campaigns[i]
-                return True
-        return False
+    def _apply_campaign_update(self, campaign_id: str, updates: Dict[str, Any]) -> Optional[Campaign]:
+        record = self.campaigns.get(campaign_id)
+        if record is None:
+            return None
+        self.campaigns.update(campaign_id, CAMPAIGN_RECORDS.validate_updates(record, updates))
+        record.updated_at = time.time()
+        record.version += 1
+        campaign = CAMPAIGN_RECORDS.unpack(record)
+        self._record_change("campaigns", "update", campaign_id, campaign)
+        return campaign
+    
+    async def update_campaign(
+        self, campaign_id: str, updates: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Campaign:
+        self._check_version(self.campaigns, campaign_id, expected_version)
+        campaign = self._apply_campaign_update(campaign_id, updates)
+        if campaign is None:
+            raise ValueError(f"Campaign with id {campaign_id} not found")
+        return campaign
+    
+    def _remove_campaign(self, campaign_id: str) -> bool:
+        removed = self.campaigns.remove(campaign_id)
+        if removed:
+            self._record_change("campaigns", "delete", campaign_id)
+        return removed
+    
+    async def delete_campaign(self, campaign_id: str, expected_version: Optional[int] = None) -> bool:
+        self._check_version(self.campaigns, campaign_id, expected_version)
+        return self._remove_campaign(campaign_id)
+    
+    async def create_campaigns(self, campaigns: List[Campaign]) -> List[Campaign]:
+        return [await self.create_campaign(campaign) for campaign in campaigns]
+    
+    async def update_campaigns(self, updates: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Campaign]]:
+        return [self._apply_campaign_update(campaign_id, changes) for campaign_id, changes in updates]
+    
+    async def delete_campaigns(self, campaign_ids: List[str]) -> List[bool]:
+        return [self._remove_campaign(campaign_id) for campaign_id in campaign_ids]
+    
+    async def query_campaigns(
+        self, query: CampaignQuery, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Page:
+        filters = {
+            field: getattr(query, field)
+            for field in ("platform", "status", "type")
+            if getattr(query, field) is not None
+        }
+        if not filters and query.min_spend is None and query.sort_by is None:
+            records, last_seq = self.campaigns.page(decode_seq_cursor(cursor), limit)
+            return (
+                [CAMPAIGN_RECORDS.unpack(record) for record in records],
+                encode_cursor(last_seq) if last_seq is not None else None,
+            )
+
+        if filters:
+            # Start from the smallest matching index bucket and check the rest per row
+            candidates = min(
+                (self.campaigns.lookup(field, value) for field, value in filters.items()), key=len
+            )
+        else:
+            candidates = self.campaigns.all()
+        matches = [
+            campaign for campaign in candidates
+            if all(_index_key(getattr(campaign, field)) == _index_key(value) for field, value in filters.items())
+            and (query.min_spend is None or float(campaign.spend) >= query.min_spend)
+        ]
+        sort_field = query.sort_by.value if query.sort_by else None
+        rows = [
+            ((_campaign_sort_value(campaign, sort_field), self.campaigns.seq_of(campaign.id)), campaign)
+            for campaign in matches
+        ]
+        records, next_cursor = paginate_sorted(rows, query.sort_dir, limit, cursor)
+        return [CAMPAIGN_RECORDS.unpack(record) for record in records], next_cursor
+    
+    async def get_campaigns_json(self, fields: Fields = None) -> JsonBody:
+        return self.json_bodies.get(("campaigns", fields), lambda: _records_json(
+            campaigns_json, CAMPAIGN_RECORDS, self.campaigns, fields
+        ))
     
     async def get_metrics(self) -> List[Metric]:
-        return self.metrics
+        return [METRIC_RECORDS.unpack(record) for record in self.metrics]
+    
+    async def get_metrics_json(self, fields: Fields = None) -> JsonBody:
+        return self.json_bodies.get(("metrics", fields), lambda: _records_json(
+            metrics_json, METRIC_RECORDS, self.metrics, fields
+        ))
+    
+    def _window_positions(
+        self, start: Optional[str], end: Optional[str], platform: Optional[str]
+    ) -> Optional[List[int]]:
+        """Positions of a date-window read, or None for the whole table."""
+        if start is None and end is None and platform is None:
+            return None
+        return self.performance.select(
+            platform=platform,
+            start=parse_date(start) if start else None,
+            end=parse_date(end) if end else None,
+        )
+    
+    async def get_performance(
+        self, start: Optional[str] = None, end: Optional[str] = None, platform: Optional[str] = None
+    ) -> List[PerformanceData]:
+        return self.performance.rows(self._window_positions(start, end, platform))
+    
+    async def get_performance_json(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        platform: Optional[str] = None,
+        fields: Fields = None,
+    ) -> JsonBody:
+        def build() -> bytes:
+            positions = self._window_positions(start, end, platform)
+            if fields is None:
+                return performance_json.dump_json(self.performance.rows(positions))
+            # Only the requested columns are read and decoded
+            return values_json.dump_json(self.performance.values(positions, fields))
+
+        return self.json_bodies.get(("performance", start, end, platform, fields), build)
+    
+    def _performance_positions(self, query: PerformanceQuery) -> List[int]:
+        return self.performance.select(
+            platform=query.platform,
+            start=parse_date(query.start_date) if query.start_date else None,
+            end=parse_date(query.end_date) if query.end_date else None,
+            min_spend=query.min_spend,
+        )
+    
+    async def query_performance(
+        self, query: PerformanceQuery, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Page:
+        # Row ids increase with position and survive compaction, so the id is the sequence
+        ids = self.performance.ids
+        total = len(self.performance)
+        if query == PerformanceQuery():
+            start = bisect.bisect_right(ids, decode_seq_cursor(cursor))
+            end = total if limit is None else min(start + limit, total)
+            rows = self.performance.rows(range(start, end))
+            return rows, encode_cursor(ids[end - 1]) if end < total else None
+
+        positions = self._performance_positions(query)
+        if query.sort_by == PerformanceSortField.DATE and (query.platform or query.start_date or query.end_date):
+            # These come straight from a date index, already in (date, id) order
+            dates = self.performance.dates
+            positions, next_cursor = paginate_presorted(
+                positions, lambda position: (dates[position], ids[position]), query.sort_dir, limit, cursor
+            )
+            return self.performance.rows(positions), next_cursor
+        sort_key = _performance_sort_keys(self.performance, query.sort_by.value if query.sort_by else None)
+        keyed = (((sort_key(position), ids[position]), position) for position in positions)
+        positions, next_cursor = paginate_sorted(keyed, query.sort_dir, limit, cursor)
+        return self.performance.rows(positions), next_cursor
+    
+    async def _scan_performance(self, query: PerformanceQuery, batch_size: int):
+        """Yield ``(table, positions)`` chunks of rows matching an unsorted ``query``, in id order.
+
+        A compaction swaps in a new table; the scan keeps reading the one it
+        started on, and rows appended after it started are not included.
+        """
+        store = self.performance
+        total = len(store)
+        filtered = query != PerformanceQuery()
+        start = parse_date(query.start_date) if query.start_date else None
+        end = parse_date(query.end_date) if query.end_date else None
+        for first in range(0, total, batch_size):
+            positions = range(first, min(first + batch_size, total))
+            if filtered:
+                positions = store.match(positions, query.platform, start, end, query.min_spend)
+            if positions:
+                yield store, positions
+            else:
+                # Let other requests run while skipping over non-matching chunks
+                await asyncio.sleep(0)
+    
+    async def iter_performance(
+        self, query: PerformanceQuery, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[List[PerformanceData]]:
+        if query.sort_by is not None:
+            async for rows in super().iter_performance(query, batch_size):
+                yield rows
+            return
+        async for store, positions in self._scan_performance(query, batch_size):
+            yield store.rows(positions)
+    
+    async def iter_performance_columns(
+        self, query: PerformanceQuery, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[Dict[str, Sequence[Any]]]:
+        if query.sort_by is not None:
+            async for columns in super().iter_performance_columns(query, batch_size):
+                yield columns
+            return
+        async for store, positions in self._scan_performance(query, batch_size):
+            yield store.take(positions)
+    
+    async def import_performance_columns(self, columns: Dict[str, Sequence[Any]]) -> int:
+        count = len(columns["date"])
+        if not count:
+            return 0
+        values = (
+            columns["date"], columns["platform"], columns["impressions"], columns["clicks"],
+            columns["conversions"], columns["spend"], columns["revenue"], [time.time()] * count,
+        )
+        positions = None
+        if count >= IMPORT_THREAD_ROWS:
+            # Like compaction: extend a copy off the event loop and swap it in
+            # unless a write landed meanwhile, in which case try again. The lock
+            # keeps a compaction from pruning the live store in the meantime.
+            async with self.performance_lock:
+                for _ in range(COMPACTION_ATTEMPTS):
+                    live = self.performance
+                    extended = live.copy()
+                    added = await asyncio.to_thread(extended.extend_columns, *values)
+                    if self.performance is live and len(live) == added[0] and live.corrections == extended.corrections:
+                        self.performance, positions = extended, added
+                        break
+        if positions is None:
+            positions = self.performance.extend_columns(*values)
+        first_id = str(self.performance.ids[positions[0]])
+        # One feed event per batch instead of one per row
+        self._record_change("performance", "import", first_id, {
+            "first_id": first_id, "last_id": str(self.performance.ids[positions[-1]]), "rows": count,
+        })
+        return count
     
-    async def get_performance(self) -> List[PerformanceData]:
-        return self.performance_data
+    async def upsert_performance_columns(self, columns: Dict[str, Sequence[Any]]) -> Tuple[int, int]:
+        if not len(columns["date"]):
+            return 0, 0
+        batch = {
+            "dates": columns["date"], "platforms": columns["platform"], "impressions": columns["impressions"],
+            "clicks": columns["clicks"], "conversions": columns["conversions"], "spend": columns["spend"],
+            "revenue": columns["revenue"], "created_at": time.time(),
+        }
+        updated, inserted = self.performance.upsert_columns(**batch)
+        ids = self.performance.ids
+        first = updated[0] if updated else inserted[0]
+        summary = {"rows": len(columns["date"]), "inserted": len(inserted), "updated": len(updated)}
+        self._record_change("performance", "upsert", str(ids[first]), summary, batch)
+        return len(inserted), len(updated)
+    
+    async def create_performance(self, rows: List[PerformanceData]) -> List[PerformanceData]:
+        now = datetime.now()
+        created = []
+        for row in rows:
+            position = self.performance.append(row.model_copy(update={"id": None, "created_at": now}))
+            row = self.performance.row(position)
+            self._record_change("performance", "create", row.id, row)
+            created.append(row)
+        return created
+    
+    async def update_performance(self, row_id: str, updates: Dict[str, Any]) -> PerformanceData:
+        position = self.performance.position_of(row_id)
+        if position is None:
+            raise ValueError(f"Performance row with id {row_id} not found")
+        current = self.performance.row(position).model_dump()
+        changes = {key: value for key, value in updates.items() if key in current and key not in ("id", "client_id", "created_at")}
+        # Columns hold trusted values only, so corrections are validated before they land
+        self.performance.replace(position, PerformanceData.model_validate({**current, **changes}))
+        row = self.performance.row(position)
+        self._record_change("performance", "update", row_id, row)
+        return row
+    
+    async def get_performance_rollup(
+        self,
+        grain: RollupGrain,
+        platform: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> List[PerformanceAggregate]:
+        if platform is None:
+            code = ALL_PLATFORMS
+        elif platform in self.performance.platform_codes:
+            code = self.performance.platform_codes[platform]
+        else:
+            return []
+        buckets = self.performance.rollups.read(
+            grain.value, code,
+            parse_date(start) if start else None,
+            parse_date(end) if end else None,
+        )
+        return [
+            PerformanceAggregate(
+                group=format_date(bucket), rows=totals[0], impressions=totals[1], clicks=totals[2],
+                conversions=totals[3], spend=totals[4], revenue=totals[5],
+            )
+            for bucket, totals in buckets
+        ]
+    
+    async def aggregate_performance(
+        self, query: PerformanceQuery, group_by: Optional[PerformanceGroupBy] = None
+    ) -> List[PerformanceAggregate]:
+        positions = None if query == PerformanceQuery() else self._performance_positions(query)
+        groups = self.performance.aggregate(positions, group_by.value if group_by else None)
+        return [PerformanceAggregate(group=group, **totals) for group, totals in groups.items()]
+    
+    async def compact_performance(self, before: str, keep_grains: List[RollupGrain]) -> PerformanceCompaction:
+        async with self.performance_lock:
+            return await self._compact_performance(before, keep_grains)
+
+    async def _compact_performance(self, before: str, keep_grains: List[RollupGrain]) -> PerformanceCompaction:
+        cutoff = parse_date(before)
+        before = format_date(cutoff)
+        grains = [grain.value for grain in keep_grains]
+        dates = self.performance.date_index.dates
+        if not dates or dates[0] >= cutoff:
+            # Nothing expired; only buckets of grains no longer kept may go
+            result = PerformanceCompaction(before=before, keep_grains=keep_grains, bytes_reclaimed=0)
+            if self.performance.rollups.prune(cutoff, grains):
+                self.performance.mark_compacted(cutoff)
+                self._record_change("performance", "compact", before, result)
+            return result
+        for _ in range(COMPACTION_ATTEMPTS):
+            # The O(rows) rebuild runs on a worker thread over a copy; rows
+            # appended meanwhile are carried over before the copy is swapped in
+            live = self.performance
+            compacted = live.copy()
+            copied = len(compacted)
+            removed = await asyncio.to_thread(compacted.compact, cutoff, grains)
+            if self.performance is not live or live.corrections != compacted.corrections:
+                continue
+            for position in range(copied, len(live)):
+                row = live.row(position)
+                if parse_date(row.date) < cutoff:
+                    removed += 1
+                compacted.append_compacted(row, cutoff)
+            compacted.rollups.prune(cutoff, grains)
+            reclaimed = live.nbytes() - compacted.nbytes()
+            self.performance = compacted
+            result = PerformanceCompaction(
+                before=before, keep_grains=keep_grains, rows=removed, bytes_reclaimed=max(reclaimed, 0),
+            )
+            self._record_change("performance", "compact", before, result)
+            return result
+        raise RuntimeError("Performance rows kept being corrected during compaction; try again later")
+    
+    async def get_compaction_cutoff(self) -> Optional[str]:
+        cutoff = self.performance.compacted_before
+        return format_date(cutoff) if cutoff is not None else None
     
     async def get_integrations(self) -> List[Integration]:
-        return self.integrations
+        return [INTEGRATION_RECORDS.unpack(record) for record in self.integrations]
+    
+    async def get_integrations_json(self, fields: Fields = None) -> JsonBody:
+        return self.json_bodies.get(("integrations", fields), lambda: _records_json(
+            integrations_json, INTEGRATION_RECORDS, self.integrations, fields
+        ))
+    
+    async def get_integration(self, integration_id: str) -> Optional[Integration]:
+        return INTEGRATION_RECORDS.unpack_optional(self.integrations.get(integration_id))
     
     async def create_integration(self, integration: Integration) -> Integration:
         integration = Integration(
             id=str(uuid.uuid4()),
+            client_id=self.client_id,
             platform=integration.platform,
             status=integration.status,
             api_key=integration.api_key,
             account_id=integration.account_id,
             created_at=datetime.now()
         )
-        self.integrations.append(integration)
+        self.integrations.add(INTEGRATION_RECORDS.pack(integration))
+        self._record_change("integrations", "create", integration.id, integration)
         return integration
     
-    async def update_integration(self, integration_id: str, updates: Dict[str, Any]) -> Integration:
-        for i, integration in enumerate(self.integrations):
-            if integration.id == integration_id:
-                # Update fields
-                for key, value in updates.items():
-                    if hasattr(integration, key):
-                        setattr(integration, key, value)
-                if 'status' in updates and updates['status'] == 'connected':
-                    integration.last_sync = datetime.now()
-                self.integrations[i] = integration
-                return integration
-        raise ValueError(f"Integration with id {integration_id} not found")
-    
-    async def delete_integration(self, integration_id: str) -> bool:
-        for i, integration in enumerate(self.integrations):
-            if integration.id == integration_id:
-                del self.integrations[i]
-                return True
-        return False
+    def _apply_integration_update(self, integration_id: str, updates: Dict[str, Any]) -> Optional[Integration]:
+        record = self.integrations.get(integration_id)
+        if record is None:
+            return None
+        self.integrations.update(integration_id, INTEGRATION_RECORDS.validate_updates(record, updates))
+        if 'status' in updates and updates['status'] == 'connected':
+            record.last_sync = time.time()
+        record.version += 1
+        integration = INTEGRATION_RECORDS.unpack(record)
+        self._record_change("integrations", "update", integration_id, integration)
+        return integration
+    
+    async def update_integration(
+        self, integration_id: str, updates: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Integration:
+        self._check_version(self.integrations, integration_id, expected_version)
+        integration = self._apply_integration_update(integration_id, updates)
+        if integration is None:
+            raise ValueError(f"Integration with id {integration_id} not found")
+        return integration
+    
+    def _remove_integration(self, integration_id: str) -> bool:
+        removed = self.integrations.remove(integration_id)
+        if removed:
+            self._record_change("integrations", "delete", integration_id)
+        return removed
+    
+    async def delete_integration(self, integration_id: str, expected_version: Optional[int] = None) -> bool:
+        self._check_version(self.integrations, integration_id, expected_version)
+        return self._remove_integration(integration_id)
+    
+    async def create_integrations(self, integrations: List[Integration]) -> List[Integration]:
+        return [await self.create_integration(integration) for integration in integrations]
+    
+    async def update_integrations(self, updates: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Integration]]:
+        return [self._apply_integration_update(integration_id, changes) for integration_id, changes in updates]
+    
+    async def delete_integrations(self, integration_ids: List[str]) -> List[bool]:
+        return [self._remove_integration(integration_id) for integration_id in integration_ids]
+
+def create_storage(client_id: str = DEFAULT_CLIENT_ID) -> IStorage:
+    """Build one client's partition of the backend selected by STORAGE_BACKEND
+    ("memory" or "sql"), wrapped in a read-through cache of STORAGE_CACHE_SIZE
+    entries and STORAGE_CACHE_BYTES bytes (0 disables it). The cache is on by
+    default for SQL only; the memory backend already answers reads from memory
+    and keeps its own serialized list bodies (up to STORAGE_JSON_CACHE_BYTES),
+    so it is only wrapped when STORAGE_CACHE_SIZE is set.
+
+    The memory backend persists to MEMORY_STORAGE_DIR (snapshot + write-ahead log)
+    when that is set, other clients under MEMORY_STORAGE_DIR/clients/<client_id>;
+    MEMORY_STORAGE_FSYNC picks the fsync policy. Only the default client is
+    seeded with demo data.
+    """
+    storage = _create_backend(client_id)
+    cache_size = int(os.getenv("STORAGE_CACHE_SIZE", "0" if isinstance(storage, MemoryStorage) else "256"))
+    if cache_size <= 0:
+        return storage
+    from cache import CachedStorage
+    return CachedStorage(
+        storage, max_entries=cache_size, max_bytes=int(os.getenv("STORAGE_CACHE_BYTES", str(64 * 1024 * 1024)))
+    )
+
+def _create_backend(client_id: str) -> IStorage:
+    backend = os.getenv("STORAGE_BACKEND", "memory").lower()
+    seed = client_id == DEFAULT_CLIENT_ID
+    if backend == "memory":
+        data_dir = os.getenv("MEMORY_STORAGE_DIR")
+        if not data_dir:
+            return MemoryStorage(seed=seed, client_id=client_id)
+        from persistence import PersistentMemoryStorage
+        if client_id != DEFAULT_CLIENT_ID:
+            data_dir = os.path.join(data_dir, "clients", client_id)
+        return PersistentMemoryStorage(
+            data_dir,
+            fsync=os.getenv("MEMORY_STORAGE_FSYNC", "interval"),
+            snapshot_every=int(os.getenv("MEMORY_STORAGE_SNAPSHOT_EVERY", "100000")),
+            seed=seed,
+            client_id=client_id,
+        )
+    if backend == "sql":
+        # Imported lazily so the in-memory backend does not need a database driver
+        from sql_storage import SqlStorage
+        return SqlStorage(os.getenv("STORAGE_DATABASE_URL", "sqlite:///performancecore.db"), client_id=client_id)
+    raise ValueError(f"Unknown STORAGE_BACKEND {backend!r}")
+
+# One storage partition per client, created on first use
+_storages: Dict[str, IStorage] = {}
+
+def get_storage(client_id: str = DEFAULT_CLIENT_ID) -> IStorage:
+    """The client's partition, created on first use.
+
+    Every partition holds its own storage, cache and change notifier, so new
+    ones are limited: with STORAGE_CLIENT_IDS set (comma-separated) only those
+    clients and the default one get a partition, otherwise at most
+    STORAGE_MAX_CLIENTS are created. Raises ValueError for a malformed id and
+    UnknownClientError for a client that gets no partition.
+    """
+    storage = _storages.get(client_id)
+    if storage is None:
+        # The id names directories and partitions, so it is checked before first use
+        if not re.fullmatch(CLIENT_ID_PATTERN, client_id):
+            raise ValueError(f"Invalid client id {client_id!r}")
+        provisioned = os.getenv("STORAGE_CLIENT_IDS")
+        if provisioned:
+            if client_id != DEFAULT_CLIENT_ID and client_id not in {c.strip() for c in provisioned.split(",")}:
+                raise UnknownClientError(f"Client {client_id!r} is not provisioned")
+        elif len(_storages) >= int(os.getenv("STORAGE_MAX_CLIENTS", str(MAX_CLIENTS))):
+            raise UnknownClientError(f"Client {client_id!r} exceeds the limit of {len(_storages)} storage partitions")
+        storage = _storages[client_id] = create_storage(client_id)
+    return storage
 
-# Global storage instance
-_storage = MemoryStorage()
+def open_storages() -> List[IStorage]:
+    """Partitions created so far, e.g. for background maintenance."""
+    return list(_storages.values())
 
-def get_storage() -> IStorage:
-    return _storage
\ No newline at end of file
+async def close_storages() -> None:
+    for storage in list(_storages.values()):
+        await storage.close()
+    _storages.clear()
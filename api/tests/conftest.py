@@ -0,0 +1,35 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# The API modules import each other as top-level modules (``from models import ...``)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from sql_storage import SqlStorage  # noqa: E402
+from storage import MemoryStorage  # noqa: E402
+
+
+@pytest.fixture(params=["memory", "sql"])
+def storage(request, tmp_path):
+    """An empty partition of each backend; SQL runs on a throwaway SQLite file."""
+    if request.param == "memory":
+        backend = MemoryStorage(seed=False)
+    else:
+        backend = SqlStorage(f"sqlite:///{tmp_path / 'storage.db'}")
+    yield backend
+    asyncio.run(backend.close())
+
+
+@pytest.fixture
+def api(storage):
+    """Test client whose requests all go to ``storage``."""
+    main.app.dependency_overrides[main.get_client_storage] = lambda: storage
+    try:
+        yield TestClient(main.app)
+    finally:
+        main.app.dependency_overrides.clear()
@@ -0,0 +1,37 @@
+import batch
+
+CAMPAIGN = {"name": "Launch", "type": "awareness", "platform": "Facebook", "spend": "10.00"}
+
+
+def test_batch_embeds_sub_responses(api):
+    api.post("/api/campaigns", json=CAMPAIGN)
+    etag = api.get("/api/campaigns").headers["ETag"]
+    response = api.post("/api/batch", json={"requests": [
+        {"id": "campaigns", "path": "/api/campaigns?fields=name"},
+        {"id": "cached", "path": "/api/campaigns", "headers": {"If-None-Match": etag}},
+        {"id": "missing", "path": "/api/campaigns/missing"},
+        {"id": "export", "path": "/api/performance/export"},
+    ]})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["seq"] == api.get("/api/changes", params={"since": 0}).json()[-1]["seq"]
+    assert result["consistent"] is True
+    campaigns, cached, missing, export = result["responses"]
+    assert (campaigns["id"], campaigns["status"], campaigns["body"]) == ("campaigns", 200, [{"name": "Launch"}])
+    assert (cached["status"], cached["body"], cached["headers"]["etag"]) == (304, None, etag)
+    assert missing["status"] == 404
+    assert export["status"] == 400
+
+
+def test_batch_reports_writes_during_every_attempt(api, storage, monkeypatch):
+    calls = []
+
+    async def moving_seq():
+        calls.append(None)
+        return len(calls)
+
+    monkeypatch.setattr(storage, "get_change_seq", moving_seq)
+    result = api.post("/api/batch", json={"requests": [{"path": "/api/metrics"}]}).json()
+    assert result["consistent"] is False
+    assert len(calls) == 2 * batch.BATCH_ATTEMPTS
+    assert result["seq"] == len(calls) - 1
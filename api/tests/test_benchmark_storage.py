@@ -0,0 +1,29 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+
+import benchmark_storage  # noqa: E402
+
+
+@pytest.mark.parametrize("backend", ["memory", "sql", "cached-memory"])
+def test_run_scale_times_every_operation(backend, tmp_path, capsys):
+    args = SimpleNamespace(iterations=3, scan_iterations=2, memory_samples=1, database_url=None)
+    result = asyncio.run(benchmark_storage.run_scale(backend, 20, args, str(tmp_path)))
+    assert result["records"] == 20
+    names = [name for name, _, _ in benchmark_storage.operations(None, [], [], 1, 1)]
+    assert list(result["operations"]) == names
+    for name, stats in result["operations"].items():
+        assert stats["calls"] == (2 if name in ("get_campaigns", "get_performance", "get_integrations") else 3)
+        assert 0 < stats["p50_us"] <= stats["p99_us"] <= stats["max_us"]
+    assert "get_campaign " in capsys.readouterr().out
+
+
+def test_percentile_picks_the_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert (benchmark_storage.percentile(samples, 0.5), benchmark_storage.percentile(samples, 0.99)) == (51.0, 99.0)
+    assert benchmark_storage.percentile([7.0], 0.99) == 7.0
@@ -0,0 +1,50 @@
+CAMPAIGN = {"name": "Launch", "type": "awareness", "platform": "Facebook", "spend": "10.00"}
+
+
+def _create_campaigns(api, count):
+    response = api.post("/api/campaigns/bulk", json=[{**CAMPAIGN, "name": f"Campaign {i}"} for i in range(count)])
+    assert response.status_code == 200
+    return [result["id"] for result in response.json()["results"]]
+
+
+def test_bulk_create_reports_invalid_items(api):
+    response = api.post("/api/campaigns/bulk", json=[CAMPAIGN, {**CAMPAIGN, "spend": "lots"}])
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (1, 1)
+    assert body["results"][1]["ok"] is False
+    assert len(api.get("/api/campaigns").json()) == 1
+
+
+def test_bulk_update_rejects_null_for_required_fields_before_writing(api):
+    first, second = _create_campaigns(api, 2)
+    response = api.patch("/api/campaigns/bulk", json=[{"id": first, "name": "ok"}, {"id": second, "name": None}])
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["ok"] is True
+    assert results[1]["ok"] is False
+    assert "name" in results[1]["error"]
+    names = {campaign["id"]: campaign["name"] for campaign in api.get("/api/campaigns").json()}
+    assert names == {first: "ok", second: "Campaign 1"}
+
+
+def test_bulk_update_reports_missing_ids(api):
+    (campaign_id,) = _create_campaigns(api, 1)
+    results = api.patch(
+        "/api/campaigns/bulk", json=[{"id": campaign_id, "status": "paused"}, {"id": "missing", "status": "paused"}]
+    ).json()["results"]
+    assert [result["ok"] for result in results] == [True, False]
+    assert results[1]["error"] == "Not found"
+
+
+def test_bulk_update_integrations_rejects_null_status(api):
+    created = api.post("/api/integrations", json={"platform": "Google Ads", "api_key": "key"}).json()
+    results = api.patch("/api/integrations/bulk", json=[{"id": created["id"], "status": None}]).json()["results"]
+    assert results[0]["ok"] is False
+    assert api.get(f"/api/integrations/{created['id']}").json()["status"] == "disconnected"
+
+
+def test_bulk_delete(api):
+    ids = _create_campaigns(api, 3)
+    body = api.request("DELETE", "/api/campaigns/bulk", json=[ids[0], {"id": ids[1]}, "missing"]).json()
+    assert [result["ok"] for result in body["results"]] == [True, True, False]
+    assert [campaign["id"] for campaign in api.get("/api/campaigns").json()] == [ids[2]]
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from cache import CachedStorage
+from models import Campaign, Integration
+from sql_storage import SqlStorage
+
+CAMPAIGN = Campaign(name="Launch", type="awareness", platform="Facebook", spend="10.00")
+
+
+def test_writes_invalidate_only_their_collection(storage):
+    cached = CachedStorage(storage)
+
+    async def run():
+        await cached.get_campaigns_json()
+        await cached.get_integrations()
+        await cached.get_campaigns_json()
+        assert (cached.hits, cached.misses) == (1, 2)
+        before = await cached.get_campaigns_json()
+        await cached.create_campaign(CAMPAIGN)
+        after = await cached.get_campaigns_json()
+        await cached.get_integrations()
+        return before, after
+
+    before, after = asyncio.run(run())
+    assert after.etag != before.etag
+    assert b"Launch" in after.body
+    assert (cached.hits, cached.misses) == (3, 3)
+
+
+def test_failed_write_still_invalidates(storage):
+    cached = CachedStorage(storage)
+    asyncio.run(cached.get_integrations())
+    version = cached.stats()["versions"]["integrations"]
+    with pytest.raises(ValueError):
+        asyncio.run(cached.update_integration("missing", {"status": "connected"}))
+    assert cached.stats()["versions"]["integrations"] == version + 1
+
+
+def test_read_racing_a_write_is_not_kept(storage):
+    cached = CachedStorage(storage)
+    loading, release = asyncio.Event(), asyncio.Event()
+    load = storage.get_campaigns
+
+    async def slow_load():
+        campaigns = await load()
+        loading.set()
+        await release.wait()
+        return campaigns
+
+    storage.get_campaigns = slow_load
+
+    async def run():
+        read = asyncio.create_task(cached.get_campaigns())
+        await loading.wait()
+        await cached.create_campaign(CAMPAIGN)
+        release.set()
+        stale = await read
+        storage.get_campaigns = load
+        return stale, await cached.get_campaigns()
+
+    stale, fresh = asyncio.run(run())
+    assert stale == []
+    assert [campaign.name for campaign in fresh] == ["Launch"]
+
+
+def test_writes_by_other_processes_are_picked_up(tmp_path):
+    url = f"sqlite:///{tmp_path / 'shared.db'}"
+    cached = CachedStorage(SqlStorage(url), max_staleness=0)
+    other = SqlStorage(url)
+
+    async def run():
+        assert await cached.get_integrations() == []
+        await other.create_integration(Integration(platform="Google", api_key="key"))
+        return await cached.get_integrations()
+
+    assert [integration.platform for integration in asyncio.run(run())] == ["Google"]
+
+
+def test_bounded_by_entries_and_bytes(storage):
+    asyncio.run(storage.create_campaign(CAMPAIGN))
+    by_entries = CachedStorage(storage, max_entries=2)
+    for fields in [("id",), ("name",), ("spend",)]:
+        asyncio.run(by_entries.get_campaigns_json(fields))
+    assert (by_entries.stats()["entries"], by_entries.evictions) == (2, 1)
+
+    body = asyncio.run(storage.get_campaigns_json())
+    by_bytes = CachedStorage(storage, max_bytes=len(body.body) - 1)
+    asyncio.run(by_bytes.get_campaigns_json())
+    asyncio.run(by_bytes.get_campaigns_json(("id",)))
+    # The full body is over the budget and is served without being kept
+    assert by_bytes.stats()["entries"] == 1
+    assert by_bytes.bytes <= by_bytes.max_bytes
+
+
+def test_stats_endpoint_needs_the_cache(api):
+    assert api.get("/api/cache/stats").status_code == 404
@@ -0,0 +1,80 @@
+import asyncio
+import json
+from collections import deque
+
+from fastapi.testclient import TestClient
+
+import main
+from models import Campaign, Integration
+from storage import MemoryStorage
+
+CAMPAIGN = {"name": "Launch", "type": "awareness", "platform": "Facebook", "spend": "10.00"}
+
+
+class _Request:
+    """Stands in for a client that disconnects after ``polls`` checks."""
+
+    def __init__(self, polls: int):
+        self.polls = polls
+
+    async def is_disconnected(self) -> bool:
+        self.polls -= 1
+        return self.polls < 0
+
+
+def _events(storage, since, collections=None, polls=1):
+    async def collect():
+        return [event async for event in main._change_stream(_Request(polls), storage, since, collections)]
+    return asyncio.run(collect())
+
+
+def test_feed_lists_mutations_in_order(api):
+    start = api.get("/api/changes", params={"since": 0}).json()
+    since = start[-1]["seq"] if start else 0
+    created = api.post("/api/campaigns", json=CAMPAIGN).json()
+    api.patch(f"/api/campaigns/{created['id']}", json={"status": "paused"})
+    api.delete(f"/api/campaigns/{created['id']}")
+
+    changes = api.get("/api/changes", params={"since": since}).json()
+    assert [(change["seq"], change["op"], change["id"]) for change in changes] == [
+        (since + 1, "create", created["id"]), (since + 2, "update", created["id"]), (since + 3, "delete", created["id"]),
+    ]
+    assert changes[1]["record"]["status"] == "paused"
+    assert changes[2]["record"] is None
+    assert api.get("/api/changes", params={"since": since + 1, "limit": 1}).json() == changes[1:2]
+    assert api.get("/api/changes", params={"since": since + 3}).json() == []
+    # A position the feed has not reached yet is a gap as well
+    assert api.get("/api/changes", params={"since": since + 4}).status_code == 410
+
+
+def test_feed_gap_after_history_is_dropped():
+    storage = MemoryStorage(seed=False)
+    storage.changes = deque(maxlen=2)
+    for _ in range(3):
+        asyncio.run(storage.create_campaign(Campaign(**CAMPAIGN)))
+    main.app.dependency_overrides[main.get_client_storage] = lambda: storage
+    try:
+        client = TestClient(main.app)
+        assert client.get("/api/changes", params={"since": 0}).status_code == 410
+        assert [change["seq"] for change in client.get("/api/changes", params={"since": 1}).json()] == [2, 3]
+    finally:
+        main.app.dependency_overrides.clear()
+
+
+def test_stream_sends_matching_changes(storage):
+    asyncio.run(storage.create_campaign(Campaign(**CAMPAIGN)))
+    asyncio.run(storage.create_integration(Integration(platform="Google", api_key="key")))
+    events = _events(storage, 0, {"integrations"})
+    assert events[0] == "retry: 3000\n\n"
+    [change] = [event for event in events if "event: change" in event]
+    assert change.startswith("id: 2\nevent: change\n")
+    assert json.loads(change.split("data: ", 1)[1])["collection"] == "integrations"
+
+
+def test_stream_resets_after_a_gap():
+    storage = MemoryStorage(seed=False)
+    storage.changes = deque(maxlen=1)
+    for _ in range(3):
+        asyncio.run(storage.create_campaign(Campaign(**CAMPAIGN)))
+    events = _events(storage, 0)
+    assert events[1] == 'id: 3\nevent: reset\ndata: {"seq": 3}\n\n'
@@ -0,0 +1,42 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import storage
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # A fresh partition registry per test, so partitions created here do not leak
+    monkeypatch.setattr(storage, "_storages", {})
+    monkeypatch.delenv("STORAGE_CLIENT_IDS", raising=False)
+    monkeypatch.delenv("STORAGE_MAX_CLIENTS", raising=False)
+    return TestClient(main.app)
+
+
+def test_default_client(client):
+    assert client.get("/api/campaigns").status_code == 200
+
+
+@pytest.mark.parametrize("client_id", ["-leading-dash", "has space", "x" * 65, "dots.not.allowed"])
+def test_malformed_client_id(client, client_id):
+    response = client.get("/api/campaigns", headers={"X-Client-Id": client_id})
+    assert response.status_code == 400
+    assert client_id not in storage._storages
+
+
+def test_unprovisioned_client(client, monkeypatch):
+    monkeypatch.setenv("STORAGE_CLIENT_IDS", "acme, globex")
+    assert client.get("/api/campaigns", headers={"X-Client-Id": "globex"}).status_code == 200
+    assert client.get("/api/campaigns", headers={"X-Client-Id": "initech"}).status_code == 403
+    assert client.get("/api/campaigns").status_code == 200
+    assert set(storage._storages) == {"globex", "default"}
+
+
+def test_partition_limit(client, monkeypatch):
+    monkeypatch.setenv("STORAGE_MAX_CLIENTS", "2")
+    for client_id in ("a", "b"):
+        assert client.get("/api/campaigns", headers={"X-Client-Id": client_id}).status_code == 200
+    assert client.get("/api/campaigns", headers={"X-Client-Id": "c"}).status_code == 403
+    # Existing partitions keep working
+    assert client.get("/api/campaigns", headers={"X-Client-Id": "a"}).status_code == 200
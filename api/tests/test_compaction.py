@@ -0,0 +1,64 @@
+import asyncio
+
+import storage as storage_module
+from models import RollupGrain
+from performance_store import parse_date
+from storage import MemoryStorage
+
+
+def _columns(dates, platform="Facebook"):
+    count = len(dates)
+    return {
+        "date": [parse_date(day) for day in dates], "platform": [platform] * count, "impressions": [100] * count,
+        "clicks": [10] * count, "conversions": [1] * count, "spend": [5.0] * count, "revenue": [8.0] * count,
+    }
+
+
+def test_compaction_waits_for_lock_holder(storage):
+    async def run():
+        await storage.upsert_performance_columns(_columns(["2024-01-01", "2024-01-10"]))
+        async with storage.performance_lock:
+            compaction = asyncio.create_task(storage.compact_performance("2024-01-05", [RollupGrain.MONTH]))
+            await asyncio.sleep(0.05)
+            assert not compaction.done()
+            # Still before the cutoff: the held lock keeps the compaction out
+            await storage.upsert_performance_columns(_columns(["2024-01-02"]))
+        result = await compaction
+        return result, await storage.get_performance(), await storage.get_compaction_cutoff()
+
+    result, rows, cutoff = asyncio.run(run())
+    assert result.rows == 2
+    assert [row.date for row in rows] == ["2024-01-10"]
+    assert cutoff == "2024-01-05"
+
+
+def test_compaction_during_large_import_is_kept(monkeypatch):
+    # Force the copy-and-swap path of the import
+    monkeypatch.setattr(storage_module, "IMPORT_THREAD_ROWS", 1)
+    storage = MemoryStorage(seed=False)
+
+    async def run():
+        await storage.import_performance_columns(_columns(["2024-01-01", "2024-01-10"]))
+        await storage.compact_performance("2024-01-05", [RollupGrain.DAY, RollupGrain.MONTH])
+        # Nothing is left to delete, so this compaction only prunes day buckets in place
+        await asyncio.gather(
+            storage.import_performance_columns(_columns(["2024-01-11", "2024-01-12"])),
+            storage.compact_performance("2024-01-06", [RollupGrain.MONTH]),
+        )
+        return await storage.get_performance_rollup(RollupGrain.DAY), await storage.get_compaction_cutoff()
+
+    days, cutoff = asyncio.run(run())
+    assert [bucket.group for bucket in days] == ["2024-01-10", "2024-01-11", "2024-01-12"]
+    assert cutoff == "2024-01-06"
+
+
+def test_csv_rows_before_cutoff_are_rejected_before_any_write(api, storage):
+    header = "date,platform,impressions,clicks,conversions,spend,revenue\n"
+    body = header + "2024-01-01,Facebook,1,1,0,1,2\n2024-01-10,Facebook,1,1,0,1,2\n"
+    first = api.post("/api/performance/import/csv", files={"file": ("a.csv", body)})
+    assert first.status_code == 200
+    asyncio.run(storage.compact_performance("2024-01-05", [RollupGrain.MONTH]))
+    body = header + "2024-01-11,Facebook,1,1,0,1,2\n2024-01-01,Facebook,1,1,0,1,2\n"
+    response = api.post("/api/performance/import/csv", files={"file": ("b.csv", body)})
+    assert response.status_code == 400
+    assert [row["date"] for row in api.get("/api/performance").json()] == ["2024-01-10"]
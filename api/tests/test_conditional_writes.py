@@ -0,0 +1,44 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from storage import MemoryStorage
+
+
+@pytest.fixture
+def client():
+    storage = MemoryStorage()
+    main.app.dependency_overrides[main.get_client_storage] = lambda: storage
+    try:
+        yield TestClient(main.app)
+    finally:
+        main.app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("collection", ["campaigns", "integrations"])
+def test_delete_with_if_match_at_current_version(client, collection):
+    record = client.get(f"/api/{collection}").json()[0]
+    response = client.delete(f"/api/{collection}/{record['id']}", headers={"If-Match": f'"{record["version"]}"'})
+    assert response.status_code == 200
+    assert response.json() is True
+
+
+@pytest.mark.parametrize("collection", ["campaigns", "integrations"])
+def test_delete_with_stale_if_match(client, collection):
+    record = client.get(f"/api/{collection}").json()[0]
+    response = client.delete(f"/api/{collection}/{record['id']}", headers={"If-Match": f'"{record["version"] + 1}"'})
+    assert response.status_code == 412
+
+
+@pytest.mark.parametrize("collection", ["campaigns", "integrations"])
+@pytest.mark.parametrize("if_match", ['"1"', "*"])
+def test_delete_with_if_match_on_missing_record(client, collection, if_match):
+    response = client.delete(f"/api/{collection}/missing", headers={"If-Match": if_match})
+    assert response.status_code == 412
+
+
+@pytest.mark.parametrize("collection", ["campaigns", "integrations"])
+def test_unconditional_delete_of_missing_record(client, collection):
+    response = client.delete(f"/api/{collection}/missing")
+    assert response.status_code == 200
+    assert response.json() is False
@@ -0,0 +1,53 @@
+import io
+
+import pytest
+
+import csv_import
+
+HEADER = "date,platform,impressions,clicks,conversions,spend,revenue\n"
+
+
+def _upload(api, body):
+    return api.post("/api/performance/import/csv", files={"file": ("rows.csv", body, "text/csv")})
+
+
+def test_reupload_replaces_rows_by_date_and_platform(api):
+    first = _upload(api, HEADER + "2024-01-01,Google,100,10,1,2.5,5.0\n2024-01-01,,50,5,0,1.5,0.0\n")
+    assert (first.json()["rows"], first.json()["inserted"], first.json()["updated"]) == (2, 2, 0)
+    second = _upload(api, HEADER + "2024-01-01,Google,70,7,0,3.0,1.0\n2024-01-02,Google,1,1,0,1.0,1.0\n")
+    assert (second.json()["inserted"], second.json()["updated"]) == (1, 1)
+    rows = api.get("/api/performance").json()
+    assert [(row["date"], row["platform"], row["impressions"]) for row in rows] == [
+        ("2024-01-01", "Google", 70), ("2024-01-01", None, 50), ("2024-01-02", "Google", 1),
+    ]
+
+
+def test_export_can_be_reimported(api):
+    _upload(api, HEADER + "2024-01-01,Google,100,10,1,2.5,5.0\n")
+    exported = api.get("/api/performance/export").text
+    response = _upload(api, exported)
+    assert (response.json()["inserted"], response.json()["updated"]) == (0, 1)
+    assert len(api.get("/api/performance").json()) == 1
+
+
+@pytest.mark.parametrize("body, message", [
+    (HEADER + "2024-01-01,Google,1,1,0,1.0,1.0\n2024-13-01,Google,1,1,0,1.0,1.0\n", "Line 3"),
+    (HEADER + "2024-01-01,Google,-1,1,0,1.0,1.0\n", "impressions must not be negative"),
+    (HEADER + "2024-01-01,Google,1,1,0,nan,1.0\n", "spend must be a non-negative number"),
+    ("platform,spend\nGoogle,1.0\n", "missing the 'date' column"),
+    ("", "empty"),
+])
+def test_invalid_files_store_nothing(api, body, message):
+    response = _upload(api, body)
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
+    assert api.get("/api/performance").json() == []
+
+
+def test_read_csv_batches_and_defaults():
+    body = "Date,Spend,extra\n2024-01-01,1.5,x\n\n2024-01-02,,y\n2024-01-03,2,z\n".encode()
+    batches = list(csv_import.read_csv(io.BytesIO(body), batch_size=2))
+    assert [len(batch["date"]) for batch in batches] == [2, 1]
+    assert list(batches[0]["spend"]) == [1.5, 0.0]
+    assert batches[0]["platform"] == [None, None]
+    assert list(batches[1]["clicks"]) == [0]
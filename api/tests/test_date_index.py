@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from models import PerformanceData
+from performance_store import DateIndex, PerformanceColumns, parse_date
+
+
+def _expected(entries, start=None, end=None):
+    # Stable sort by date: rows sharing a date stay in insertion order
+    return [
+        position for ordinal, position in sorted(entries, key=lambda entry: entry[0])
+        if (start is None or ordinal >= start) and (end is None or ordinal <= end)
+    ]
+
+
+@pytest.mark.parametrize("batch", [10, 5000])
+def test_ranges_match_a_sorted_scan(batch):
+    rng = random.Random(3)
+    index, entries = DateIndex(), []
+    for _ in range(3):
+        ordinals = [rng.randrange(100) for _ in range(batch)]
+        positions = list(range(len(entries), len(entries) + batch))
+        index.add_many(ordinals, positions)
+        entries += zip(ordinals, positions)
+    assert list(index.range()) == _expected(entries)
+    assert list(index.range(20, 40)) == _expected(entries, 20, 40)
+    assert list(index.range(start=90)) == _expected(entries, start=90)
+    assert list(index.range(end=-1)) == []
+
+
+def test_remove_drops_only_that_row():
+    index = DateIndex()
+    for position, ordinal in enumerate([5, 3, 5, 4]):
+        index.add(ordinal, position)
+    index.remove(5, 0)
+    assert list(index.range()) == [1, 3, 2]
+    assert list(index.dates) == [3, 4, 5]
+
+
+def test_window_select_uses_platform_and_date():
+    store = PerformanceColumns()
+    for day, platform in [("2024-01-03", "Google"), ("2024-01-01", "Google"), ("2024-01-02", "Facebook")]:
+        store.append(PerformanceData(date=day, platform=platform))
+    start, end = parse_date("2024-01-02"), parse_date("2024-01-03")
+    assert store.select(start=start, end=end) == [2, 0]
+    assert store.select(platform="Google", end=end) == [1, 0]
+    assert store.select(platform="TikTok") == []
+    # A correction that moves a row to another date moves it in the indexes too
+    store.replace(1, PerformanceData(date="2024-01-05", platform="Google"))
+    assert store.select(platform="Google") == [0, 1]
+    assert store.select(start=start, end=end) == [2, 0]
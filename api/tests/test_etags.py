@@ -0,0 +1,45 @@
+import asyncio
+
+from models import Campaign
+from storage import MemoryStorage
+
+CAMPAIGN = {"name": "Launch", "type": "awareness", "platform": "Facebook", "spend": "10.00"}
+
+
+def test_matching_etag_is_not_modified(api):
+    api.post("/api/campaigns", json=CAMPAIGN)
+    first = api.get("/api/campaigns")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    response = api.get("/api/campaigns", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert api.get("/api/campaigns", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+
+def test_write_changes_etag(api):
+    created = api.post("/api/campaigns", json=CAMPAIGN).json()
+    etag = api.get("/api/campaigns").headers["ETag"]
+    api.patch(f"/api/campaigns/{created['id']}", json={"name": "Relaunch"})
+    response = api.get("/api/campaigns", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert [campaign["name"] for campaign in response.json()] == ["Relaunch"]
+
+
+def test_fields_bodies_have_their_own_etag(api):
+    api.post("/api/campaigns", json=CAMPAIGN)
+    full = api.get("/api/campaigns")
+    sparse = api.get("/api/campaigns", params={"fields": "name,spend"})
+    assert sparse.json() == [{"name": "Launch", "spend": "10.00"}]
+    assert sparse.headers["ETag"] != full.headers["ETag"]
+
+
+def test_memory_storage_reuses_body_until_write():
+    storage = MemoryStorage(seed=False)
+    first = asyncio.run(storage.get_campaigns_json())
+    assert asyncio.run(storage.get_campaigns_json()) is first
+    asyncio.run(storage.create_campaign(Campaign(**CAMPAIGN)))
+    second = asyncio.run(storage.get_campaigns_json())
+    assert second.etag != first.etag
+    assert storage.json_bodies.bytes == len(second.body)
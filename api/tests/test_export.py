@@ -0,0 +1,59 @@
+import asyncio
+import csv
+import io
+import json
+
+from export import EXPORT_COLUMNS, csv_chunks
+from models import PerformanceData
+
+CSV = (
+    "date,platform,impressions,clicks,conversions,spend,revenue\n"
+    "2024-01-02,Google,100,10,1,2.5,5.0\n"
+    "2024-01-01,,50,5,0,1.5,0.0\n"
+    "2024-01-03,Facebook,20,2,1,1.0,3.0\n"
+)
+
+
+def _import(api):
+    assert api.post("/api/performance/import/csv", files={"file": ("rows.csv", CSV, "text/csv")}).status_code == 200
+
+
+def test_csv_export(api):
+    _import(api)
+    response = api.get("/api/performance/export", params={"start_date": "2024-01-02"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"] == 'attachment; filename="performance.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(row["date"], row["platform"], row["spend"]) for row in rows] == [
+        ("2024-01-02", "Google", "2.5"), ("2024-01-03", "Facebook", "1.0"),
+    ]
+    assert list(rows[0]) == list(EXPORT_COLUMNS)
+
+
+def test_ndjson_export_matches_list_read(api):
+    _import(api)
+    response = api.get("/api/performance/export", params={"format": "ndjson", "sort_by": "spend", "sort_dir": "desc"})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    listed = api.get("/api/performance", params={"sort_by": "spend", "sort_dir": "desc"}).json()
+    assert exported == listed
+    assert [row["spend"] for row in exported] == [2.5, 1.5, 1.0]
+
+
+def test_empty_export_has_only_the_header(api):
+    assert api.get("/api/performance/export").text == ",".join(EXPORT_COLUMNS) + "\n"
+    assert api.get("/api/performance/export", params={"format": "ndjson"}).text == ""
+
+
+def test_csv_is_encoded_one_chunk_per_batch():
+    async def batches():
+        yield [PerformanceData(id="1", date="2024-01-01", platform="Google")]
+        yield [PerformanceData(id="2", date="2024-01-02"), PerformanceData(id="3", date="2024-01-03")]
+
+    async def collect():
+        return [chunk async for chunk in csv_chunks(batches())]
+
+    chunks = asyncio.run(collect())
+    assert len(chunks) == 2
+    assert chunks[1].decode().splitlines() == ["2,2024-01-02,,0,0,0,0.0,0.0,", "3,2024-01-03,,0,0,0,0.0,0.0,"]
@@ -0,0 +1,75 @@
+import asyncio
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from models import Campaign, Integration
+from storage import MemoryStorage
+
+
+def _seed(storage):
+    async def run():
+        await storage.create_campaign(Campaign(name="Launch", type="awareness", platform="Facebook", spend="10.50"))
+        await storage.create_integration(Integration(platform="Google", api_key="key"))
+        await storage.upsert_performance_columns({
+            "date": [date(2024, 1, 1).toordinal()], "platform": ["Google"], "impressions": [100], "clicks": [10],
+            "conversions": [1], "spend": [2.5], "revenue": [5.0],
+        })
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("path, fields, keys", [
+    ("/api/campaigns", "spend, name", ["name", "spend"]),
+    ("/api/performance", "platform,date,spend", ["date", "spend", "platform"]),
+    ("/api/integrations", "status,platform", ["platform", "status"]),
+])
+def test_sparse_fields_follow_model_order(api, storage, path, fields, keys):
+    _seed(storage)
+    full = api.get(path).json()
+    sparse = api.get(path, params={"fields": fields}).json()
+    assert full and len(sparse) == len(full)
+    assert [list(item) for item in sparse] == [keys] * len(full)
+    assert sparse == [{key: item[key] for key in keys} for item in full]
+
+
+def test_metrics_fields():
+    # Metrics are only ever seeded, so this runs on the seeded memory backend
+    storage = MemoryStorage()
+    main.app.dependency_overrides[main.get_client_storage] = lambda: storage
+    try:
+        api = TestClient(main.app)
+        full = api.get("/api/metrics").json()
+        sparse = api.get("/api/metrics", params={"fields": "value,name"}).json()
+    finally:
+        main.app.dependency_overrides.clear()
+    assert full
+    assert sparse == [{"name": item["name"], "value": item["value"]} for item in full]
+
+
+def test_paginated_and_filtered_reads_apply_fields(api, storage):
+    _seed(storage)
+    page = api.get("/api/campaigns", params={"limit": 1, "fields": "id"}).json()
+    assert [list(item) for item in page] == [["id"]]
+    rows = api.get("/api/performance", params={"platform": "Google", "fields": "revenue"}).json()
+    assert rows == [{"revenue": 5.0}]
+
+
+def test_every_field_serves_the_full_body(api, storage):
+    _seed(storage)
+    full = api.get("/api/integrations")
+    every = api.get("/api/integrations", params={"fields": ",".join(full.json()[0])})
+    assert every.content == full.content
+    assert every.headers["etag"] == full.headers["etag"]
+
+
+@pytest.mark.parametrize("fields, detail", [
+    ("name,budget", "Unknown fields budget"),
+    (" , ", "fields must name at least one field"),
+])
+def test_bad_fields_are_rejected(api, fields, detail):
+    response = api.get("/api/campaigns", params={"fields": fields})
+    assert response.status_code == 400
+    assert detail in response.json()["detail"]
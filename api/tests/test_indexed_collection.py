@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+from models import CampaignStatus
+from storage import IndexedCollection
+
+
+def _record(record_id, status, platform="Facebook"):
+    return SimpleNamespace(id=record_id, status=status, platform=platform)
+
+
+def test_lookup_follows_updates_in_insertion_order():
+    records = IndexedCollection(("status", "platform"))
+    for record_id in ("a", "b", "c"):
+        records.add(_record(record_id, CampaignStatus.ACTIVE))
+    records.update("a", {"status": "paused"})
+    records.update("a", {"status": CampaignStatus.ACTIVE})
+    # Enum members and their raw values share a bucket; order is insertion order, not update order
+    assert [record.id for record in records.lookup("status", "active")] == ["a", "b", "c"]
+    records.update("b", {"status": CampaignStatus.PAUSED})
+    assert [record.id for record in records.lookup("status", CampaignStatus.ACTIVE)] == ["a", "c"]
+    assert [record.id for record in records.lookup("status", "paused")] == ["b"]
+
+
+def test_replace_and_remove_keep_indexes_current():
+    records = IndexedCollection(("platform",))
+    records.add(_record("a", "active", "Facebook"))
+    records.add(_record("b", "active", "Google"))
+    records.add(_record("a", "active", "Google"))
+    assert records.lookup("platform", "Facebook") == []
+    assert [record.id for record in records.lookup("platform", "Google")] == ["a", "b"]
+    assert records.remove("a")
+    assert not records.remove("a")
+    assert "a" not in records and records.get("a") is None
+    assert [record.id for record in records.lookup("platform", "Google")] == ["b"]
+
+
+def test_ids_and_versions_are_not_updatable():
+    records = IndexedCollection()
+    records.add(SimpleNamespace(id="a", version=1, client_id="default", name="x"))
+    records.update("a", {"id": "b", "version": 9, "client_id": "other", "name": "y", "unknown": 1})
+    record = records.get("a")
+    assert (record.id, record.version, record.client_id, record.name) == ("a", 1, "default", "y")
+    assert not hasattr(record, "unknown")
+
+
+def test_pages_skip_removed_records():
+    records = IndexedCollection()
+    for number in range(200):
+        records.add(SimpleNamespace(id=str(number)))
+    for number in range(150):
+        records.remove(str(number))
+    page, last = records.page(-1, 10)
+    assert [record.id for record in page] == [str(number) for number in range(150, 160)]
+    page, last = records.page(last, None)
+    assert [record.id for record in page][-1] == "199"
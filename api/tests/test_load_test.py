@@ -0,0 +1,63 @@
+import asyncio
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+
+import load_test  # noqa: E402
+import main  # noqa: E402
+from models import Campaign  # noqa: E402
+
+SCENARIO = {
+    "duration": 0.3, "warmup": 0.05, "concurrency": 2,
+    "variables": {"campaign_id": {"from": "/api/campaigns", "field": "id"}},
+    "requests": [
+        {"name": "campaigns", "path": "/api/campaigns", "weight": 3},
+        {"name": "campaign_patch", "method": "PATCH", "path": "/api/campaigns/{campaign_id}",
+         "bodies": [{"status": "paused"}, {"status": "active"}]},
+        {"name": "missing", "path": "/api/campaigns/missing"},
+    ],
+}
+
+
+def _row(p95, p99, rps=100.0, error_rate=0.0):
+    return {"requests": 10, "errors": 0, "error_rate": error_rate, "rps": rps,
+            "p50_ms": p95 / 2, "p95_ms": p95, "p99_ms": p99}
+
+
+def test_run_records_latency_and_errors_per_request(storage):
+    asyncio.run(storage.create_campaign(Campaign(name="Launch", type="awareness", platform="Facebook", spend="1")))
+    main.app.dependency_overrides[main.get_client_storage] = lambda: storage
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            values = await load_test.resolve_variables(client, SCENARIO["variables"])
+            return await load_test.run(client, SCENARIO, values)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        main.app.dependency_overrides.clear()
+    requests = results["requests"]
+    assert set(requests) == {"campaigns", "campaign_patch", "missing"}
+    assert requests["campaigns"]["requests"] > 0 and requests["campaigns"]["errors"] == 0
+    assert requests["missing"]["statuses"] == {"404": requests["missing"]["requests"]}
+    assert results["total"]["errors"] == requests["missing"]["requests"]
+    assert results["total"]["requests"] == sum(row["requests"] for row in requests.values())
+
+
+def test_check_reports_slo_misses_and_regressions():
+    results = {"total": _row(120.0, 300.0, rps=50.0, error_rate=0.01), "requests": {"campaigns": _row(120.0, 300.0)}}
+    baseline = {"total": _row(80.0, 290.0, rps=100.0), "requests": {"campaigns": _row(100.0, 200.0)}}
+    failures = load_test.check(results, {"p95_ms": 100, "error_rate": 0.001, "min_rps": 10}, baseline)
+    assert failures == [
+        "p95_ms 120.0 exceeds the SLO of 100",
+        "error rate 0.0100 exceeds the SLO of 0.001",
+        "total: p95_ms 120.0 regressed more than 25% from the baseline 80.0",
+        "campaigns: p99_ms 300.0 regressed more than 25% from the baseline 200.0",
+        "throughput 50.0 rps fell more than 20% from the baseline 100.0",
+    ]
+    assert load_test.check(results, {}, None) == []
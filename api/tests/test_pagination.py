@@ -0,0 +1,51 @@
+CAMPAIGN = {"type": "awareness", "platform": "Facebook", "spend": "10.00"}
+CSV = "date,platform,impressions,clicks,conversions,spend,revenue\n" + "".join(
+    f"2024-01-{day:02d},Facebook,{day},1,0,{day}.0,1.0\n" for day in range(1, 8)
+)
+
+
+def _pages(api, path, params):
+    pages, cursor = [], None
+    while True:
+        response = api.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_campaign_pages_cover_every_record_once(api):
+    ids = [api.post("/api/campaigns", json={**CAMPAIGN, "name": f"c{number}"}).json()["id"] for number in range(5)]
+    first = api.get("/api/campaigns", params={"limit": 2})
+    cursor = first.headers["X-Next-Cursor"]
+    # Writes between pages neither repeat nor skip records on later pages
+    api.delete(f"/api/campaigns/{ids[2]}")
+    added = api.post("/api/campaigns", json={**CAMPAIGN, "name": "late"}).json()["id"]
+    rest = api.get("/api/campaigns", params={"limit": 10, "cursor": cursor}).json()
+    assert [campaign["id"] for campaign in first.json() + rest] == ids[:2] + ids[3:] + [added]
+
+
+def test_sorted_campaign_pages(api):
+    for number, spend in enumerate(["30.00", "10.00", "20.00", "10.00"]):
+        api.post("/api/campaigns", json={**CAMPAIGN, "name": f"c{number}", "spend": spend})
+    pages = _pages(api, "/api/campaigns", {"limit": 3, "sort_by": "spend", "sort_dir": "desc"})
+    assert [len(page) for page in pages] == [3, 1]
+    assert [(campaign["name"], campaign["spend"]) for page in pages for campaign in page] == [
+        # Ties follow insertion order in the sort direction
+        ("c0", "30.00"), ("c2", "20.00"), ("c3", "10.00"), ("c1", "10.00"),
+    ]
+
+
+def test_performance_pages(api):
+    api.post("/api/performance/import/csv", files={"file": ("rows.csv", CSV, "text/csv")})
+    pages = _pages(api, "/api/performance", {"limit": 3, "start_date": "2024-01-02"})
+    assert [len(page) for page in pages] == [3, 3]
+    assert [row["date"] for page in pages for row in page] == [f"2024-01-0{day}" for day in range(2, 8)]
+    by_spend = _pages(api, "/api/performance", {"limit": 4, "sort_by": "spend", "sort_dir": "desc"})
+    assert [row["spend"] for page in by_spend for row in page] == [7.0, 6.0, 5.0, 4.0, 3.0, 2.0, 1.0]
+
+
+def test_malformed_cursor(api):
+    assert api.get("/api/campaigns", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert api.get("/api/performance", params={"limit": 2, "cursor": "!!"}).status_code == 400
@@ -0,0 +1,36 @@
+import pytest
+
+CSV = (
+    "date,platform,impressions,clicks,conversions,spend,revenue\n"
+    "2024-01-01,Facebook,100,10,1,5.0,8.0\n"
+    "2024-01-02,Facebook,200,20,2,6.0,9.0\n"
+    "2024-01-10,Google,300,30,3,7.0,10.0\n"
+)
+
+
+@pytest.fixture
+def performance(api):
+    response = api.post("/api/performance/import/csv", files={"file": ("rows.csv", CSV, "text/csv")})
+    assert response.status_code == 200
+    return api
+
+
+@pytest.mark.parametrize("params", [
+    {"start_date": "2024-01-02"},
+    {"start_date": "20240102"},
+    {"start_date": "2024-01-02", "limit": 10},
+    {"start_date": "2024-01-02", "sort_by": "spend"},
+])
+def test_date_filters_are_normalized(performance, params):
+    response = performance.get("/api/performance", params=params)
+    assert response.status_code == 200
+    assert [row["date"] for row in response.json()] == ["2024-01-02", "2024-01-10"]
+
+
+@pytest.mark.parametrize("path", [
+    "/api/performance", "/api/performance/aggregate", "/api/performance/rollup", "/api/performance/export",
+])
+@pytest.mark.parametrize("value", ["bogus", "2024-1-2", "2024-02-30"])
+def test_malformed_dates_are_rejected(performance, path, value):
+    for name in ("start_date", "end_date"):
+        assert performance.get(path, params={name: value}).status_code == 400
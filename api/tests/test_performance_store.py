@@ -0,0 +1,73 @@
+import pytest
+
+import performance_store
+from models import PerformanceData
+from performance_store import PerformanceColumns
+
+ROWS = [
+    PerformanceData(date="2024-01-02", platform="Google", impressions=100, clicks=10, conversions=1, spend=2.5),
+    PerformanceData(date="2024-01-01", platform="Facebook", impressions=50, clicks=5, spend=1.25, revenue=4.0),
+    PerformanceData(date="2024-01-02", platform=None, impressions=10, clicks=1, conversions=3, spend=0.5),
+    PerformanceData(date="2024-01-03", platform="Google", impressions=40, clicks=4, spend=0.75, revenue=1.0),
+]
+CSV = "date,platform,impressions,clicks,conversions,spend,revenue\n" + "".join(
+    f"{row.date},{row.platform or ''},{row.impressions},{row.clicks},{row.conversions},{row.spend},{row.revenue}\n"
+    for row in ROWS
+)
+
+
+@pytest.fixture(params=["numpy", "python"])
+def store(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(performance_store, "np", None)
+    store = PerformanceColumns()
+    store.extend(ROWS)
+    return store
+
+
+def test_rows_round_trip(store):
+    assert [row.model_dump(exclude={"id", "created_at"}) for row in store.rows()] == [
+        row.model_dump(exclude={"id", "created_at"}) for row in ROWS
+    ]
+    assert [row.id for row in store.rows()] == ["1", "2", "3", "4"]
+    assert store.position_of("3") == 2 and store.position_of("9") is None
+
+
+def test_aggregates(store):
+    assert store.aggregate() == {None: {
+        "rows": 4, "impressions": 200, "clicks": 20, "conversions": 4, "spend": 5.0, "revenue": 5.0,
+    }}
+    by_platform = store.aggregate(group_by="platform")
+    assert by_platform["Google"] == {
+        "rows": 2, "impressions": 140, "clicks": 14, "conversions": 1, "spend": 3.25, "revenue": 1.0,
+    }
+    assert by_platform[None]["rows"] == 1
+    assert list(store.aggregate(group_by="date")) == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert store.aggregate(store.select(platform="Google"), "date") == {
+        "2024-01-02": {"rows": 1, "impressions": 100, "clicks": 10, "conversions": 1, "spend": 2.5, "revenue": 0.0},
+        "2024-01-03": {"rows": 1, "impressions": 40, "clicks": 4, "conversions": 0, "spend": 0.75, "revenue": 1.0},
+    }
+    with pytest.raises(ValueError):
+        store.aggregate(group_by="campaign")
+
+
+def test_replace_updates_aggregates(store):
+    store.replace(0, ROWS[0].model_copy(update={"platform": "TikTok", "impressions": 1}))
+    by_platform = store.aggregate(group_by="platform")
+    assert by_platform["Google"]["impressions"] == 40
+    assert by_platform["TikTok"]["impressions"] == 1
+    assert store.select(platform="Google") == [3]
+
+
+def test_aggregate_endpoint(api):
+    api.post("/api/performance/import/csv", files={"file": ("rows.csv", CSV, "text/csv")})
+    overall = api.get("/api/performance/aggregate").json()
+    assert overall == [{
+        "group": None, "rows": 4, "impressions": 200, "clicks": 20, "conversions": 4, "spend": 5.0, "revenue": 5.0,
+    }]
+    by_date = api.get("/api/performance/aggregate", params={"group_by": "date", "min_spend": 1}).json()
+    assert [(group["group"], group["rows"], group["spend"]) for group in by_date] == [
+        ("2024-01-01", 1, 1.25), ("2024-01-02", 1, 2.5),
+    ]
+    by_platform = api.get("/api/performance/aggregate", params={"group_by": "platform"}).json()
+    assert {group["group"]: group["clicks"] for group in by_platform} == {None: 1, "Facebook": 5, "Google": 14}
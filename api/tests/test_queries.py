@@ -0,0 +1,56 @@
+import pytest
+
+CAMPAIGNS = [
+    {"name": "a", "type": "awareness", "platform": "Facebook", "spend": "5.00", "status": "active"},
+    {"name": "b", "type": "conversions", "platform": "Google", "spend": "50.00", "status": "paused"},
+    {"name": "c", "type": "awareness", "platform": "Google", "spend": "15.00", "status": "active"},
+    {"name": "d", "type": "awareness", "platform": "Facebook", "spend": "150.00", "status": "active"},
+]
+CSV = (
+    "date,platform,impressions,clicks,conversions,spend,revenue\n"
+    "2024-01-03,Google,100,10,1,30.0,1.0\n"
+    "2024-01-01,Facebook,100,10,1,10.0,1.0\n"
+    "2024-01-02,,100,10,1,20.0,1.0\n"
+)
+
+
+@pytest.fixture
+def campaigns(api):
+    for campaign in CAMPAIGNS:
+        assert api.post("/api/campaigns", json=campaign).status_code == 200
+    return api
+
+
+@pytest.mark.parametrize("params, names", [
+    ({"platform": "Google"}, ["b", "c"]),
+    ({"status": "active", "type": "awareness"}, ["a", "c", "d"]),
+    ({"platform": "Facebook", "min_spend": 10}, ["d"]),
+    # Spend sorts as a number, not as text
+    ({"sort_by": "spend"}, ["a", "c", "b", "d"]),
+    ({"status": "active", "sort_by": "name", "sort_dir": "desc"}, ["d", "c", "a"]),
+    ({"platform": "TikTok"}, []),
+])
+def test_campaign_filters_and_sorting(campaigns, params, names):
+    response = campaigns.get("/api/campaigns", params=params)
+    assert response.status_code == 200
+    assert [campaign["name"] for campaign in response.json()] == names
+
+
+def test_unknown_campaign_filter_value(campaigns):
+    assert campaigns.get("/api/campaigns", params={"status": "bogus"}).status_code == 422
+    assert campaigns.get("/api/campaigns", params={"sort_by": "bogus"}).status_code == 422
+
+
+@pytest.mark.parametrize("params, dates", [
+    # Unsorted queries keep storage (insertion) order
+    ({"min_spend": 15}, ["2024-01-03", "2024-01-02"]),
+    ({"platform": "Google", "min_spend": 1}, ["2024-01-03"]),
+    # Rows without a platform sort first
+    ({"sort_by": "platform"}, ["2024-01-02", "2024-01-01", "2024-01-03"]),
+    ({"sort_by": "spend", "sort_dir": "desc"}, ["2024-01-03", "2024-01-02", "2024-01-01"]),
+])
+def test_performance_filters_and_sorting(api, params, dates):
+    api.post("/api/performance/import/csv", files={"file": ("rows.csv", CSV, "text/csv")})
+    response = api.get("/api/performance", params=params)
+    assert response.status_code == 200
+    assert [row["date"] for row in response.json()] == dates
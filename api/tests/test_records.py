@@ -0,0 +1,45 @@
+import sys
+from datetime import datetime
+
+import pytest
+from pydantic import ValidationError
+
+from models import Campaign, CampaignStatus
+from records import CAMPAIGN_RECORDS
+
+CAMPAIGN = Campaign(
+    id="1", name="Launch", type="awareness", platform="Facebook", spend="10.00",
+    status=CampaignStatus.PAUSED, created_at=datetime(2024, 1, 2, 3, 4, 5),
+)
+
+
+def test_pack_unpack_round_trip():
+    record = CAMPAIGN_RECORDS.pack(CAMPAIGN)
+    assert not hasattr(record, "__dict__")
+    assert isinstance(record.created_at, float)
+    assert CAMPAIGN_RECORDS.unpack(record) == CAMPAIGN
+    assert CAMPAIGN_RECORDS.unpack_optional(None) is None
+
+
+def test_repeated_values_are_interned():
+    platform = "".join(["Face", "book"])
+    record = CAMPAIGN_RECORDS.pack(CAMPAIGN, platform=platform)
+    assert record.platform is sys.intern("Facebook")
+
+
+def test_sparse_values_serialize_like_the_model():
+    record = CAMPAIGN_RECORDS.pack(CAMPAIGN)
+    assert CAMPAIGN_RECORDS.values([record], ["id", "status", "created_at"]) == [
+        {"id": "1", "status": CampaignStatus.PAUSED, "created_at": datetime(2024, 1, 2, 3, 4, 5)},
+    ]
+
+
+def test_updates_are_validated_and_encoded():
+    record = CAMPAIGN_RECORDS.pack(CAMPAIGN)
+    assert CAMPAIGN_RECORDS.validate_updates(record, {"status": "active", "unknown": 1}) == {
+        "status": CampaignStatus.ACTIVE,
+    }
+    with pytest.raises(ValidationError):
+        CAMPAIGN_RECORDS.validate_updates(record, {"spend": "lots"})
+    with pytest.raises(ValidationError):
+        CAMPAIGN_RECORDS.validate_updates(record, {"name": None})
@@ -0,0 +1,68 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from models import RollupGrain
+from retention import PerformanceCompactor, RetentionPolicy
+
+
+def _columns(dates):
+    count = len(dates)
+    return {
+        "date": [day.toordinal() for day in dates], "platform": ["Google"] * count, "impressions": [100] * count,
+        "clicks": [10] * count, "conversions": [1] * count, "spend": [2.0] * count, "revenue": [3.0] * count,
+    }
+
+
+@pytest.mark.parametrize("today, months, cutoff", [
+    (date(2024, 3, 15), 1, "2024-02-01"),
+    (date(2024, 1, 31), 1, "2023-12-01"),
+    (date(2024, 1, 1), 13, "2022-12-01"),
+])
+def test_cutoff_keeps_whole_months(today, months, cutoff):
+    assert RetentionPolicy(months).cutoff(today) == cutoff
+
+
+def test_policy_from_environment(monkeypatch):
+    monkeypatch.delenv("PERFORMANCE_RETENTION_MONTHS", raising=False)
+    assert RetentionPolicy.from_env() is None
+    monkeypatch.setenv("PERFORMANCE_RETENTION_MONTHS", "6")
+    monkeypatch.setenv("PERFORMANCE_RETENTION_KEEP_GRAINS", "week, month")
+    assert RetentionPolicy.from_env().describe() == {"raw_months": 6, "keep_grains": ["week", "month"]}
+    with pytest.raises(ValueError):
+        RetentionPolicy(0)
+
+
+def test_compactor_run(storage):
+    policy = RetentionPolicy(1)
+    cutoff = date.fromisoformat(policy.cutoff())
+    old = date(cutoff.year - 1, 6, 10)
+    recent = cutoff.replace(day=5)
+    asyncio.run(storage.upsert_performance_columns(_columns([old, cutoff, recent])))
+
+    class Broken:
+        async def compact_performance(self, before, keep_grains):
+            raise RuntimeError("unavailable")
+
+    compactor = PerformanceCompactor(policy, lambda: [storage, Broken()])
+    asyncio.run(compactor.run_once())
+
+    stats = compactor.stats()
+    assert (stats["runs"], stats["rows_compacted"], stats["errors"]) == (1, 1, 1)
+    assert stats["last_cutoff"] == cutoff.isoformat()
+    assert stats["last_error"] == "RuntimeError: unavailable"
+    assert [row.date for row in asyncio.run(storage.get_performance())] == [cutoff.isoformat(), recent.isoformat()]
+    # The old row's totals survive in the month rollup only
+    months = asyncio.run(storage.get_performance_rollup(RollupGrain.MONTH))
+    assert (months[0].group, months[0].rows, months[0].spend) == (old.replace(day=1).isoformat(), 1, 2.0)
+    days = asyncio.run(storage.get_performance_rollup(RollupGrain.DAY))
+    assert old.isoformat() not in [bucket.group for bucket in days]
+    assert asyncio.run(storage.get_compaction_cutoff()) == cutoff.isoformat()
+    # Compacted days can no longer be upserted, since their rows are gone
+    with pytest.raises(ValueError):
+        asyncio.run(storage.upsert_performance_columns(_columns([old])))
+
+
+def test_retention_stats_endpoint_needs_a_policy(api):
+    assert api.get("/api/retention/stats").status_code == 404
@@ -0,0 +1,46 @@
+import asyncio
+
+CSV = (
+    "date,platform,impressions,clicks,conversions,spend,revenue\n"
+    "2024-01-31,Google,100,10,1,2.5,5.0\n"   # Wednesday
+    "2024-02-01,Google,50,5,0,1.5,0.0\n"     # Thursday, same ISO week
+    "2024-02-05,Facebook,20,2,1,1.0,3.0\n"   # the following Monday
+)
+
+
+def _totals(rollup):
+    return [(bucket["group"], bucket["rows"], bucket["impressions"], bucket["spend"]) for bucket in rollup]
+
+
+def test_rollups_by_grain(api):
+    api.post("/api/performance/import/csv", files={"file": ("rows.csv", CSV, "text/csv")})
+    assert _totals(api.get("/api/performance/rollup", params={"grain": "day"}).json()) == [
+        ("2024-01-31", 1, 100, 2.5), ("2024-02-01", 1, 50, 1.5), ("2024-02-05", 1, 20, 1.0),
+    ]
+    # Weeks start on Monday and are labelled with that date
+    assert _totals(api.get("/api/performance/rollup", params={"grain": "week"}).json()) == [
+        ("2024-01-29", 2, 150, 4.0), ("2024-02-05", 1, 20, 1.0),
+    ]
+    assert _totals(api.get("/api/performance/rollup", params={"grain": "month", "platform": "Google"}).json()) == [
+        ("2024-01-01", 1, 100, 2.5), ("2024-02-01", 1, 50, 1.5),
+    ]
+    # A start date inside a bucket includes that whole bucket
+    assert _totals(api.get("/api/performance/rollup", params={"grain": "week", "start_date": "2024-02-01"}).json()) == [
+        ("2024-01-29", 2, 150, 4.0), ("2024-02-05", 1, 20, 1.0),
+    ]
+
+
+def test_rollups_follow_upserts_and_corrections(api, storage):
+    api.post("/api/performance/import/csv", files={"file": ("rows.csv", CSV, "text/csv")})
+    # Re-uploading a key replaces its totals instead of adding to them
+    corrected = CSV.splitlines()[0] + "\n2024-02-01,Google,70,7,0,3.5,0.0\n"
+    api.post("/api/performance/import/csv", files={"file": ("rows.csv", corrected, "text/csv")})
+    row = next(row for row in api.get("/api/performance").json() if row["date"] == "2024-02-05")
+    asyncio.run(storage.update_performance(row["id"], {"platform": "Google", "impressions": 30}))
+
+    assert _totals(api.get("/api/performance/rollup", params={"grain": "week", "platform": "Google"}).json()) == [
+        ("2024-01-29", 2, 170, 6.0), ("2024-02-05", 1, 30, 1.0),
+    ]
+    assert api.get("/api/performance/rollup", params={"platform": "Facebook"}).json() == []
+    daily = api.get("/api/performance/aggregate", params={"group_by": "date"}).json()
+    assert api.get("/api/performance/rollup").json() == daily
@@ -0,0 +1,44 @@
+import asyncio
+from datetime import date
+
+from fastapi.encoders import jsonable_encoder
+
+from models import Campaign, Integration, PerformanceGroupBy, PerformanceQuery, RollupGrain
+
+
+def _seed(storage):
+    async def run():
+        await storage.create_campaign(Campaign(name="Launch", type="awareness", platform="Facebook", spend="10.50"))
+        await storage.create_integration(Integration(platform="Google", api_key="key"))
+        await storage.upsert_performance_columns({
+            "date": [date(2024, 1, 1).toordinal(), date(2024, 1, 2).toordinal()], "platform": ["Google", None],
+            "impressions": [100, 50], "clicks": [10, 5], "conversions": [1, 0], "spend": [2.5, 1.25],
+            "revenue": [5.0, 0.0],
+        })
+
+    asyncio.run(run())
+
+
+def test_trusted_responses_match_the_response_model_encoding(api, storage):
+    _seed(storage)
+    expected = {
+        "/api/campaigns?limit=10": asyncio.run(storage.get_campaigns()),
+        "/api/performance?limit=10": asyncio.run(storage.get_performance()),
+        "/api/performance/aggregate?group_by=platform":
+            asyncio.run(storage.aggregate_performance(PerformanceQuery(), PerformanceGroupBy.PLATFORM)),
+        "/api/performance/rollup?grain=month": asyncio.run(storage.get_performance_rollup(RollupGrain.MONTH)),
+        "/api/changes?since=0": asyncio.run(storage.get_changes(0, 100)),
+    }
+    for path, items in expected.items():
+        assert items, path
+        response = api.get(path)
+        assert response.status_code == 200, path
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == jsonable_encoder(items), path
+
+
+def test_cached_list_bodies_match_the_response_model_encoding(api, storage):
+    _seed(storage)
+    assert api.get("/api/campaigns").json() == jsonable_encoder(asyncio.run(storage.get_campaigns()))
+    assert api.get("/api/integrations").json() == jsonable_encoder(asyncio.run(storage.get_integrations()))
+    assert api.get("/api/metrics").json() == jsonable_encoder(asyncio.run(storage.get_metrics()))
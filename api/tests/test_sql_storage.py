@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from models import Campaign, Integration, PerformanceData
+from sql_storage import SqlStorage
+
+CAMPAIGN = Campaign(name="Launch", type="awareness", platform="Facebook", spend="10.00")
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'shared.db'}"
+
+
+def test_workers_share_records_and_change_feed(database_url):
+    # Two instances on one database behave like two worker processes
+    first, second = SqlStorage(database_url), SqlStorage(database_url)
+
+    async def run():
+        created = await first.create_campaign(CAMPAIGN)
+        await second.update_campaign(created.id, {"status": "paused"})
+        integration = await second.create_integration(Integration(platform="Google", api_key="key"))
+        [row] = await first.create_performance([PerformanceData(date="2024-01-01", platform="Google", spend=5.0)])
+        changes = await first.get_changes(0)
+        return created, integration, row, changes, await first.get_campaign(created.id), await first.get_change_seq()
+
+    created, integration, row, changes, campaign, seq = asyncio.run(run())
+    assert (campaign.status.value, campaign.version) == ("paused", 2)
+    assert [(change.collection, change.op) for change in changes] == [
+        ("campaigns", "create"), ("campaigns", "update"), ("integrations", "create"), ("performance", "create"),
+    ]
+    assert [change.id for change in changes] == [created.id, created.id, integration.id, row.id]
+    assert changes[1].record["status"] == "paused"
+    assert seq == changes[-1].seq
+    asyncio.run(first.close())
+
+
+def test_clients_are_isolated(database_url):
+    acme, globex = SqlStorage(database_url, client_id="acme"), SqlStorage(database_url, client_id="globex")
+
+    async def run():
+        created = await acme.create_campaign(CAMPAIGN)
+        await acme.create_performance([PerformanceData(date="2024-01-01", platform="Google", spend=5.0)])
+        return (
+            created, await globex.get_campaign(created.id), await globex.get_campaigns(),
+            await globex.get_performance(), await globex.delete_campaign(created.id), await globex.get_change_seq(),
+        )
+
+    created, seen, campaigns, performance, deleted, seq = asyncio.run(run())
+    assert created.client_id == "acme"
+    assert (seen, campaigns, performance, deleted, seq) == (None, [], [], False, 0)
+    assert asyncio.run(acme.get_campaign(created.id)) is not None
+    asyncio.run(acme.close())
+
+
+def test_data_survives_reopening(database_url):
+    storage = SqlStorage(database_url)
+    created = asyncio.run(storage.create_campaign(CAMPAIGN))
+    asyncio.run(storage.close())
+
+    reopened = SqlStorage(database_url)
+    assert asyncio.run(reopened.get_campaign(created.id)) == created
+    asyncio.run(reopened.close())
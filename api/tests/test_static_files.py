@@ -0,0 +1,71 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import main
+from static_files import IMMUTABLE_CACHE_CONTROL, IndexPage, PrecompressedStaticFiles, accepted_encodings
+
+SCRIPT = b"console.log('app');" * 20
+
+
+def _assets(tmp_path):
+    assets = tmp_path / "assets"
+    assets.mkdir()
+    (assets / "app-1a2b.js").write_bytes(SCRIPT)
+    (assets / "app-1a2b.js.gz").write_bytes(gzip.compress(SCRIPT))
+    (assets / "app-1a2b.js.br").write_bytes(b"brotli bytes")
+    (assets / "logo-3c4d.svg").write_bytes(b"<svg/>")
+    app = FastAPI()
+    app.mount("/assets", PrecompressedStaticFiles(directory=str(assets)), name="assets")
+    return TestClient(app)
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, br;q=0, deflate;q=0.5") == {"gzip", "deflate"}
+    assert accepted_encodings(None) == set()
+
+
+def test_assets_are_immutable_and_served_precompressed(tmp_path):
+    client = _assets(tmp_path)
+    brotli = client.get("/assets/app-1a2b.js", headers={"Accept-Encoding": "gzip, br"})
+    assert brotli.headers["content-encoding"] == "br"
+    assert brotli.headers["content-length"] == str(len(b"brotli bytes"))
+    assert brotli.headers["content-type"].startswith("text/javascript")
+    assert brotli.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert brotli.headers["vary"] == "Accept-Encoding"
+
+    gzipped = client.get("/assets/app-1a2b.js", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.content == SCRIPT
+
+    plain = client.get("/assets/app-1a2b.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.content == SCRIPT
+    revalidated = client.get(
+        "/assets/app-1a2b.js", headers={"Accept-Encoding": "identity", "If-None-Match": plain.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+    # Files without variants are not marked as varying
+    logo = client.get("/assets/logo-3c4d.svg", headers={"Accept-Encoding": "gzip, br"})
+    assert (logo.headers["cache-control"], "vary" in logo.headers) == (IMMUTABLE_CACHE_CONTROL, False)
+
+
+def test_index_fallback_is_compressed_and_revalidated(tmp_path, monkeypatch):
+    index = tmp_path / "index.html"
+    monkeypatch.setattr(main, "index_page", IndexPage(str(index), recheck_interval=0))
+    client = TestClient(main.app)
+    assert "not built" in client.get("/dashboard").json()["message"]
+
+    index.write_bytes(b"<html>first build</html>")
+    page = client.get("/campaigns/42", headers={"Accept-Encoding": "gzip"})
+    assert page.headers["content-encoding"] == "gzip"
+    assert page.headers["cache-control"] == "no-cache"
+    assert page.content == b"<html>first build</html>"
+    assert client.get("/", headers={"If-None-Match": page.headers["etag"]}).status_code == 304
+
+    index.write_bytes(b"<html>second build!</html>")
+    rebuilt = client.get("/", headers={"Accept-Encoding": "identity", "If-None-Match": page.headers["etag"]})
+    assert rebuilt.status_code == 200
+    assert rebuilt.content == b"<html>second build!</html>"
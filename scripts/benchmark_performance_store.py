@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Memory and aggregate-latency benchmark for the columnar performance store.
+
+Usage:
+    python scripts/benchmark_performance_store.py [--rows N] [--model-sample N]
+
+Bytes per row are measured with tracemalloc for a list of PerformanceData
+models (on --model-sample rows) and for PerformanceColumns (on --rows rows).
+Aggregates use NumPy when it is installed.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+from models import PerformanceData  # noqa: E402
+import performance_store  # noqa: E402
+from performance_store import PerformanceColumns  # noqa: E402
+
+PLATFORMS = ["Facebook", "Google Ads", "LinkedIn", "TikTok", "Instagram"]
+FIRST_DAY = date(2020, 1, 1).toordinal()
+
+
+def model_bytes_per_row(count: int) -> float:
+    tracemalloc.start()
+    rows = [
+        PerformanceData(
+            id=str(i), date=date.fromordinal(FIRST_DAY + i % 1500).isoformat(),
+            impressions=i, clicks=i // 10, conversions=i // 100, spend=i * 0.5, revenue=i * 1.5,
+            platform=PLATFORMS[i % len(PLATFORMS)], created_at=datetime.now(),
+        )
+        for i in range(count)
+    ]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return size / count
+
+
+def build_columns(count: int) -> PerformanceColumns:
+    rng = random.Random(42)
+    store = PerformanceColumns()
+    chunk = 1_000_000
+    for start in range(0, count, chunk):
+        n = min(chunk, count - start)
+        store.extend_columns(
+            dates=[FIRST_DAY + rng.randrange(1500) for _ in range(n)],
+            platforms=[PLATFORMS[rng.randrange(len(PLATFORMS))] for _ in range(n)],
+            impressions=[rng.randrange(100000) for _ in range(n)],
+            clicks=[rng.randrange(5000) for _ in range(n)],
+            conversions=[rng.randrange(500) for _ in range(n)],
+            spend=[rng.random() * 1000 for _ in range(n)],
+            revenue=[rng.random() * 5000 for _ in range(n)],
+            created_at=[0.0] * n,
+        )
+    return store
+
+
+def timed(label: str, fn, repeat: int = 3) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<28} {best * 1000:>10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--model-sample", type=int, default=100_000)
+    args = parser.parse_args()
+
+    model_bytes = model_bytes_per_row(args.model_sample)
+    store = build_columns(args.rows)
+    column_bytes = store.nbytes() / len(store)
+    print(f"rows: {len(store):,}  numpy: {'yes' if performance_store.np is not None else 'no'}")
+    print(f"  PerformanceData list       {model_bytes:>10.1f} bytes/row")
+    print(f"  PerformanceColumns         {column_bytes:>10.1f} bytes/row  ({model_bytes / column_bytes:.1f}x smaller)")
+
+    print("aggregates")
+    timed("sum(spend)", lambda: store.sum("spend"))
+    timed("mean(revenue)", lambda: store.mean("revenue"))
+    timed("aggregate()", lambda: store.aggregate())
+    timed("aggregate(group_by=platform)", lambda: store.aggregate(group_by="platform"))
+    timed("aggregate(group_by=date)", lambda: store.aggregate(group_by="date"))
+
+
+if __name__ == "__main__":
+    main()
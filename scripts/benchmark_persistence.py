@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Write overhead and restart time of the persistent MemoryStorage.
+
+Usage:
+    python scripts/benchmark_persistence.py [--writes N] [--rows N] [--campaigns N]
+
+Times create_campaign/update_campaign with no log and with each fsync policy,
+then measures restart-to-ready for a snapshot holding --rows performance rows
+and --campaigns campaigns.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+from models import Campaign  # noqa: E402
+from persistence import FSYNC_POLICIES, PersistentMemoryStorage  # noqa: E402
+from storage import MemoryStorage  # noqa: E402
+
+PLATFORMS = ["Facebook", "Google Ads", "LinkedIn", "TikTok"]
+
+
+async def write_load(storage, writes: int) -> float:
+    campaign = Campaign(name="Bench", type="conversions", platform="Facebook", spend="10.00")
+    start = time.perf_counter()
+    for _ in range(writes // 2):
+        created = await storage.create_campaign(campaign)
+        await storage.update_campaign(created.id, {"status": "paused"})
+    return (time.perf_counter() - start) / writes
+
+
+def fill(storage: PersistentMemoryStorage, rows: int, campaigns: int) -> None:
+    rng = random.Random(7)
+    first_day = date(2022, 1, 1).toordinal()
+    storage.performance.extend_columns(
+        dates=[first_day + rng.randrange(730) for _ in range(rows)],
+        platforms=[PLATFORMS[rng.randrange(len(PLATFORMS))] for _ in range(rows)],
+        impressions=[rng.randrange(100000) for _ in range(rows)],
+        clicks=[rng.randrange(5000) for _ in range(rows)],
+        conversions=[rng.randrange(500) for _ in range(rows)],
+        spend=[rng.random() * 1000 for _ in range(rows)],
+        revenue=[rng.random() * 5000 for _ in range(rows)],
+    )
+    for i in range(campaigns):
+        storage.campaigns.add(Campaign(id=str(i), name=f"Campaign {i}", type="conversions",
+                                       platform=PLATFORMS[i % len(PLATFORMS)], spend="10.00"))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--campaigns", type=int, default=50_000)
+    args = parser.parse_args()
+
+    print("write latency (create + update, mean per call)")
+    baseline = await write_load(MemoryStorage(), args.writes)
+    print(f"  {'no log':<10} {baseline * 1e6:>10.1f} us")
+    for policy in FSYNC_POLICIES:
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = PersistentMemoryStorage(tmp, fsync=policy, snapshot_every=10 ** 9)
+            latency = await write_load(storage, args.writes)
+            storage.wal.close()
+        print(f"  {policy:<10} {latency * 1e6:>10.1f} us  (+{(latency - baseline) * 1e6:.1f} us)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = PersistentMemoryStorage(tmp)
+        fill(storage, args.rows, args.campaigns)
+        start = time.perf_counter()
+        storage.snapshot()
+        snapshot_seconds = time.perf_counter() - start
+        size = os.path.getsize(storage.snapshot_path)
+        storage.wal.close()
+
+        start = time.perf_counter()
+        restored = PersistentMemoryStorage(tmp)
+        restart_seconds = time.perf_counter() - start
+        print(f"snapshot of {args.rows:,} rows + {args.campaigns:,} campaigns: "
+              f"{size / 1e6:.1f} MB written in {snapshot_seconds:.2f} s")
+        print(f"restart to ready: {restart_seconds:.2f} s "
+              f"({len(restored.performance):,} rows, {len(restored.campaigns):,} campaigns)")
+        restored.wal.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Memory benchmark for MemoryStorage's compact records versus pydantic models.
+
+Usage:
+    python scripts/benchmark_records.py [--rows N]
+
+Bytes per record are measured with tracemalloc for N campaigns held as
+Campaign models and as the slotted records MemoryStorage stores (both
+including their id/name/spend strings), plus the cost of materializing
+models back out of the records.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+from models import Campaign, CampaignStatus  # noqa: E402
+from records import CAMPAIGN_RECORDS  # noqa: E402
+
+PLATFORMS = ["Facebook", "Google Ads", "LinkedIn", "TikTok", "Instagram"]
+TYPES = ["conversions", "awareness", "traffic"]
+STATUSES = list(CampaignStatus)
+
+
+def make_campaign(i: int) -> Campaign:
+    now = datetime.now()
+    return Campaign(
+        id=str(uuid.UUID(int=i)), name=f"Campaign {i}", type=TYPES[i % len(TYPES)],
+        platform=PLATFORMS[i % len(PLATFORMS)], impressions=i * 10, clicks=i,
+        spend=f"{i % 10000}.{i % 100:02d}", status=STATUSES[i % len(STATUSES)],
+        created_at=now, updated_at=now,
+    )
+
+
+def measure(count: int, build) -> float:
+    tracemalloc.start()
+    items = [build(i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return size / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    model_bytes = measure(args.rows, make_campaign)
+    record_bytes = measure(args.rows, lambda i: CAMPAIGN_RECORDS.pack(make_campaign(i)))
+    print(f"campaigns: {args.rows:,}")
+    print(f"  Campaign models            {model_bytes:>10.1f} bytes/record")
+    print(f"  CampaignRecord             {record_bytes:>10.1f} bytes/record  ({model_bytes / record_bytes:.1f}x smaller)")
+
+    records = [CAMPAIGN_RECORDS.pack(make_campaign(i)) for i in range(min(args.rows, 100_000))]
+    start = time.perf_counter()
+    for record in records:
+        CAMPAIGN_RECORDS.unpack(record)
+    elapsed = time.perf_counter() - start
+    print(f"  materialize model          {elapsed / len(records) * 1e6:>10.2f} us/record")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Request CPU time of list responses: response_model validation versus direct encoding.
+
+Usage:
+    python scripts/benchmark_serialization.py [--items N] [--requests N]
+
+Serves the same N campaigns and N performance rows from one FastAPI app four ways
+and drives it in-process over ASGI (no sockets), reporting CPU time per request:
+
+    response_model  return the models and let FastAPI re-validate and encode them
+    dump_json       TypeAdapter.dump_json of the trusted models (what the API does)
+    orjson          orjson.dumps of model_dump() output, when orjson is installed
+    cached          the pre-serialized body CachedStorage hands out on a hit
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+from fastapi import FastAPI, Response  # noqa: E402
+
+from models import Campaign, CampaignStatus, PerformanceData  # noqa: E402
+from storage import campaigns_json, json_body, performance_json  # noqa: E402
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+PLATFORMS = ["Facebook", "Google Ads", "LinkedIn", "TikTok", "Instagram"]
+STATUSES = list(CampaignStatus)
+
+
+def build_app(campaigns: List[Campaign], rows: List[PerformanceData]) -> FastAPI:
+    app = FastAPI()
+    collections = {"campaigns": (campaigns, campaigns_json), "performance": (rows, performance_json)}
+    cached = {name: json_body(adapter.dump_json(items)) for name, (items, adapter) in collections.items()}
+
+    @app.get("/response_model/campaigns", response_model=List[Campaign])
+    async def campaigns_response_model():
+        return campaigns
+
+    @app.get("/response_model/performance", response_model=List[PerformanceData])
+    async def performance_response_model():
+        return rows
+
+    @app.get("/dump_json/{name}")
+    async def dump_json(name: str):
+        items, adapter = collections[name]
+        return Response(adapter.dump_json(items), media_type="application/json")
+
+    @app.get("/orjson/{name}")
+    async def orjson_dumps(name: str):
+        items, _ = collections[name]
+        return Response(orjson.dumps([item.model_dump() for item in items]), media_type="application/json")
+
+    @app.get("/cached/{name}")
+    async def cached_body(name: str):
+        return Response(cached[name].body, media_type="application/json")
+
+    return app
+
+
+async def request(app: FastAPI, path: str) -> int:
+    """One GET through the ASGI interface; returns the body size."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "", "headers": [],
+        "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+    }
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    now = datetime.now()
+    campaigns = [
+        Campaign(
+            id=str(i), client_id="default", name=f"Campaign {i}", type="conversions",
+            platform=PLATFORMS[i % len(PLATFORMS)], impressions=i * 10, clicks=i, spend=f"{i % 10000}.{i % 100:02d}",
+            status=STATUSES[i % len(STATUSES)], created_at=now, updated_at=now,
+        )
+        for i in range(args.items)
+    ]
+    rows = [
+        PerformanceData(
+            id=str(i), client_id="default", date=f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            impressions=i, clicks=i % 500, conversions=i % 50, spend=i / 100, revenue=i / 25,
+            platform=PLATFORMS[i % len(PLATFORMS)], created_at=now,
+        )
+        for i in range(args.items)
+    ]
+    app = build_app(campaigns, rows)
+    modes = ["response_model", "dump_json"] + (["orjson"] if orjson else []) + ["cached"]
+
+    print(f"{args.items:,} items per list, {args.requests} requests each (CPU ms per request)")
+    print(f"  {'mode':<16} {'campaigns':>12} {'performance':>12} {'body KB':>10}")
+    baseline = {}
+    for mode in modes:
+        timings = {}
+        for name in ("campaigns", "performance"):
+            path = f"/{mode}/{name}"
+            size = await request(app, path)  # warm up
+            start = time.process_time()
+            for _ in range(args.requests):
+                await request(app, path)
+            timings[name] = (time.process_time() - start) / args.requests * 1000
+        if not baseline:
+            baseline = timings
+        speedup = "  ".join(f"{baseline[name] / timings[name]:.1f}x" for name in timings if timings[name])
+        print(
+            f"  {mode:<16} {timings['campaigns']:>12.2f} {timings['performance']:>12.2f} "
+            f"{size / 1024:>10.0f}   {speedup}"
+        )
+    if orjson is None:
+        print("  (orjson not installed; skipped)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
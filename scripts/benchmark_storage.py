@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the IStorage backends.
+
+Usage:
+    python scripts/benchmark_storage.py [--backend NAME ...] [--scales 1000,100000,1000000]
+        [--iterations N] [--scan-iterations N] [--database-url URL]
+        [--output results.json] [--compare previous.json]
+
+For each backend and scale a fresh storage is preloaded with that many
+campaigns, integrations and performance rows. Then every operation is timed
+call by call (p50/p99 latency and sequential throughput) and traced with
+tracemalloc for its peak Python allocation per call.
+
+Backends:
+    memory         MemoryStorage
+    persistent     PersistentMemoryStorage in a temporary directory
+    sql            SqlStorage on --database-url, or a temporary SQLite file
+    cached-memory  CachedStorage over MemoryStorage (same for cached-sql, ...)
+    module:name    any zero-argument factory returning an IStorage
+
+--output writes the results as JSON; --compare prints the latency change
+against such a file from an earlier run.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from array import array
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+from models import Campaign, CampaignStatus, Integration, PerformanceQuery  # noqa: E402
+from storage import IStorage, MemoryStorage  # noqa: E402
+
+PLATFORMS = ["Facebook", "Google Ads", "LinkedIn", "TikTok", "Instagram"]
+TYPES = ["conversions", "awareness", "traffic"]
+STATUSES = list(CampaignStatus)
+FIRST_DAY = date(2023, 1, 1).toordinal()
+LOAD_BATCH = 10000
+
+
+def open_backend(name: str, tmp: str, database_url: str, scale: int) -> IStorage:
+    if name.startswith("cached-"):
+        from cache import CachedStorage
+        return CachedStorage(open_backend(name[len("cached-"):], tmp, database_url, scale))
+    if name == "memory":
+        return MemoryStorage(seed=False)
+    if name == "persistent":
+        from persistence import PersistentMemoryStorage
+        return PersistentMemoryStorage(os.path.join(tmp, f"persistent-{scale}"), seed=False)
+    if name == "sql":
+        from sql_storage import SqlStorage
+        url = database_url or f"sqlite:///{os.path.join(tmp, f'bench-{scale}.db')}"
+        # A client of its own keeps runs against a shared database apart
+        return SqlStorage(url, client_id=f"bench-{uuid.uuid4().hex[:12]}")
+    if ":" in name:
+        module, factory = name.split(":", 1)
+        return getattr(importlib.import_module(module), factory)()
+    raise SystemExit(f"Unknown backend {name!r}")
+
+
+def make_campaign(i: int) -> Campaign:
+    return Campaign(
+        name=f"Campaign {i}", type=TYPES[i % len(TYPES)], platform=PLATFORMS[i % len(PLATFORMS)],
+        impressions=i * 10, clicks=i, spend=f"{i % 10000}.{i % 100:02d}", status=STATUSES[i % len(STATUSES)],
+    )
+
+
+def performance_columns(start: int, count: int) -> Dict[str, Any]:
+    positions = range(start, start + count)
+    return {
+        "date": array("l", (FIRST_DAY + i % 730 for i in positions)),
+        "platform": [PLATFORMS[i % len(PLATFORMS)] for i in positions],
+        "impressions": array("q", (i % 100000 for i in positions)),
+        "clicks": array("q", (i % 5000 for i in positions)),
+        "conversions": array("q", (i % 500 for i in positions)),
+        "spend": array("d", (i % 100000 / 100 for i in positions)),
+        "revenue": array("d", (i % 500000 / 100 for i in positions)),
+    }
+
+
+async def preload(storage: IStorage, scale: int) -> Tuple[List[str], List[str]]:
+    campaign_ids = []
+    integration_ids = []
+    for start in range(0, scale, LOAD_BATCH):
+        count = min(LOAD_BATCH, scale - start)
+        created = await storage.create_campaigns([make_campaign(i) for i in range(start, start + count)])
+        campaign_ids += [campaign.id for campaign in created]
+        created = await storage.create_integrations([
+            Integration(platform=PLATFORMS[i % len(PLATFORMS)], account_id=str(i)) for i in range(start, start + count)
+        ])
+        integration_ids += [integration.id for integration in created]
+        await storage.import_performance_columns(performance_columns(start, count))
+    return campaign_ids, integration_ids
+
+
+def operations(
+    storage: IStorage, campaign_ids: List[str], integration_ids: List[str], iterations: int, scan_iterations: int
+) -> List[Tuple[str, int, Callable[[int], Awaitable[Any]]]]:
+    """(name, calls, call(i)) in run order.
+
+    Each call is made ``calls`` times plus the traced memory samples; creates
+    make the records later updates cycle through and deletes consume.
+    """
+    created_campaigns: List[str] = []
+    created_integrations: List[str] = []
+    window_start = date.fromordinal(FIRST_DAY + 30).isoformat()
+    window_end = date.fromordinal(FIRST_DAY + 60).isoformat()
+
+    async def create_campaign(i):
+        created_campaigns.append((await storage.create_campaign(make_campaign(i))).id)
+
+    async def create_integration(i):
+        created = await storage.create_integration(Integration(platform=PLATFORMS[i % len(PLATFORMS)]))
+        created_integrations.append(created.id)
+
+    return [
+        ("get_campaigns", scan_iterations, lambda i: storage.get_campaigns()),
+        ("get_campaign", iterations, lambda i: storage.get_campaign(campaign_ids[i * 7919 % len(campaign_ids)])),
+        ("get_campaigns_page", iterations, lambda i: storage.get_campaigns_page(100)),
+        ("create_campaign", iterations, create_campaign),
+        ("update_campaign", iterations,
+         lambda i: storage.update_campaign(created_campaigns[i % len(created_campaigns)], {"status": "paused"})),
+        ("delete_campaign", iterations, lambda i: storage.delete_campaign(created_campaigns.pop())),
+        ("get_metrics", iterations, lambda i: storage.get_metrics()),
+        ("get_performance", scan_iterations, lambda i: storage.get_performance()),
+        ("get_performance_window", iterations,
+         lambda i: storage.get_performance(window_start, window_end, PLATFORMS[i % len(PLATFORMS)])),
+        ("query_performance_page", iterations, lambda i: storage.query_performance(PerformanceQuery(), 100)),
+        ("get_integrations", scan_iterations, lambda i: storage.get_integrations()),
+        ("get_integration", iterations,
+         lambda i: storage.get_integration(integration_ids[i * 7919 % len(integration_ids)])),
+        ("create_integration", iterations, create_integration),
+        ("update_integration", iterations,
+         lambda i: storage.update_integration(created_integrations[i % len(created_integrations)], {"status": "connected"})),
+        ("delete_integration", iterations, lambda i: storage.delete_integration(created_integrations.pop())),
+    ]
+
+
+def percentile(sorted_samples: List[float], fraction: float) -> float:
+    index = min(len(sorted_samples) - 1, max(0, round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+async def measure(calls: int, call: Callable[[int], Awaitable[Any]], memory_samples: int) -> Dict[str, Any]:
+    samples = []
+    for i in range(calls):
+        start = time.perf_counter()
+        await call(i)
+        samples.append(time.perf_counter() - start)
+    # Traced separately, since tracemalloc slows every allocation down
+    peak = 0
+    tracemalloc.start()
+    try:
+        for i in range(calls, calls + memory_samples):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            await call(i)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    samples.sort()
+    total = sum(samples)
+    return {
+        "calls": calls,
+        "mean_us": total / calls * 1e6,
+        "p50_us": percentile(samples, 0.5) * 1e6,
+        "p99_us": percentile(samples, 0.99) * 1e6,
+        "max_us": samples[-1] * 1e6,
+        "ops_per_second": calls / total if total else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+def max_rss_bytes() -> int:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+async def run_scale(backend: str, scale: int, args, tmp: str) -> Dict[str, Any]:
+    storage = open_backend(backend, tmp, args.database_url, scale)
+    try:
+        start = time.perf_counter()
+        campaign_ids, integration_ids = await preload(storage, scale)
+        load_seconds = time.perf_counter() - start
+        results = {}
+        for name, calls, call in operations(storage, campaign_ids, integration_ids, args.iterations, args.scan_iterations):
+            results[name] = await measure(calls, call, args.memory_samples)
+            print(
+                f"  {name:<24} p50 {results[name]['p50_us']:>11.1f} us  p99 {results[name]['p99_us']:>11.1f} us  "
+                f"{results[name]['ops_per_second'] or 0:>11.1f} ops/s  peak {results[name]['peak_memory_bytes'] / 1024:>9.1f} KiB",
+                flush=True,
+            )
+        return {
+            "records": scale,
+            "load_seconds": load_seconds,
+            "max_rss_bytes": max_rss_bytes(),
+            "operations": results,
+        }
+    finally:
+        await storage.close()
+        engine = getattr(getattr(storage, "inner", storage), "engine", None)
+        if engine is not None:
+            engine.dispose()
+
+
+def compare(results: Dict[str, Any], previous: Dict[str, Any]) -> None:
+    print("\nchange against previous run (p50 / p99 latency; negative is faster)")
+    for backend, scales in results["backends"].items():
+        for scale, result in scales.items():
+            before = previous.get("backends", {}).get(backend, {}).get(scale)
+            if before is None:
+                continue
+            print(f"{backend} @ {int(scale):,}")
+            for name, current in result["operations"].items():
+                old = before["operations"].get(name)
+                if old is None:
+                    continue
+                p50 = (current["p50_us"] - old["p50_us"]) / old["p50_us"] * 100
+                p99 = (current["p99_us"] - old["p99_us"]) / old["p99_us"] * 100
+                print(f"  {name:<24} {p50:>+8.1f}% {p99:>+8.1f}%")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", action="append", help="backend to run (repeatable; default memory)")
+    parser.add_argument("--scales", default="1000,100000,1000000", help="comma-separated record counts")
+    parser.add_argument("--iterations", type=int, default=200, help="calls per point operation")
+    parser.add_argument("--scan-iterations", type=int, default=5, help="calls per full-collection read")
+    parser.add_argument("--memory-samples", type=int, default=3, help="traced calls per operation")
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+    # At least one timed call per operation, so percentiles exist
+    args.iterations = max(args.iterations, 1)
+    args.scan_iterations = max(args.scan_iterations, 1)
+    scales = [int(scale) for scale in args.scales.split(",") if scale.strip()]
+
+    results = {
+        "started_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "scan_iterations": args.scan_iterations,
+        "backends": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backend or ["memory"]:
+            results["backends"][backend] = {}
+            for scale in scales:
+                print(f"\n{backend} @ {scale:,} records", flush=True)
+                results["backends"][backend][str(scale)] = await run_scale(backend, scale, args, tmp)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nresults written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Write .gz and .br variants of the React build's assets for precompressed serving.
+
+Usage:
+    python scripts/compress_assets.py [DIRECTORY] [--min-size BYTES] [--force]
+
+Run after ``npm run build``. Every text asset under DIRECTORY (default
+api/dist/assets) of at least --min-size bytes gets a maximum-effort gzip
+variant, plus a brotli one when the ``brotli`` package is installed. The API
+serves those to clients that accept the encoding (see api/static_files.py).
+Variants that would not be smaller are skipped, and up-to-date ones are kept
+unless --force is given.
+"""
+import argparse
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; only .gz variants are written without it
+    brotli = None
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(__file__), "..", "api", "dist", "assets")
+COMPRESSIBLE = (".js", ".mjs", ".css", ".html", ".json", ".map", ".svg", ".txt", ".xml", ".wasm", ".ico")
+
+
+def compressors():
+    # gzip without a timestamp, so rebuilding the same asset gives the same bytes
+    yield ".gz", lambda data: gzip.compress(data, 9, mtime=0)
+    if brotli is not None:
+        yield ".br", lambda data: brotli.compress(data, quality=11)
+
+
+def compress_file(path: str, force: bool) -> int:
+    """Write the variants of one asset; returns the bytes they save over the original."""
+    with open(path, "rb") as f:
+        data = f.read()
+    saved = 0
+    for suffix, compress in compressors():
+        target = path + suffix
+        if not force and os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+            continue
+        compressed = compress(data)
+        if len(compressed) >= len(data):
+            if os.path.exists(target):
+                os.remove(target)
+            continue
+        with open(target, "wb") as f:
+            f.write(compressed)
+        saved += len(data) - len(compressed)
+    return saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", nargs="?", default=DEFAULT_DIRECTORY)
+    parser.add_argument("--min-size", type=int, default=1024, help="skip smaller files (bytes)")
+    parser.add_argument("--force", action="store_true", help="rewrite variants that are up to date")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        sys.exit(f"{args.directory} does not exist; run 'npm run build' first")
+    if brotli is None:
+        print("brotli is not installed; writing .gz variants only")
+    files = saved = 0
+    for root, _, names in os.walk(args.directory):
+        for name in names:
+            path = os.path.join(root, name)
+            if not name.endswith(COMPRESSIBLE) or os.path.getsize(path) < args.min_size:
+                continue
+            saved += compress_file(path, args.force)
+            files += 1
+    print(f"compressed {files} files under {os.path.normpath(args.directory)}, {saved / 1024:.0f} KiB saved per full download")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""End-to-end HTTP load test of the API with latency SLOs.
+
+Usage:
+    python scripts/load_test.py [SCENARIO.json] [--base-url URL] [--duration S]
+        [--concurrency N] [--rate RPS] [--output report.json]
+        [--baseline baseline.json] [--save-baseline baseline.json]
+
+Without --base-url the app is started locally with uvicorn on a free port
+(STORAGE_BACKEND and the other storage variables are passed through) and
+stopped afterwards. The default scenario is scripts/load_scenarios/dashboard.json.
+
+A scenario is a JSON file:
+
+    {
+      "name": "dashboard",
+      "duration": 30, "warmup": 3,       seconds; warmup requests are not counted
+      "concurrency": 20,                 virtual users (in-flight requests)
+      "rate": null,                      optional target requests/second (open loop)
+      "headers": {"X-Client-Id": "default"},
+      "variables": {"campaign_id": {"from": "/api/campaigns", "field": "id"}},
+      "requests": [
+        {"name": "campaigns", "method": "GET", "path": "/api/campaigns", "weight": 5},
+        {"name": "pause", "method": "PATCH", "path": "/api/campaigns/{campaign_id}",
+         "bodies": [{"status": "paused"}, {"status": "active"}], "weight": 1}
+      ],
+      "slo": {"p95_ms": 50, "p99_ms": 200, "error_rate": 0.001, "min_rps": 200,
+              "regression": {"latency": 0.25, "throughput": 0.2}}
+    }
+
+Variables are fetched once before the run; each request fills its path
+placeholders with a random value. Without ``rate`` every virtual user sends
+its next request as soon as the last one returns; with it requests are
+started on a fixed schedule and latency is measured from the scheduled time,
+so a stalled server cannot hide queueing delay.
+
+The run fails (exit status 1) when an SLO is missed, or when --baseline is
+given and p95/p99 latency grew or throughput fell by more than the
+scenario's regression tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api")
+DEFAULT_SCENARIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "load_scenarios", "dashboard.json")
+STARTUP_TIMEOUT = 30.0
+DEFAULT_REGRESSION = {"latency": 0.25, "throughput": 0.2}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start_app() -> Tuple[subprocess.Popen, str]:
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=API_DIR,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise SystemExit(f"App exited with status {process.returncode} during startup")
+            try:
+                if (await client.get("/api/health")).status_code == 200:
+                    return process, base_url
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f"App did not answer /api/health within {STARTUP_TIMEOUT:.0f} s")
+
+
+def stop_app(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def resolve_variables(client: httpx.AsyncClient, variables: Dict[str, Any]) -> Dict[str, List[Any]]:
+    values = {}
+    for name, source in variables.items():
+        response = await client.get(source["from"])
+        response.raise_for_status()
+        values[name] = [item[source["field"]] for item in response.json() if item.get(source["field"]) is not None]
+        if not values[name]:
+            raise SystemExit(f"Variable {name!r}: {source['from']} returned no {source['field']!r} values")
+    return values
+
+
+class Recorder:
+    """Latencies and outcomes per request name, counted once warmup is over."""
+
+    def __init__(self, names: List[str]):
+        self.latencies: Dict[str, List[float]] = {name: [] for name in names}
+        self.errors: Dict[str, int] = {name: 0 for name in names}
+        self.statuses: Dict[str, Dict[str, int]] = {name: {} for name in names}
+        self.recording = False
+
+    def record(self, name: str, latency: float, status: str, ok: bool) -> None:
+        if not self.recording:
+            return
+        self.latencies[name].append(latency)
+        self.statuses[name][status] = self.statuses[name].get(status, 0) + 1
+        if not ok:
+            self.errors[name] += 1
+
+
+async def send(client: httpx.AsyncClient, request: Dict[str, Any], values: Dict[str, List[Any]],
+               headers: Dict[str, str], recorder: Recorder, started: Optional[float] = None) -> None:
+    path = request["path"].format(**{name: random.choice(choices) for name, choices in values.items()})
+    body = random.choice(request["bodies"]) if request.get("bodies") else request.get("json")
+    started = started if started is not None else time.perf_counter()
+    try:
+        response = await client.request(request.get("method", "GET"), path, json=body, headers=headers)
+        status = str(response.status_code)
+        ok = response.status_code < 400
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+        ok = False
+    recorder.record(request["name"], time.perf_counter() - started, status, ok)
+
+
+async def run(client: httpx.AsyncClient, scenario: Dict[str, Any], values: Dict[str, List[Any]]) -> Dict[str, Any]:
+    requests = scenario["requests"]
+    weights = [request.get("weight", 1) for request in requests]
+    headers = scenario.get("headers", {})
+    concurrency = scenario.get("concurrency", 10)
+    rate = scenario.get("rate")
+    warmup = scenario.get("warmup", 0)
+    recorder = Recorder([request["name"] for request in requests])
+    stop_at = time.perf_counter() + warmup + scenario.get("duration", 30)
+
+    async def user() -> None:
+        while time.perf_counter() < stop_at:
+            await send(client, random.choices(requests, weights)[0], values, headers, recorder)
+
+    async def scheduler() -> None:
+        # Open loop: starts are spaced 1/rate apart, with at most `concurrency` in flight
+        slots = asyncio.Semaphore(concurrency)
+        interval = 1.0 / rate
+        next_start = time.perf_counter()
+        tasks = set()
+
+        async def one(scheduled: float) -> None:
+            async with slots:
+                await send(client, random.choices(requests, weights)[0], values, headers, recorder, scheduled)
+
+        while next_start < stop_at:
+            delay = next_start - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(one(next_start))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            next_start += interval
+        await asyncio.gather(*tasks)
+
+    async def end_warmup() -> float:
+        await asyncio.sleep(warmup)
+        recorder.recording = True
+        return time.perf_counter()
+
+    warmup_task = asyncio.create_task(end_warmup())
+    if rate:
+        await scheduler()
+    else:
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+    measured_from = await warmup_task
+    return summarize(recorder, time.perf_counter() - measured_from)
+
+
+def percentile(sorted_samples: List[float], fraction: float) -> Optional[float]:
+    if not sorted_samples:
+        return None
+    index = min(len(sorted_samples) - 1, max(0, round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def stats(latencies: List[float], errors: int, seconds: float) -> Dict[str, Any]:
+    samples = sorted(latencies)
+    count = len(samples)
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return None if value is None else value * 1000
+
+    return {
+        "requests": count,
+        "errors": errors,
+        "error_rate": errors / count if count else 0.0,
+        "rps": count / seconds if seconds else 0.0,
+        "mean_ms": ms(sum(samples) / count) if count else None,
+        "p50_ms": ms(percentile(samples, 0.50)),
+        "p95_ms": ms(percentile(samples, 0.95)),
+        "p99_ms": ms(percentile(samples, 0.99)),
+        "max_ms": ms(samples[-1]) if samples else None,
+    }
+
+
+def summarize(recorder: Recorder, seconds: float) -> Dict[str, Any]:
+    requests = {
+        name: {**stats(latencies, recorder.errors[name], seconds), "statuses": recorder.statuses[name]}
+        for name, latencies in recorder.latencies.items()
+    }
+    everything = [latency for latencies in recorder.latencies.values() for latency in latencies]
+    return {
+        "seconds": seconds,
+        "total": stats(everything, sum(recorder.errors.values()), seconds),
+        "requests": requests,
+    }
+
+
+def report(results: Dict[str, Any]) -> None:
+    def fmt(value: Optional[float]) -> str:
+        return f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+
+    print(f"\n{'request':<24} {'count':>8} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    rows = [*results["requests"].items(), ("total", results["total"])]
+    for name, row in rows:
+        print(
+            f"{name:<24} {row['requests']:>8} {row['rps']:>9.1f} {fmt(row['p50_ms'])} {fmt(row['p95_ms'])} "
+            f"{fmt(row['p99_ms'])} {row['error_rate'] * 100:>7.2f}%"
+        )
+
+
+def check(results: Dict[str, Any], slo: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> List[str]:
+    """SLO violations and regressions against the baseline, as messages."""
+    failures = []
+    total = results["total"]
+    for key in ("p50_ms", "p95_ms", "p99_ms"):
+        if key in slo and total[key] is not None and total[key] > slo[key]:
+            failures.append(f"{key} {total[key]:.1f} exceeds the SLO of {slo[key]}")
+    if "error_rate" in slo and total["error_rate"] > slo["error_rate"]:
+        failures.append(f"error rate {total['error_rate']:.4f} exceeds the SLO of {slo['error_rate']}")
+    if "min_rps" in slo and total["rps"] < slo["min_rps"]:
+        failures.append(f"throughput {total['rps']:.1f} rps is below the SLO of {slo['min_rps']}")
+    if baseline is None:
+        return failures
+
+    tolerance = {**DEFAULT_REGRESSION, **slo.get("regression", {})}
+    rows = [("total", total, baseline["total"])] + [
+        (name, row, baseline["requests"][name])
+        for name, row in results["requests"].items() if name in baseline.get("requests", {})
+    ]
+    for name, row, before in rows:
+        for key in ("p95_ms", "p99_ms"):
+            if row[key] is None or not before.get(key):
+                continue
+            if row[key] > before[key] * (1 + tolerance["latency"]):
+                failures.append(
+                    f"{name}: {key} {row[key]:.1f} regressed more than {tolerance['latency']:.0%} "
+                    f"from the baseline {before[key]:.1f}"
+                )
+    if baseline["total"].get("rps") and total["rps"] < baseline["total"]["rps"] * (1 - tolerance["throughput"]):
+        failures.append(
+            f"throughput {total['rps']:.1f} rps fell more than {tolerance['throughput']:.0%} "
+            f"from the baseline {baseline['total']['rps']:.1f}"
+        )
+    return failures
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenario", nargs="?", default=DEFAULT_SCENARIO)
+    parser.add_argument("--base-url", help="test a running app instead of starting one")
+    parser.add_argument("--duration", type=float, help="override the scenario duration (seconds)")
+    parser.add_argument("--concurrency", type=int, help="override the scenario concurrency")
+    parser.add_argument("--rate", type=float, help="override the scenario request rate (requests/second)")
+    parser.add_argument("--output", help="write the report to this JSON file")
+    parser.add_argument("--baseline", help="fail on regressions against this report")
+    parser.add_argument("--save-baseline", help="write the report here as the new baseline")
+    args = parser.parse_args()
+
+    with open(args.scenario) as f:
+        scenario = json.load(f)
+    for key in ("duration", "concurrency", "rate"):
+        if getattr(args, key) is not None:
+            scenario[key] = getattr(args, key)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            document = json.load(f)
+        if document.get("scenario") != scenario.get("name"):
+            raise SystemExit(f"Baseline {args.baseline} is for scenario {document.get('scenario')!r}, not {scenario.get('name')!r}")
+        baseline = document["results"]
+
+    process = None
+    base_url = args.base_url
+    if base_url is None:
+        process, base_url = await start_app()
+    try:
+        limits = httpx.Limits(max_connections=scenario.get("concurrency", 10))
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+            values = await resolve_variables(client, scenario.get("variables", {}))
+            print(f"{scenario.get('name', 'scenario')}: {scenario.get('duration', 30)} s against {base_url}", flush=True)
+            results = await run(client, scenario, values)
+    finally:
+        if process is not None:
+            stop_app(process)
+
+    report(results)
+    failures = check(results, scenario.get("slo", {}), baseline)
+    document = {
+        "scenario": scenario.get("name"),
+        "finished_at": datetime.now().isoformat(),
+        "base_url": base_url,
+        "settings": {key: scenario.get(key) for key in ("duration", "warmup", "concurrency", "rate")},
+        "results": results,
+        "failures": failures,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(document, f, indent=2)
+    if failures:
+        print("\nFAILED")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nall SLOs met")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))